@@ -1,201 +1,40 @@
-import csv
 import re
+import numpy as np
 import pandas as pd
 import nltk
-nltk.download('vader_lexicon')
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
+nltk.download('vader_lexicon', quiet=True)
 import plotly.express as px
 import plotly.graph_objects as go
 from colorama import Fore, Style
 from typing import Dict
 import streamlit as st
-import emoji
-import torch
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
-from langdetect import detect
-from langdetect.lang_detect_exception import LangDetectException
+from artifact_cache import get_artifact_cache, file_digest, artifact_digest
+from comment_store import load_comments, write_results
+from result_batch import ResultBatch
+from timeline import update_timeline
+from comment_index import get_comment_index
+from keywords import KeywordSketch, store_keywords
+from authors import author_frame
+from snapshots import get_snapshot_store, take_snapshot
+from analysis_jobs import AnalysisJob
+from charts import chart_key, cached_figure, bin_points, WEBGL_THRESHOLD, MAX_SCATTER_POINTS
+from text_processing import preprocess_text, preprocess_text_basic, detect_language, translate_text, TRANSLATION_AVAILABLE
+from sentiment_backends import get_backend
+from budget_planner import analyze_with_budget, budget_tiers, timed_call
+from instrumentation import span, collect_stages
+from metrics import comments_analyzed
 import warnings
 warnings.filterwarnings('ignore')
 
-# Try to import translation, but make it optional
-try:
-    from googletrans import Translator
-    TRANSLATION_AVAILABLE = True
-except ImportError as e:
-    TRANSLATION_AVAILABLE = False
-    st.warning("⚠️ Translation features disabled due to Python 3.13 compatibility. Using English-only analysis.")
-
-# Initialize advanced sentiment models
-@st.cache_resource
-def load_sentiment_models():
-    """Load and cache sentiment analysis models"""
-    models = {}
-    
-    try:
-        # Multilingual sentiment model (works with multiple languages)
-        models['multilingual'] = pipeline(
-            "sentiment-analysis",
-            model="nlptown/bert-base-multilingual-uncased-sentiment",
-            tokenizer="nlptown/bert-base-multilingual-uncased-sentiment",
-            device=0 if torch.cuda.is_available() else -1
-        )
-        st.success("✅ Multilingual sentiment model loaded successfully!")
-    except Exception as e:
-        st.warning(f"⚠️ Multilingual model failed to load: {str(e)}")
-        models['multilingual'] = None
-    
-    try:
-        # Social media optimized model (better for YouTube comments)
-        models['social'] = pipeline(
-            "sentiment-analysis",
-            model="cardiffnlp/twitter-roberta-base-sentiment-latest",
-            tokenizer="cardiffnlp/twitter-roberta-base-sentiment-latest",
-            device=0 if torch.cuda.is_available() else -1
-        )
-        st.success("✅ Social media sentiment model loaded successfully!")
-    except Exception as e:
-        st.warning(f"⚠️ Social media model failed to load: {str(e)}")
-        models['social'] = None
-    
-    # Fallback to VADER
-    models['vader'] = SentimentIntensityAnalyzer()
-    
-    # Show translation status
-    if TRANSLATION_AVAILABLE:
-        st.success("✅ Translation features enabled for multilingual support!")
-    else:
-        st.info("ℹ️ Running in English-only mode (Python 3.13 compatibility)")
-    
-    return models
+ANALYSIS_BATCH_SIZE = 64  # Comments sent to a backend per call
 
-def preprocess_text(text):
-    """Advanced text preprocessing for better sentiment analysis"""
-    if not text or pd.isna(text):
-        return ""
-    
-    # Convert to string and strip whitespace
-    text = str(text).strip()
-    
-    # Convert emoji to text description for better analysis
-    text = emoji.demojize(text, language='en')
-    
-    # Clean up common social media artifacts
-    text = re.sub(r'@\w+', '', text)  # Remove mentions
-    text = re.sub(r'#\w+', '', text)  # Remove hashtags
-    text = re.sub(r'http\S+', '', text)  # Remove URLs
-    text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
-    
-    return text.strip()
-
-def detect_language(text):
-    """Detect the language of the text"""
-    try:
-        return detect(text)
-    except (LangDetectException, Exception):
-        return 'en'  # Default to English
-
-def translate_text(text, target_lang='en'):
-    """Translate text to target language"""
-    if not TRANSLATION_AVAILABLE:
-        return text  # Return original text if translation not available
-    
-    try:
-        if len(text.strip()) == 0:
-            return text
-        
-        translator = Translator()
-        result = translator.translate(text, dest=target_lang)
-        return result.text
-    except Exception as e:
-        st.warning(f"Translation failed: {str(e)}")
-        return text
-
-def analyze_sentiment_advanced(text, models):
+def analyze_sentiment_advanced(text, backend='cascade'):
     """Advanced sentiment analysis with multiple models"""
-    if not text or len(text.strip()) == 0:
-        return {'sentiment': 'neutral', 'confidence': 0.0, 'method': 'empty'}
-    
-    # Preprocess the text
-    processed_text = preprocess_text(text)
-    
-    # Detect language
-    lang = detect_language(processed_text)
-    
-    # If text is too short, use VADER
-    if len(processed_text.split()) < 2:
-        return analyze_with_vader(processed_text, models['vader'])
-    
-    # Try multilingual model first
-    if models['multilingual'] is not None:
-        try:
-            result = models['multilingual'](processed_text)
-            if result:
-                sentiment = result[0]['label'].lower()
-                confidence = result[0]['score']
-                
-                # Map multilingual model output to standard format
-                if 'positive' in sentiment or sentiment in ['pos', '4 stars', '5 stars']:
-                    return {'sentiment': 'positive', 'confidence': confidence, 'method': 'multilingual', 'language': lang}
-                elif 'negative' in sentiment or sentiment in ['neg', '1 star', '2 stars']:
-                    return {'sentiment': 'negative', 'confidence': confidence, 'method': 'multilingual', 'language': lang}
-                else:
-                    return {'sentiment': 'neutral', 'confidence': confidence, 'method': 'multilingual', 'language': lang}
-        except Exception as e:
-            st.warning(f"Multilingual model error: {str(e)}")
-    
-    # Try social media model for English text
-    if lang == 'en' and models['social'] is not None:
-        try:
-            result = models['social'](processed_text)
-            if result:
-                sentiment = result[0]['label'].lower()
-                confidence = result[0]['score']
-                
-                # Map social media model output
-                if 'positive' in sentiment:
-                    return {'sentiment': 'positive', 'confidence': confidence, 'method': 'social', 'language': lang}
-                elif 'negative' in sentiment:
-                    return {'sentiment': 'negative', 'confidence': confidence, 'method': 'social', 'language': lang}
-                else:
-                    return {'sentiment': 'neutral', 'confidence': confidence, 'method': 'social', 'language': lang}
-        except Exception as e:
-            st.warning(f"Social media model error: {str(e)}")
-    
-    # For non-English text, try translation + social model (only if translation available)
-    if lang != 'en' and models['social'] is not None and TRANSLATION_AVAILABLE:
-        try:
-            translated_text = translate_text(processed_text, 'en')
-            result = models['social'](translated_text)
-            if result:
-                sentiment = result[0]['label'].lower()
-                confidence = result[0]['score'] * 0.8  # Reduce confidence due to translation
-                
-                if 'positive' in sentiment:
-                    return {'sentiment': 'positive', 'confidence': confidence, 'method': 'translated+social', 'language': lang}
-                elif 'negative' in sentiment:
-                    return {'sentiment': 'negative', 'confidence': confidence, 'method': 'translated+social', 'language': lang}
-                else:
-                    return {'sentiment': 'neutral', 'confidence': confidence, 'method': 'translated+social', 'language': lang}
-        except Exception as e:
-            st.warning(f"Translation + social model error: {str(e)}")
-    
-    # Fallback to VADER
-    return analyze_with_vader(processed_text, models['vader'])
-
-def analyze_with_vader(text, vader_analyzer):
-    """Fallback VADER analysis"""
-    try:
-        sentiment_scores = vader_analyzer.polarity_scores(text)
-        compound = sentiment_scores['compound']
-        
-        if compound >= 0.05:
-            return {'sentiment': 'positive', 'confidence': abs(compound), 'method': 'vader', 'language': 'en'}
-        elif compound <= -0.05:
-            return {'sentiment': 'negative', 'confidence': abs(compound), 'method': 'vader', 'language': 'en'}
-        else:
-            return {'sentiment': 'neutral', 'confidence': 1 - abs(compound), 'method': 'vader', 'language': 'en'}
-    except Exception:
-        return {'sentiment': 'neutral', 'confidence': 0.0, 'method': 'error', 'language': 'unknown'}
+    return get_backend(backend).analyze_batch([text])[0]
+
+def analyze_with_vader(text, vader_backend=None):
+    """Fallback VADER analysis of preprocessed text"""
+    return (vader_backend or get_backend('vader')).score(text)
 
 def extract_video_id(youtube_link):
     video_id_regex = r"^(?:https?:\/\/)?(?:www\.)?(?:youtube\.com\/watch\?v=|youtu.be\/)([a-zA-Z0-9_-]{11})"
@@ -206,94 +45,190 @@ def extract_video_id(youtube_link):
     else:
         return None
 
-def analyze_sentiment(csv_file):
-    """Enhanced sentiment analysis with advanced NLP models"""
-    
-    # Load models
-    with st.spinner("🤖 Loading advanced AI models..."):
-        models = load_sentiment_models()
-    
-    # Read in the YouTube comments from the CSV file
-    comments = []
-    with open(csv_file, 'r', encoding='utf-8-sig') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            comments.append(row['Comment'])
-    
-    # Initialize counters
-    num_neutral = 0
-    num_positive = 0
-    num_negative = 0
-    confidence_scores = []
-    language_stats = {}
-    method_stats = {}
+def score_comments(comments, backend=None, progress=None, job=None):
+    """
+    Score comment texts in backend-sized batches; returns (ResultBatch, backend name).
+    With an AnalysisJob, starts after its last checkpoint and checkpoints as it goes.
+    """
+    sentiment_backend = get_backend(backend)
+    result_batches = []
+    batch_size = getattr(sentiment_backend, 'analysis_batch_size', ANALYSIS_BATCH_SIZE)
+    first = 0
+    if job is not None:
+        job.begin(len(comments), sentiment_backend.name, batch_size)
+        result_batches = job.restore()
+        first = job.offset
+    for start in range(first, len(comments), batch_size):
+        batch = comments[start:start + batch_size]
+        batch_results = timed_call(sentiment_backend.name, len(batch), sentiment_backend.analyze_batch, batch)
+        result_batches.append(ResultBatch.from_dicts(batch_results))
+        if job is not None:
+            job.record(start + len(batch), result_batches[-1])
+        if progress:
+            progress(start + len(batch), len(comments), sentiment_backend.label)
+    if job is not None:
+        job.checkpoint()
+    return ResultBatch.concat(result_batches), sentiment_backend.name
+
+def run_analysis(csv_file, video_id=None, backend=None, time_budget=None, progress=None, job_id=None):
+    """
+    Sentiment analysis of stored comments with the configured backend
+    (or the named backend/tier, e.g. 'vader', 'cascade', 'lightweight').
+    With a time_budget (seconds), tiers are planned to fit the deadline instead,
+    upgrading only to the models the backend allows (none for VADER).
+    With a job_id, scoring is checkpointed and resumes where that job stopped;
+    a job can't be combined with a time budget.
+    Renders nothing, so it can run off the Streamlit script thread;
+    progress(done, total, label) is called after each batch.
+    """
+    if job_id and time_budget:
+        raise ValueError("Resumable jobs score every comment; they can't run within a time budget")
+    # Read only the columns we need from the stored comments
+    with span('load_comments') as load_span:
+        comments_df = load_comments(csv_file, columns=['CommentId', 'Username', 'AuthorChannelId', 'Comment', 'PublishedAt'])
+        load_span.count = len(comments_df)
+    if 'CommentId' not in comments_df.columns:
+        # Legacy CSVs carry no ids; row numbers are stable for a given file
+        comments_df['CommentId'] = [f'row{row}' for row in range(len(comments_df))]
+    comments = comments_df['Comment'].fillna('').tolist()
+    budget_plan = None
+    job = AnalysisJob.open(job_id, file_digest(csv_file)) if job_id else None
+    
+    with collect_stages() as stages:
+        if time_budget:
+            backend_name = 'budgeted'
+            budget_results, budget_plan = analyze_with_budget(comments, time_budget, budget_tiers(backend))
+            per_comment_results = ResultBatch.from_dicts(budget_results)
+        else:
+            # Analyze comments in batches; columnar results make counts and means array reductions
+            per_comment_results, backend_name = score_comments(comments, backend, progress, job)
+    
+    with span('aggregate', len(per_comment_results)):
+        sentiment_counts = per_comment_results.sentiment_counts()
+        num_positive = sentiment_counts['positive']
+        num_negative = sentiment_counts['negative']
+        num_neutral = sentiment_counts['neutral']
+        language_stats = per_comment_results.language_counts()
+        method_stats = per_comment_results.method_counts()
+        avg_confidence = per_comment_results.mean_confidence()
+    
+    # Partition sizes from this call's routing spans ('route.<language>.<length>')
+    partition_stats = {
+        stage[len('route.'):].replace('.', '/'): items
+        for stage, items in stages.items()
+        if stage.startswith('route.')
+    }
     
-    # Progress bar for sentiment analysis
-    progress_bar = st.progress(0)
-    status_text = st.empty()
+    for sentiment, count in (('positive', num_positive), ('negative', num_negative), ('neutral', num_neutral)):
+        comments_analyzed.inc(count, backend=backend_name, sentiment=sentiment)
+    
+    # Top terms and phrases per sentiment, in fixed-memory summaries
+    with span('keywords', len(comments)):
+        keywords = KeywordSketch(backend=backend_name).add(comments, per_comment_results.sentiment)
+    # Comment counts and sentiment mix per commenter
+    with span('authors', len(comments)):
+        authors = author_frame(comments_df, per_comment_results)
+    
+    # Persist per-comment results next to the comments for re-use by charts and exports
+    timeline = None
+    snapshot_id = None
+    if video_id is not None:
+        comment_ids = comments_df['CommentId'].fillna('').tolist()
+        with span('store_results', len(per_comment_results)):
+            write_results(get_artifact_cache(), video_id, comment_ids, per_comment_results)
+        # Fold comments the stored timeline hasn't seen into its rollups
+        if 'PublishedAt' in comments_df.columns:
+            with span('timeline', len(per_comment_results)):
+                timeline = update_timeline(get_artifact_cache(), video_id, comment_ids, comments_df['PublishedAt'],
+                                           per_comment_results, backend_name)
+        # Make the comments and their labels searchable
+        with span('search_index', len(per_comment_results)):
+            get_comment_index().index_video(video_id, comments_df, per_comment_results)
+        store_keywords(get_artifact_cache(), video_id, keywords)
+        # Keep this run in the video's history for drift tests
+        with span('snapshot'):
+            snapshot_id = take_snapshot(get_snapshot_store(), get_artifact_cache(), video_id, csv_file,
+                                        per_comment_results, backend_name, timeline)
     
-    # Analyze each comment
-    for i, comment in enumerate(comments):
-        # Update progress
-        progress = (i + 1) / len(comments)
-        progress_bar.progress(progress)
-        status_text.text(f"Analyzing comment {i+1}/{len(comments)} using advanced AI...")
-        
-        # Analyze sentiment
-        result = analyze_sentiment_advanced(comment, models)
+    # Return the results as a dictionary
+    results = {
+        'num_neutral': num_neutral, 
+        'num_positive': num_positive, 
+        'num_negative': num_negative,
+        'avg_confidence': avg_confidence,
+        'language_stats': language_stats,
+        'method_stats': method_stats,
+        'partition_stats': partition_stats,
+        'timeline': timeline,
+        'keywords': keywords,
+        'authors': authors,
+        'snapshot_id': snapshot_id,
+        'total_comments': len(comments),
+        'backend': backend_name,
+        'budget_plan': budget_plan
+    }
+    return results
+
+def analyze_sentiment(csv_file, video_id=None, backend=None, time_budget=None, job_id=None):
+    """run_analysis with a progress bar and the analysis statistics shown in the app"""
+    if time_budget:
+        with st.spinner(f"⏱️ Analyzing within a {time_budget:.1f}s budget..."):
+            results = run_analysis(csv_file, video_id=video_id, backend=backend, time_budget=time_budget, job_id=job_id)
+    else:
+        # Load models on first use only
+        sentiment_backend = get_backend(backend)
+        if not sentiment_backend.loaded:
+            with st.spinner("🤖 Loading sentiment models..."):
+                sentiment_backend.model
+            st.success(f"✅ {sentiment_backend.label} loaded successfully!")
         
-        # Count sentiments
-        if result['sentiment'] == 'positive':
-            num_positive += 1
-        elif result['sentiment'] == 'negative':
-            num_negative += 1
-        else:
-            num_neutral += 1
+        # Progress bar for sentiment analysis
+        progress_bar = st.progress(0)
+        status_text = st.empty()
         
-        # Track statistics
-        confidence_scores.append(result['confidence'])
+        def progress(done, total, label):
+            status_text.text(f"Analyzed {done}/{total} comments with {label}...")
+            progress_bar.progress(done / total)
         
-        # Language statistics
-        lang = result.get('language', 'unknown')
-        language_stats[lang] = language_stats.get(lang, 0) + 1
+        results = run_analysis(csv_file, video_id=video_id, backend=backend, progress=progress, job_id=job_id)
         
-        # Method statistics
-        method = result.get('method', 'unknown')
-        method_stats[method] = method_stats.get(method, 0) + 1
-    
-    # Clear progress indicators
-    progress_bar.empty()
-    status_text.empty()
-    
-    # Calculate average confidence
-    avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0
+        # Clear progress indicators
+        progress_bar.empty()
+        status_text.empty()
     
     # Display analysis statistics
-    st.success(f"✅ Analyzed {len(comments)} comments with {avg_confidence:.2f} average confidence")
+    st.success(f"✅ Analyzed {results['total_comments']} comments with {results['avg_confidence']:.2f} average confidence")
     
     # Display language distribution
-    if language_stats:
-        st.info(f"🌐 Languages detected: {', '.join([f'{lang}: {count}' for lang, count in language_stats.items() if count > 0])}")
+    if results['language_stats']:
+        st.info(f"🌐 Languages detected: {', '.join([f'{lang}: {count}' for lang, count in results['language_stats'].items() if count > 0])}")
     
     # Display method distribution  
-    if method_stats:
-        st.info(f"🔧 Analysis methods: {', '.join([f'{method}: {count}' for method, count in method_stats.items() if count > 0])}")
+    if results['method_stats']:
+        st.info(f"🔧 Analysis methods: {', '.join([f'{method}: {count}' for method, count in results['method_stats'].items() if count > 0])}")
+    
+    # Display routing partitions
+    if results['partition_stats']:
+        st.info(f"🧭 Routing partitions: {', '.join([f'{partition}: {count}' for partition, count in sorted(results['partition_stats'].items(), key=lambda item: -item[1])])}")
+    
+    # Display budget outcome
+    budget_plan = results['budget_plan']
+    if budget_plan:
+        status = "partial" if budget_plan['partial'] else "complete"
+        st.info(f"⏱️ {budget_plan['elapsed']:.2f}s of {budget_plan['time_budget']:.1f}s budget used: "
+                f"upgraded {budget_plan['upgraded']}/{budget_plan['candidates']} comments ({status})")
+        if budget_plan['failed']:
+            st.warning(f"⚠️ {budget_plan['failed']} upgrades failed and kept their VADER result: "
+                       + '; '.join(budget_plan['errors']))
     
-    # Return the results as a dictionary
-    results = {
-        'num_neutral': num_neutral, 
-        'num_positive': num_positive, 
-        'num_negative': num_negative,
-        'avg_confidence': avg_confidence,
-        'language_stats': language_stats,
-        'method_stats': method_stats,
-        'total_comments': len(comments)
-    }
     return results
 
-def bar_chart(csv_file: str) -> None:
-    # Call analyze_sentiment function to get the results
-    results: Dict[str, int] = analyze_sentiment(csv_file)
+def bar_chart(results: Dict[str, int], title: str = '📊 Advanced AI Sentiment Analysis') -> None:
+    counts = (results['num_positive'], results['num_negative'], results['num_neutral'])
+    fig = cached_figure(chart_key('bar', title, counts), lambda: bar_figure(results, title))
+    st.plotly_chart(fig, use_container_width=True)
+
+def bar_figure(results: Dict[str, int], title: str) -> go.Figure:
 
     # Get the counts for each sentiment category
     num_neutral = results['num_neutral']
@@ -322,7 +257,7 @@ def bar_chart(csv_file: str) -> None:
         paper_bgcolor='rgba(0,0,0,0)',
         font=dict(color='white', family='Inter, sans-serif', size=12),
         title=dict(
-            text='📊 Advanced AI Sentiment Analysis',
+            text=title,
             x=0.5,
             font=dict(size=20, color='white')
         ),
@@ -354,12 +289,14 @@ def bar_chart(csv_file: str) -> None:
         hovertemplate='<b>%{x}</b><br>Comments: %{y}<extra></extra>'
     )
 
-    # Show the chart
-    st.plotly_chart(fig, use_container_width=True)    
+    return fig
     
-def plot_sentiment(csv_file: str) -> None:
-    # Call analyze_sentiment function to get the results
-    results: Dict[str, int] = analyze_sentiment(csv_file)
+def plot_sentiment(results: Dict[str, int], title: str = '🥧 Multilingual Sentiment Breakdown') -> None:
+    counts = (results['num_positive'], results['num_negative'], results['num_neutral'])
+    fig = cached_figure(chart_key('pie', title, counts), lambda: sentiment_figure(results, title))
+    st.plotly_chart(fig, use_container_width=True)
+
+def sentiment_figure(results: Dict[str, int], title: str) -> go.Figure:
 
     # Get the counts for each sentiment category
     num_neutral = results['num_neutral']
@@ -389,7 +326,7 @@ def plot_sentiment(csv_file: str) -> None:
         paper_bgcolor='rgba(0,0,0,0)',
         font=dict(color='white', family='Inter, sans-serif'),
         title=dict(
-            text='🥧 Multilingual Sentiment Breakdown',
+            text=title,
             x=0.5,
             font=dict(size=20, color='white')
         ),
@@ -414,15 +351,92 @@ def plot_sentiment(csv_file: str) -> None:
         showarrow=False
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
     
+def plot_timeline(timeline, level: str, title: str = '🕒 Sentiment Over Time') -> None:
+    key = chart_key('timeline', title, level, timeline.rollups[level])
+    fig = cached_figure(key, lambda: timeline_figure(timeline, level, title))
+    st.plotly_chart(fig, use_container_width=True)
+
+def timeline_figure(timeline, level: str, title: str) -> go.Figure:
+
+    # Per-bucket counts from the stored rollups
+    df = timeline.frame(level)
+
+    fig = go.Figure()
+    for column, label, color in (('positive', 'Positive', 'rgba(16, 185, 129, 0.8)'),
+                                 ('neutral', 'Neutral', 'rgba(107, 114, 128, 0.8)'),
+                                 ('negative', 'Negative', 'rgba(239, 68, 68, 0.8)')):
+        fig.add_trace(go.Scatter(
+            x=df['bucket'], y=df[column], name=label,
+            mode='lines', stackgroup='sentiment',
+            line=dict(color=color, width=1), fillcolor=color,
+            hovertemplate=f'<b>{label}</b><br>%{{x}}<br>Comments: %{{y}}<extra></extra>'
+        ))
+
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white', family='Inter, sans-serif', size=12),
+        title=dict(
+            text=title,
+            x=0.5,
+            font=dict(size=20, color='white')
+        ),
+        xaxis=dict(
+            showgrid=False,
+            zeroline=False,
+            tickfont=dict(color='rgba(255,255,255,0.8)')
+        ),
+        yaxis=dict(
+            title='Comments',
+            showgrid=True,
+            gridcolor='rgba(255,255,255,0.1)',
+            zeroline=False,
+            tickfont=dict(color='rgba(255,255,255,0.8)')
+        ),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.25,
+            xanchor="center",
+            x=0.5,
+            font=dict(color='rgba(255,255,255,0.8)')
+        ),
+        hovermode='x unified',
+        margin=dict(l=0, r=0, t=50, b=0),
+        height=400
+    )
+
+    return fig
+
 def create_scatterplot(csv_file: str, x_column: str, y_column: str) -> None:
-    # Load data from CSV
-    data = pd.read_csv(csv_file)
+    key = chart_key('scatter', artifact_digest(csv_file), x_column, y_column)
+    fig = cached_figure(key, lambda: scatter_figure(load_comments(csv_file, columns=[x_column, y_column, 'Category']),
+                                                    x_column, y_column))
+    st.plotly_chart(fig, use_container_width=True)
+
+def scatter_figure(data: pd.DataFrame, x_column: str, y_column: str) -> go.Figure:
+    # Large data: WebGL markers, and above MAX_SCATTER_POINTS one marker per grid cell sized by its count
+    binned = len(data) > MAX_SCATTER_POINTS
+    if binned:
+        data = bin_points(data, x_column, y_column, 'Category')
+    trace = go.Scattergl if len(data) > WEBGL_THRESHOLD else go.Scatter
+    colors = ['rgba(16, 185, 129, 0.8)', 'rgba(239, 68, 68, 0.8)', 'rgba(107, 114, 128, 0.8)']
 
     # Create enhanced scatter plot using Plotly with glassmorphism styling
-    fig = px.scatter(data, x=x_column, y=y_column, color='Category',
-                     color_discrete_sequence=['rgba(16, 185, 129, 0.8)', 'rgba(239, 68, 68, 0.8)', 'rgba(107, 114, 128, 0.8)'])
+    fig = go.Figure()
+    for i, (category, points) in enumerate(data.groupby('Category', sort=False)):
+        marker = dict(color=colors[i % len(colors)])
+        hovertemplate = f'<b>{category}</b><br>{x_column}: %{{x}}<br>{y_column}: %{{y}}'
+        if binned:
+            marker['size'] = 6 + 14 * np.sqrt(points['Count'] / data['Count'].max())
+            hovertemplate += '<br>Comments: %{customdata}'
+        fig.add_trace(trace(
+            x=points[x_column], y=points[y_column], name=str(category), mode='markers',
+            marker=marker, customdata=points['Count'] if binned else None,
+            hovertemplate=hovertemplate + '<extra></extra>'
+        ))
 
     # Update layout for glassmorphism theme
     fig.update_layout(
@@ -460,17 +474,17 @@ def create_scatterplot(csv_file: str, x_column: str, y_column: str) -> None:
     # Update traces for better styling
     fig.update_traces(
         marker=dict(
-            size=8,
             line=dict(color='rgba(255,255,255,0.3)', width=1)
         )
     )
+    if not binned:
+        fig.update_traces(marker=dict(size=8))
 
-    # Display plot in Streamlit
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
     
-def print_sentiment(csv_file: str) -> None:
+def print_sentiment(csv_file: str, backend: str = None) -> None:
     # Call analyze_sentiment function to get the results
-    results: Dict[str, int] = analyze_sentiment(csv_file)
+    results: Dict[str, int] = analyze_sentiment(csv_file, backend=backend)
 
     # Get the counts for each sentiment category
     num_neutral = results['num_neutral']
@@ -1,165 +1,145 @@
-import csv
+import threading
 from googleapiclient.discovery import build
-from collections import Counter
+from googleapiclient.http import build_http
 import streamlit as st
-from Senti import extract_video_id
 from googleapiclient.errors import HttpError
-import os
-import time
-import tempfile
-from file_manager import FileManager
+from artifact_cache import get_artifact_cache
+from comment_store import comment_record, write_comments
+from instrumentation import span
+from metrics import QUOTA_COSTS, record_api_call, comments_fetched
+from sentiment_backends import config_value
 
 import warnings
 warnings.filterwarnings('ignore')
 
-# Replace with your own API key
-DEVELOPER_KEY = st.secrets["YOUTUBE_API_KEY"]
+# Alternative API host, e.g. the local fake server (python fake_youtube_api.py)
+YOUTUBE_API_ENDPOINT = config_value('YOUTUBE_API_ENDPOINT')
+# Replace with your own API key (environment or secrets.toml); a fake endpoint needs none
+DEVELOPER_KEY = config_value('YOUTUBE_API_KEY') or ('offline-test-key' if YOUTUBE_API_ENDPOINT else st.secrets["YOUTUBE_API_KEY"])
 YOUTUBE_API_SERVICE_NAME = 'youtube'
 YOUTUBE_API_VERSION = 'v3'
+
+def build_youtube_client(api_key=DEVELOPER_KEY, api_endpoint=YOUTUBE_API_ENDPOINT):
+    """YouTube API client, optionally pointed at another endpoint"""
+    client_options = {'api_endpoint': api_endpoint} if api_endpoint else None
+    return build(YOUTUBE_API_SERVICE_NAME, YOUTUBE_API_VERSION, developerKey=api_key, client_options=client_options)
+
 # Create a client object to interact with the YouTube API
-youtube = build(YOUTUBE_API_SERVICE_NAME, YOUTUBE_API_VERSION, developerKey=DEVELOPER_KEY)
+youtube = build_youtube_client()
 
 #video_id=extract_video_id(youtube_link)
 
+_thread_local = threading.local()
+
+def thread_http():
+    """
+    HTTP connection for the calling thread. httplib2 connections are not
+    thread-safe and Streamlit runs each session on its own thread, so sharing
+    the client's connection lets concurrent sessions block each other.
+    """
+    if not hasattr(_thread_local, 'http'):
+        _thread_local.http = build_http()
+    return _thread_local.http
+
+def execute(request, method):
+    """Run an API request, counting the call and the quota it costs"""
+    try:
+        response = request.execute(http=thread_http())
+    except HttpError as e:
+        record_api_call(method, status=str(e.resp.status))
+        raise
+    except Exception:
+        record_api_call(method, status='error')
+        raise
+    record_api_call(method)
+    return response
+
+class QuotaBudget:
+    """Quota units one run may spend, shared by its worker threads"""
+
+    def __init__(self, units):
+        self.units = units
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def spend(self, method):
+        """Charge one call; False (and nothing charged) if it would exceed the budget"""
+        cost = QUOTA_COSTS.get(method, 1)
+        with self._lock:
+            if self.used + cost > self.units:
+                return False
+            self.used += cost
+            return True
+
+    @property
+    def remaining(self):
+        with self._lock:
+            return self.units - self.used
+
+class QuotaBudgetExceeded(Exception):
+    pass
+
+def execute_within(budget, request, method):
+    """execute() charged to a QuotaBudget; raises QuotaBudgetExceeded instead of overspending"""
+    if not budget.spend(method):
+        raise QuotaBudgetExceeded(f"Quota budget of {budget.units} units used up before {method}")
+    return execute(request, method)
+
 def get_channel_id(video_id):
-    response = youtube.videos().list(part='snippet', id=video_id).execute()
+    response = execute(youtube.videos().list(part='snippet', id=video_id), 'videos.list')
     channel_id = response['items'][0]['snippet']['channelId']
     return channel_id
 
 #channel_id=get_channel_id(video_id)
-    
-def safe_file_operation(filepath, operation, max_retries=3):
-    """
-    Safely perform file operations with retry logic
-    """
-    for attempt in range(max_retries):
-        try:
-            return operation(filepath)
-        except PermissionError as e:
-            if attempt < max_retries - 1:
-                st.warning(f"🔄 File is locked, retrying in {attempt + 1} seconds...")
-                time.sleep(attempt + 1)
-            else:
-                st.error(f"❌ Cannot access file after {max_retries} attempts. Please close any applications that might be using the file.")
-                raise e
-        except Exception as e:
-            st.error(f"❌ Unexpected error: {str(e)}")
-            raise e
 
-def safe_delete_file(filepath):
+def comment_pages(video_id, max_comments=1200, max_pages=15, order='relevance', allow_page=None):
     """
-    Safely delete a file with error handling
+    Yield pages of commentThreads items for a video (100 per page, up to
+    max_pages pages or until max_comments are fetched). allow_page() is asked
+    before every page after the first and can stop the walk, e.g. when a
+    quota budget runs out. API errors propagate to the caller.
     """
-    def delete_operation(fp):
-        if os.path.exists(fp):
-            os.remove(fp)
-        return True
+    request_args = dict(part='snippet', videoId=video_id, textFormat='plainText',
+                        maxResults=100,  # YouTube API max per request
+                        order=order)
+    fetched = 0
+    for page_number in range(1, max_pages + 1):
+        with span('fetch_page') as page_span:
+            results = execute(youtube.commentThreads().list(**request_args), 'commentThreads.list')
+            page_span.count = len(results.get('items', []))
+        yield results['items']
+        fetched += len(results['items'])
+        if 'nextPageToken' not in results or fetched >= max_comments or page_number == max_pages:
+            return
+        if allow_page is not None and not allow_page():
+            return
+        request_args['pageToken'] = results['nextPageToken']
     
-    try:
-        return safe_file_operation(filepath, delete_operation)
-    except PermissionError:
-        st.warning(f"⚠️ Could not delete {os.path.basename(filepath)}. It may be open in another application.")
-        return False
-    except Exception as e:
-        st.error(f"❌ Error deleting file: {str(e)}")
-        return False
-
-def save_video_comments_to_csv(video_id):
+def save_video_comments(video_id):
     """
-    Retrieve comments for the specified video and save to CSV with robust error handling
+    Retrieve comments for the specified video and store them in the artifact cache
+    as typed, compressed columns. Returns the path of the stored comments.
     """
+    cache = get_artifact_cache()
     comments = []
     
     try:
         # Get comments from YouTube API with enhanced limits
-        results = youtube.commentThreads().list(
-            part='snippet',
-            videoId=video_id,
-            textFormat='plainText',
-            maxResults=100,  # YouTube API max per request
-            order='relevance'  # Get most relevant comments first
-        ).execute()
-        
-        # Extract the text content of each comment
-        pages_fetched = 0
-        max_pages = 15  # Allow up to 15 pages (1500 comments max)
-        
-        while results and pages_fetched < max_pages:
-            for item in results['items']:
-                comment = item['snippet']['topLevelComment']['snippet']['textDisplay']
-                username = item['snippet']['topLevelComment']['snippet']['authorDisplayName']
-                comments.append([username, comment])
-            
-            # Get next page if available
-            if 'nextPageToken' in results and len(comments) < 1200:  # Increased limit to 1200 comments
-                nextPage = results['nextPageToken']
-                try:
-                    results = youtube.commentThreads().list(
-                        part='snippet',
-                        videoId=video_id,
-                        textFormat='plainText',
-                        pageToken=nextPage,
-                        maxResults=100,
-                        order='relevance'
-                    ).execute()
-                    pages_fetched += 1
-                except Exception as e:
-                    st.warning(f"⚠️ Stopped fetching at {len(comments)} comments due to API limit")
-                    break
-            else:
-                break
-        
-        # Generate base filename
-        base_filename = f"{video_id}.csv"
-        final_filename = base_filename  # Default to base filename
-        
-        # Handle existing file conflicts
-        if os.path.exists(base_filename):
-            if FileManager.is_file_locked(base_filename):
-                # Create backup of locked file and use base name
-                st.info(f"📄 File {base_filename} is locked, creating backup...")
-                FileManager.backup_locked_file(base_filename)
-                final_filename = base_filename
-            else:
-                # File exists but not locked, we can overwrite it
-                try:
-                    FileManager.safe_remove_file(base_filename)
-                    final_filename = base_filename
-                except:
-                    # If we can't remove it, create unique filename
-                    final_filename = FileManager.create_unique_filename(base_filename)
-                    st.info(f"📄 Creating new file: {final_filename}")
-        
-        # Save comments to CSV
         try:
-            with open(final_filename, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(['Username', 'Comment'])
-                for comment in comments:
-                    writer.writerow([comment[0], comment[1]])
-            
-            st.success(f"✅ Successfully saved {len(comments)} comments to {final_filename}!")
-            return final_filename
-            
-        except PermissionError as e:
-            st.error(f"❌ Permission denied when writing to {final_filename}")
-            st.info("💡 This usually happens when the file is open in Excel or another application.")
-            st.info("🔧 Please close any applications that might be using the file and try again.")
-            
-            # Create a temporary file as fallback
-            temp_filename = f"temp_{video_id}_{int(time.time())}.csv"
-            try:
-                with open(temp_filename, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerow(['Username', 'Comment'])
-                    for comment in comments:
-                        writer.writerow([comment[0], comment[1]])
-                
-                st.warning(f"⚠️ Created temporary file: {temp_filename}")
-                return temp_filename
-            except Exception as temp_error:
-                st.error(f"❌ Could not create temporary file: {str(temp_error)}")
-                raise temp_error
+            for items in comment_pages(video_id):
+                comments.extend(comment_record(item) for item in items)
+                comments_fetched.inc(len(items))
+        except Exception:
+            # Without a first page this is an API error; later pages keep what we have
+            if not comments:
+                raise
+            st.warning(f"⚠️ Stopped fetching at {len(comments)} comments due to API limit")
+        
+        # Atomically replace the cached copy; readers never see a half-written file
+        with span('store_comments', len(comments)):
+            comments_path = write_comments(cache, video_id, comments)
+        st.success(f"✅ Successfully saved {len(comments)} comments for {video_id}!")
+        return comments_path
             
     except HttpError as e:
         st.error(f"❌ YouTube API Error: {str(e)}")
@@ -170,38 +150,42 @@ def save_video_comments_to_csv(video_id):
         else:
             st.error("🔌 Please check your internet connection and API key configuration.")
         
-        # Create a demo file for testing - use existing file if available
-        if os.path.exists(base_filename):
-            st.info(f"📝 Using existing file: {base_filename}")
-            return base_filename
-        else:
-            demo_filename = f"demo_{video_id}.csv"
-            with open(demo_filename, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(['Username', 'Comment'])
-                writer.writerow(['DemoUser1', 'This is a positive demo comment! Great video!'])
-                writer.writerow(['DemoUser2', 'This is a negative demo comment. Not good.'])
-                writer.writerow(['DemoUser3', 'This is a neutral demo comment.'])
-            
-            st.info(f"📝 Created demo file for testing: {demo_filename}")
-            return demo_filename
+        # Fall back to a previously cached copy if we have one
+        cached_path = cached_comments_path(cache, video_id)
+        if cached_path:
+            st.info(f"📝 Using cached comments for {video_id}")
+            return cached_path
+        
+        # Otherwise store demo comments under their own artifact name
+        demo_comments = [
+            {'CommentId': 'demo1', 'Username': 'DemoUser1', 'Comment': 'This is a positive demo comment! Great video!'},
+            {'CommentId': 'demo2', 'Username': 'DemoUser2', 'Comment': 'This is a negative demo comment. Not good.'},
+            {'CommentId': 'demo3', 'Username': 'DemoUser3', 'Comment': 'This is a neutral demo comment.'}
+        ]
+        demo_path = write_comments(cache, video_id, demo_comments, name='demo_comments')
+        st.info(f"📝 Created demo comments for testing: {video_id}")
+        return demo_path
         
     except Exception as e:
         st.error(f"❌ Unexpected error while saving comments: {str(e)}")
         
-        # Try to use existing file if available
-        if os.path.exists(base_filename):
-            st.warning(f"⚠️ Using existing file: {base_filename}")
-            return base_filename
-        else:
-            raise e
+        # Try to use a cached copy if available
+        cached_path = cached_comments_path(cache, video_id)
+        if cached_path:
+            st.warning(f"⚠️ Using cached comments for {video_id}")
+            return cached_path
+        raise e
+
+def cached_comments_path(cache, video_id):
+    """Path of previously stored comments for a video, in either storage format"""
+    return cache.path_for(video_id, 'comments.parquet') or cache.path_for(video_id, 'comments.csv')
 
 def get_video_stats(video_id):
     try:
-        response = youtube.videos().list(
+        response = execute(youtube.videos().list(
             part='statistics',
             id=video_id
-        ).execute()
+        ), 'videos.list')
 
         return response['items'][0]['statistics']
 
@@ -218,10 +202,10 @@ def get_video_stats(video_id):
     
 def get_channel_info(youtube, channel_id):
     try:
-        response = youtube.channels().list(
+        response = execute(youtube.channels().list(
             part='snippet,statistics,brandingSettings',
             id=channel_id
-        ).execute()
+        ), 'channels.list')
 
         channel_title = response['items'][0]['snippet']['title']
         video_count = response['items'][0]['statistics']['videoCount']
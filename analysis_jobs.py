@@ -0,0 +1,179 @@
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import numpy as np
+from artifact_cache import CACHE_DIR, atomic_write
+from result_batch import ResultBatch, SENTIMENTS
+from sentiment_backends import config_value
+
+# Resumable analysis for long offline runs. A job scores comments in the same
+# batches as an uninterrupted run and periodically checkpoints to local disk:
+# the per-comment results scored since the last checkpoint (one .npz part) and
+# then job.json with the offset reached and running aggregates, both written
+# atomically. Restarting with the same job id restores the parts and carries
+# on from the offset, so the final results are identical to a run that never
+# stopped; a crash only loses the batches after the last checkpoint.
+
+JOBS_DIR = config_value('ANALYSIS_JOBS_DIR') or os.path.join(CACHE_DIR, 'jobs')
+JOB_CHECKPOINT_COMMENTS = int(config_value('JOB_CHECKPOINT_COMMENTS', 5000))  # Checkpoint at least this often...
+JOB_CHECKPOINT_SECONDS = float(config_value('JOB_CHECKPOINT_SECONDS', 60))  # ...or after this long
+STATE_FILE = 'job.json'
+JOB_ID_PATTERN = re.compile(r'^[\w.-]{1,100}$')
+
+
+class JobMismatch(ValueError):
+    """A job id reused for different comments or a different backend"""
+
+
+class AnalysisJob:
+    """Checkpoint state of one resumable analysis, kept under JOBS_DIR/<job id>"""
+
+    def __init__(self, job_id, root=JOBS_DIR):
+        if not JOB_ID_PATTERN.match(job_id):
+            raise ValueError(f"Invalid job id {job_id!r}: use letters, digits, '.', '_' or '-'")
+        self.job_id = job_id
+        self.directory = os.path.join(root, job_id)
+        self.state = self._load()
+        self._pending = []
+        self._pending_end = None
+        self._last_checkpoint = time.time()
+
+    def _load(self):
+        try:
+            with open(os.path.join(self.directory, STATE_FILE), encoding='utf-8') as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return None
+
+    @classmethod
+    def open(cls, job_id, comments_digest, root=JOBS_DIR):
+        """The job, checked against the comments it was started on (a new job if there is none)"""
+        job = cls(job_id, root=root)
+        if job.state is not None and job.state['comments_digest'] != comments_digest:
+            raise JobMismatch(f"Job {job_id} was started on different comments; use a new job id")
+        if job.state is None:
+            job.state = {'job_id': job_id, 'comments_digest': comments_digest, 'status': 'new', 'offset': 0, 'parts': []}
+        return job
+
+    @property
+    def offset(self):
+        """Comments already scored and checkpointed"""
+        return self.state['offset'] if self.state else 0
+
+    def begin(self, total, backend, batch_size):
+        """Pin the run's shape on first use; a resumed run must match it batch for batch"""
+        shape = {'total': total, 'backend': backend, 'batch_size': batch_size}
+        if self.state['status'] == 'new':
+            self.state.update(shape, status='running', started=time.time(), aggregates=_empty_aggregates())
+            return
+        for key, value in shape.items():
+            if self.state.get(key) != value:
+                raise JobMismatch(f"Job {self.job_id} was started with {key}={self.state.get(key)!r}, not {value!r}")
+
+    def restore(self):
+        """The checkpointed per-comment results, one ResultBatch per part"""
+        batches = []
+        for part in self.state['parts']:
+            with np.load(os.path.join(self.directory, part['file'])) as arrays:
+                batches.append(ResultBatch(
+                    arrays['sentiment'], arrays['confidence'], arrays['method'], arrays['language'],
+                    arrays['methods'].tolist(), arrays['languages'].tolist(),
+                ))
+        return batches
+
+    def record(self, end, batch):
+        """Add a scored batch ending at comment `end`, checkpointing when one is due"""
+        self._pending.append(batch)
+        self._pending_end = end
+        pending = end - self.state['offset']
+        if pending >= JOB_CHECKPOINT_COMMENTS or time.time() - self._last_checkpoint >= JOB_CHECKPOINT_SECONDS:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Write pending results as a part, then the state that points at it"""
+        if self._pending:
+            part = ResultBatch.concat(self._pending)
+            name = f"part_{self.state['offset']:010d}.npz"
+            atomic_write(os.path.join(self.directory, name), lambda handle: np.savez(
+                handle, sentiment=part.sentiment, confidence=part.confidence, method=part.method,
+                language=part.language, methods=np.array(part.methods, dtype=str),
+                languages=np.array(part.languages, dtype=str),
+            ))
+            self.state['parts'].append({'file': name, 'start': self.state['offset'], 'end': self._pending_end})
+            _add_aggregates(self.state['aggregates'], part)
+            self.state['offset'] = self._pending_end
+            self._pending = []
+        if self.state['offset'] >= self.state['total']:
+            self.state['status'] = 'complete'
+        self.state['updated'] = time.time()
+        data = json.dumps(self.state, indent=2).encode('utf-8')
+        atomic_write(os.path.join(self.directory, STATE_FILE), lambda handle: handle.write(data))
+        self._last_checkpoint = time.time()
+
+    def remove(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _empty_aggregates():
+    return {**{sentiment: 0 for sentiment in SENTIMENTS}, 'confidence_sum': 0.0, 'language_stats': {}, 'method_stats': {}}
+
+
+def _add_aggregates(aggregates, batch):
+    """Fold a part into the running totals kept in job.json"""
+    for sentiment, count in batch.sentiment_counts().items():
+        aggregates[sentiment] += count
+    aggregates['confidence_sum'] += float(batch.confidence.sum(dtype=np.float64))
+    for key, counts in (('language_stats', batch.language_counts()), ('method_stats', batch.method_counts())):
+        for name, count in counts.items():
+            aggregates[key][name] = aggregates[key].get(name, 0) + count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run or resume a checkpointed sentiment analysis of stored comments")
+    parser.add_argument('--job-id', required=True, help="Reusing an id resumes that job from its last checkpoint")
+    parser.add_argument('--comments', help="Comments file (Parquet or CSV) to analyze")
+    parser.add_argument('--video-id', help="Store results, timeline and search index under this video")
+    parser.add_argument('--backend', help="Sentiment backend (default: the configured one)")
+    parser.add_argument('--status', action='store_true', help="Show the job's checkpoint and exit")
+    parser.add_argument('--delete', action='store_true', help="Delete the job's checkpoints and exit")
+    args = parser.parse_args(argv)
+
+    job = AnalysisJob(args.job_id)
+    if args.delete:
+        job.remove()
+        print(f"Deleted job {args.job_id}")
+        return 0
+    if args.status:
+        if job.state is None:
+            print(f"No job {args.job_id}")
+            return 1
+        state = job.state
+        print(f"Job {args.job_id}: {state['status']}, {state['offset']}/{state.get('total', '?')} comments "
+              f"({state.get('backend')}), {len(state['parts'])} checkpoints")
+        print(json.dumps(state.get('aggregates', {}), indent=2))
+        return 0
+    if not args.comments:
+        parser.error("--comments is required to run a job")
+
+    # Imported here so --status and --delete don't load the analysis stack
+    import Senti
+
+    def progress(done, total, label):
+        print(f"\r{done}/{total} comments analyzed with {label}", end='', flush=True)
+
+    if job.offset:
+        print(f"Resuming job {args.job_id} from comment {job.offset}")
+    results = Senti.run_analysis(args.comments, video_id=args.video_id, backend=args.backend,
+                                 progress=progress, job_id=args.job_id)
+    print(f"\nJob {args.job_id} complete: {results['total_comments']} comments, {results['num_positive']} positive, "
+          f"{results['num_negative']} negative, {results['num_neutral']} neutral, "
+          f"{results['avg_confidence']:.3f} average confidence")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,53 +1,35 @@
 import streamlit as st
-import os
-import time
-from Senti import extract_video_id, analyze_sentiment, bar_chart, plot_sentiment
-from YoutubeCommentScrapper import save_video_comments_to_csv, get_channel_info, youtube, get_channel_id, get_video_stats
-from file_manager import FileManager
+from Senti import extract_video_id, analyze_sentiment, bar_chart, plot_sentiment, plot_timeline
+from sentiment_backends import configured_backend_name, config_value, model_stats
+from app_profiles import profile_for_backend
+from YoutubeCommentScrapper import save_video_comments, get_channel_info, youtube, get_channel_id, get_video_stats
+from artifact_cache import get_artifact_cache, hold_video
+from export import show_export_controls
+from instrumentation import start_run, finish_run
+from metrics import start_metrics_server
+from timeline import BUCKETS, default_level
+from channel_analysis import extract_channel_ref, analyze_channel, CHANNEL_MAX_VIDEOS
+from live_watch import show_live_watch
+from comment_index import show_comment_search, show_results_table, get_comment_index
+from keywords import show_keywords
+from author_directory import show_author_analytics
+from snapshots import show_drift
 
-# Get current directory path early
-directory_path = os.getcwd()
+# Prometheus endpoint (once per process) when METRICS_PORT is configured
+start_metrics_server(config_value('METRICS_PORT'))
 
-def delete_non_matching_csv_files(directory_path, video_id):
-    """
-    Clean up old CSV files with better error handling using FileManager
-    """
-    deleted_files = []
-    locked_files = []
-    
-    try:
-        for file_name in os.listdir(directory_path):
-            if not file_name.endswith('.csv'):
-                continue
-            if file_name == f'{video_id}.csv':
-                continue
-            if file_name.startswith('temp_') or file_name.startswith('demo_'):
-                continue  # Skip temporary and demo files
-            
-            file_path = os.path.join(directory_path, file_name)
-            
-            if FileManager.safe_remove_file(file_path):
-                deleted_files.append(file_name)
-            else:
-                locked_files.append(file_name)
-    
-    except Exception as e:
-        st.error(f"❌ Error during file cleanup: {str(e)}")
-    
-    # Provide feedback
-    if deleted_files:
-        st.info(f"🧹 Cleaned up {len(deleted_files)} old CSV files")
-    if locked_files:
-        st.warning(f"⚠️ {len(locked_files)} files are locked (may be open in Excel): {', '.join(locked_files)}")
+# One app serves both tiers: the backend is chosen by config or detected capability
+backend_name = configured_backend_name()
+profile = profile_for_backend(backend_name)
 
 # Enhanced Page Configuration
 st.set_page_config(
-    page_title='YouTube Sentiment Pro', 
-    page_icon='🎬', 
+    page_title=profile['page_title'], 
+    page_icon=profile['page_icon'], 
     layout="wide",
     initial_sidebar_state="collapsed",
     menu_items={
-        'About': "# YouTube Sentiment Analysis Pro\nModern AI-powered sentiment analysis for YouTube comments with stunning glassmorphism UI!"
+        'About': profile['about']
     }
 )
 
@@ -314,6 +296,19 @@ st.markdown("""
         }
     }
     
+    /* Fast Badge */
+    .fast-badge {
+        background: linear-gradient(135deg, #10b981, #34d399);
+        color: white;
+        padding: 0.5rem 1rem;
+        border-radius: 20px;
+        font-size: 0.9rem;
+        font-weight: 600;
+        display: inline-block;
+        margin-left: 1rem;
+        box-shadow: 0 4px 15px rgba(16, 185, 129, 0.3);
+    }
+    
     /* Button Styling */
     .stButton > button {
         background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
@@ -410,11 +405,11 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Hero Section
-st.markdown('<h1 class="main-title">🎬 YouTube Sentiment Pro</h1>', unsafe_allow_html=True)
-st.markdown('<p style="text-align: center; color: rgba(255,255,255,0.8); font-size: 1.3rem; margin-bottom: 3rem;">AI-Powered Comment Analysis with Stunning Insights</p>', unsafe_allow_html=True)
+st.markdown(f'<h1 class="main-title">{profile["title_html"]}</h1>', unsafe_allow_html=True)
+st.markdown(f'<p style="text-align: center; color: rgba(255,255,255,0.8); font-size: 1.3rem; margin-bottom: 3rem;">{profile["subtitle"]}</p>', unsafe_allow_html=True)
 
 # Center Hero Input Section
-st.markdown("""
+st.markdown(f"""
 <div class="hero-input-section">
     <div class="youtube-logo">
         <svg viewBox="0 0 24 24" xmlns="http://www.w3.org/2000/svg">
@@ -422,7 +417,7 @@ st.markdown("""
         </svg>
     </div>
     <div class="hero-input-title">Enter YouTube URL</div>
-    <div class="hero-input-subtitle">Paste any YouTube video URL to analyze its comments with AI</div>
+    <div class="hero-input-subtitle">{profile["hero_subtitle"]}</div>
 </div>
 """, unsafe_allow_html=True)
 
@@ -431,75 +426,98 @@ col1, col2, col3 = st.columns([1, 2, 1])
 
 with col2:
     youtube_link = st.text_input(
-        "", 
+        "YouTube URL", 
         placeholder="https://www.youtube.com/watch?v=dQw4w9WgXcQ",
         help="Paste any YouTube video URL here",
-        key="youtube_url_input"
+        key="youtube_url_input",
+        label_visibility="hidden"
     )
 
 # URL Examples below input
 if not youtube_link:
-    st.markdown("""
+    st.markdown(f"""
     <div style="text-align: center; margin-top: 2rem;">
         <div style="background: rgba(255, 255, 255, 0.1); backdrop-filter: blur(15px); border-radius: 15px; padding: 1.5rem; margin: 1rem auto; max-width: 600px; border: 1px solid rgba(255, 255, 255, 0.2);">
-            <h4 style="color: rgba(255, 255, 255, 0.9); font-size: 1.1rem; margin-bottom: 1rem; font-weight: 600;">✨ Supported URL formats:</h4>
-            <p style="color: rgba(255, 255, 255, 0.7); font-size: 0.9rem; margin: 0.5rem 0; font-family: 'Monaco', monospace;">https://www.youtube.com/watch?v=VIDEO_ID</p>
-            <p style="color: rgba(255, 255, 255, 0.7); font-size: 0.9rem; margin: 0.5rem 0; font-family: 'Monaco', monospace;">https://youtu.be/VIDEO_ID</p>
-            <p style="color: rgba(255, 255, 255, 0.7); font-size: 0.9rem; margin: 0.5rem 0; font-family: 'Monaco', monospace;">youtube.com/watch?v=VIDEO_ID</p>
+            {profile['intro_html']}
         </div>
     </div>
     """, unsafe_allow_html=True)
 
-# Sidebar with file management only
+# Sidebar with analysis settings and file management
 with st.sidebar:
+    st.markdown("### ⚙️ Analysis Settings")
+    
+    time_budget = st.number_input(
+        "⏱️ Time budget (seconds, 0 = no limit)",
+        min_value=0.0,
+        value=float(config_value('SENTIMENT_TIME_BUDGET', 0)),
+        step=0.5,
+        help="Answer within this many seconds: every comment gets a fast VADER score, then as many as fit are upgraded to the AI models"
+    )
+    
+    show_timings = st.checkbox(
+        "📈 Show stage timings",
+        value=str(config_value('SHOW_STAGE_TIMINGS', '')).lower() in ('1', 'true', 'yes'),
+        help="Per-stage timings (fetch, preprocessing, language detection, inference) for the last analysis"
+    )
+    
+    watch_live = st.checkbox(
+        "🔴 Live watch",
+        value=str(config_value('WATCH_LIVE', '')).lower() in ('1', 'true', 'yes'),
+        help="Keep polling the video for new comments (newest first) and add only those to the totals; polls slow down when comments are quiet"
+    )
+    
+    max_channel_videos = st.number_input(
+        "📺 Videos per channel",
+        min_value=1,
+        max_value=200,
+        value=CHANNEL_MAX_VIDEOS,
+        help="For channel URLs (youtube.com/@handle or /channel/ID): how many of the latest uploads to analyze"
+    )
+    
     st.markdown("### 🗂️ File Management")
     
+    cache = get_artifact_cache()
+    
     if st.button("🧹 Clean Old Files"):
-        FileManager.cleanup_old_files(directory_path, max_age_hours=1)
-        st.success("Files cleaned!")
-    
-    # Show current CSV files
-    try:
-        csv_files = [f for f in os.listdir(directory_path) if f.endswith('.csv')]
-        if csv_files:
-            st.write("📁 Current CSV files:")
-            for file in csv_files[:5]:  # Show max 5 files
-                file_info = FileManager.get_file_info(os.path.join(directory_path, file))
-                status = "🔒" if file_info.get('locked', False) else "✅"
-                st.write(f"{status} {file}")
-        else:
-            st.write("📭 No CSV files found")
-    except Exception as e:
-        st.write(f"⚠️ Error accessing files: {str(e)}")
+        evicted = cache.evict(max_age_seconds=3600)
+        st.success(f"Files cleaned! ({len(evicted)} cached artifacts evicted)")
+    
+    # Show cached artifacts straight from the manifest index
+    cache_stats = cache.stats()
+    if cache_stats['artifacts']:
+        st.write(f"📁 {cache_stats['videos']} cached videos ({cache_stats['size'] / (1024 * 1024):.1f} MB of {cache_stats['max_bytes'] / (1024 * 1024):.0f} MB)")
+        for entry in cache.entries()[:5]:  # Show max 5 artifacts
+            status = "🔒" if entry['refcount'] else "✅"
+            st.write(f"{status} {entry['video_id']}/{entry['name']}")
+    else:
+        st.write("📭 No cached comments yet")
 
 # Main content area
 if youtube_link:
     video_id = extract_video_id(youtube_link)
+    channel_ref = None if video_id else extract_channel_ref(youtube_link)
     
     if video_id:
         # Show processing message
-        st.markdown('<div class="processing-message">🔄 Processing your request...</div>', unsafe_allow_html=True)
+        if profile['processing_message']:
+            st.markdown(f'<div class="processing-message">{profile["processing_message"]}</div>', unsafe_allow_html=True)
         
+        run_trace = start_run(video_id)
         try:
             # Processing indicator
-            with st.spinner('🔄 Processing your request...'):
+            with st.spinner(profile['spinner']):
                 channel_id = get_channel_id(video_id)
                 
                 # Save comments
-                csv_file = save_video_comments_to_csv(video_id)
-                delete_non_matching_csv_files(directory_path, video_id)
+                hold_video(video_id)
+                comments_file = save_video_comments(video_id)
+                get_artifact_cache().evict()
                 
-                st.markdown('<div class="success-message">✅ Comments successfully analyzed!</div>', unsafe_allow_html=True)
+                st.markdown(f'<div class="success-message">{profile["success_message"]}</div>', unsafe_allow_html=True)
                 
-                # Download button
-                col1, col2, col3 = st.columns([1, 1, 1])
-                with col2:
-                    st.download_button(
-                        label="📥 Download Comments CSV",
-                        data=open(csv_file, 'rb').read(),
-                        file_name=os.path.basename(csv_file),
-                        mime="text/csv"
-                    )
+                # Download: comments with their sentiment, built only when the button is clicked
+                show_export_controls(get_artifact_cache(), video_id, comments_file)
                 
                 # Get channel and video info
                 channel_info = get_channel_info(youtube, channel_id)
@@ -588,10 +606,10 @@ if youtube_link:
                 st.markdown('</div>', unsafe_allow_html=True)
                 
                 # Sentiment Analysis Section
-                results = analyze_sentiment(csv_file)
+                results = analyze_sentiment(comments_file, video_id=video_id, backend=backend_name, time_budget=time_budget or None)
                 
                 st.markdown('<div class="glass-card">', unsafe_allow_html=True)
-                st.markdown('<h2 class="section-title">🎭 Sentiment Analysis</h2>', unsafe_allow_html=True)
+                st.markdown(f'<h2 class="section-title">{profile["sentiment_title"]}</h2>', unsafe_allow_html=True)
                 
                 col1, col2, col3 = st.columns(3)
                 
@@ -629,14 +647,65 @@ if youtube_link:
                 
                 with col1:
                     st.markdown('<h3 style="color: white; text-align: center; margin-bottom: 1rem;">📊 Distribution</h3>', unsafe_allow_html=True)
-                    bar_chart(csv_file)
+                    bar_chart(results, title=profile['bar_title'])
                 
                 with col2:
                     st.markdown('<h3 style="color: white; text-align: center; margin-bottom: 1rem;">🥧 Proportion</h3>', unsafe_allow_html=True)
-                    plot_sentiment(csv_file)
+                    plot_sentiment(results, title=profile['pie_title'])
+                
+                # Sentiment timeline from the stored rollups, finest readable resolution first
+                timeline = results.get('timeline')
+                if timeline is not None and timeline.total:
+                    st.markdown('<h3 style="color: white; text-align: center; margin-bottom: 1rem;">🕒 Timeline</h3>', unsafe_allow_html=True)
+                    first = default_level(timeline)
+                    levels = [first] + [level for level in BUCKETS if level != first]
+                    for tab, level in zip(st.tabs([f"Per {level}" for level in levels]), levels):
+                        with tab:
+                            plot_timeline(timeline, level)
                 
                 st.markdown('</div>', unsafe_allow_html=True)
                 
+                # Changes since earlier analyses of this video
+                if results.get('snapshot_id') is not None:
+                    st.markdown('<div class="glass-card">', unsafe_allow_html=True)
+                    st.markdown('<h2 class="section-title">📉 Sentiment Drift</h2>', unsafe_allow_html=True)
+                    show_drift(video_id)
+                    st.markdown('</div>', unsafe_allow_html=True)
+                
+                # Most mentioned terms and phrases per sentiment
+                keywords = results.get('keywords')
+                if keywords is not None and not keywords.empty:
+                    st.markdown('<div class="glass-card">', unsafe_allow_html=True)
+                    st.markdown('<h2 class="section-title">🗣️ What Commenters Say</h2>', unsafe_allow_html=True)
+                    show_keywords(keywords)
+                    st.markdown('</div>', unsafe_allow_html=True)
+                
+                # Who is commenting: accounts behind the most negative comments
+                if results.get('authors') is not None and len(results['authors']):
+                    st.markdown('<div class="glass-card">', unsafe_allow_html=True)
+                    st.markdown('<h2 class="section-title">👥 Commenters</h2>', unsafe_allow_html=True)
+                    show_author_analytics(results['authors'])
+                    st.markdown('</div>', unsafe_allow_html=True)
+                
+                # Live watch: new comments only, merged into running totals
+                if watch_live:
+                    st.markdown('<div class="glass-card">', unsafe_allow_html=True)
+                    st.markdown('<h2 class="section-title">🔴 Live Comments</h2>', unsafe_allow_html=True)
+                    show_live_watch(video_id, comments_file, results, backend=backend_name)
+                    st.markdown('</div>', unsafe_allow_html=True)
+                
+                # Individual comments with their labels, one server-side page at a time
+                st.markdown('<div class="glass-card">', unsafe_allow_html=True)
+                st.markdown('<h2 class="section-title">📋 Comment Results</h2>', unsafe_allow_html=True)
+                show_results_table(video_id)
+                st.markdown('</div>', unsafe_allow_html=True)
+                
+                # Full-text search over this video's (or every stored video's) comments
+                st.markdown('<div class="glass-card">', unsafe_allow_html=True)
+                st.markdown('<h2 class="section-title">🔎 Search Comments</h2>', unsafe_allow_html=True)
+                show_comment_search(video_id)
+                st.markdown('</div>', unsafe_allow_html=True)
+                
                 # Channel Description Section
                 if channel_info["channel_description"]:
                     st.markdown('<div class="glass-card">', unsafe_allow_html=True)
@@ -646,122 +715,132 @@ if youtube_link:
                 
         except Exception as e:
             st.markdown(f'<div class="error-message">❌ Error: {str(e)}</div>', unsafe_allow_html=True)
+        finally:
+            st.session_state['last_run_trace'] = finish_run(run_trace).to_dict()
+    elif channel_ref:
+        # Channel mode: latest uploads analyzed in parallel, rows stream in as videos finish
+        run_trace = start_run(channel_ref[1])
+        try:
+            st.markdown('<div class="glass-card">', unsafe_allow_html=True)
+            st.markdown('<h2 class="section-title">📺 Channel Videos</h2>', unsafe_allow_html=True)
+            channel, rows, aggregates = analyze_channel(channel_ref, backend=backend_name, time_budget=time_budget or None,
+                                                        max_videos=int(max_channel_videos))
+            st.markdown('</div>', unsafe_allow_html=True)
+            
+            if aggregates['total_comments']:
+                st.markdown('<div class="glass-card">', unsafe_allow_html=True)
+                st.markdown(f'<h2 class="section-title">🎯 {channel["channel_title"]}: Channel Sentiment</h2>', unsafe_allow_html=True)
+                
+                for column, (css, icon, key, label) in zip(st.columns(3), [
+                    ('sentiment-positive', '😊', 'num_positive', 'Positive'),
+                    ('sentiment-negative', '😠', 'num_negative', 'Negative'),
+                    ('sentiment-neutral', '😐', 'num_neutral', 'Neutral'),
+                ]):
+                    with column:
+                        st.markdown(f'''
+                        <div class="metric-card {css}">
+                            <div class="metric-value">{icon} {aggregates[key]}</div>
+                            <div class="metric-label">{label}</div>
+                        </div>
+                        ''', unsafe_allow_html=True)
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    bar_chart(aggregates, title=profile['bar_title'])
+                with col2:
+                    plot_sentiment(aggregates, title=profile['pie_title'])
+                st.markdown('</div>', unsafe_allow_html=True)
+                
+                # Terms and phrases across the channel, merged from each video's summaries
+                if not aggregates['keywords'].empty:
+                    st.markdown('<div class="glass-card">', unsafe_allow_html=True)
+                    st.markdown('<h2 class="section-title">🗣️ What Commenters Say</h2>', unsafe_allow_html=True)
+                    show_keywords(aggregates['keywords'])
+                    st.markdown('</div>', unsafe_allow_html=True)
+                
+                # Commenters across the channel's videos
+                if len(aggregates['authors']):
+                    st.markdown('<div class="glass-card">', unsafe_allow_html=True)
+                    st.markdown('<h2 class="section-title">👥 Commenters</h2>', unsafe_allow_html=True)
+                    show_author_analytics(aggregates['authors'])
+                    st.markdown('</div>', unsafe_allow_html=True)
+        except Exception as e:
+            st.markdown(f'<div class="error-message">❌ Error: {str(e)}</div>', unsafe_allow_html=True)
+        finally:
+            st.session_state['last_run_trace'] = finish_run(run_trace).to_dict()
     else:
         st.markdown('<div class="error-message">❌ Invalid YouTube link. Please check the URL format.</div>', unsafe_allow_html=True)
 else:
     # Welcome Section - Only show when no URL is entered
     st.markdown('<div class="glass-card">', unsafe_allow_html=True)
-    st.markdown('<h2 class="section-title">🚀 Welcome to YouTube Sentiment Pro</h2>', unsafe_allow_html=True)
-    st.markdown('''
+    st.markdown(f'<h2 class="section-title">{profile["welcome_title"]}</h2>', unsafe_allow_html=True)
+    st.markdown(f'''
     <p style="color: rgba(255,255,255,0.9); font-size: 1.1rem; line-height: 1.6; text-align: center;">
-    Experience the future of comment analysis with our <strong>advanced multilingual AI</strong> sentiment engine. 
-    Simply paste a YouTube link above to get started with beautiful, 
-    insightful analytics powered by cutting-edge transformer models.
+    {profile["welcome_html"]}
     </p>
     ''', unsafe_allow_html=True)
     st.markdown('</div>', unsafe_allow_html=True)
     
-    # Enhanced Features Section
-    st.markdown('<div class="glass-card">', unsafe_allow_html=True)
-    st.markdown('<h2 class="section-title">✨ Advanced AI Features</h2>', unsafe_allow_html=True)
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.markdown('''
-        <div class="metric-card">
-            <div style="font-size: 2.5rem; margin-bottom: 1rem;">🌍</div>
-            <div class="metric-label">Multilingual Support</div>
-            <p style="color: rgba(255,255,255,0.7); font-size: 0.9rem; margin-top: 0.5rem;">Supports Hindi, English, Spanish, French, German, and 100+ languages</p>
-        </div>
-        ''', unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown('''
-        <div class="metric-card">
-            <div style="font-size: 2.5rem; margin-bottom: 1rem;">🤖</div>
-            <div class="metric-label">AI Transformer Models</div>
-            <p style="color: rgba(255,255,255,0.7); font-size: 0.9rem; margin-top: 0.5rem;">Advanced BERT & RoBERTa models trained on social media data</p>
-        </div>
-        ''', unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown('''
-        <div class="metric-card">
-            <div style="font-size: 2.5rem; margin-bottom: 1rem;">😊</div>
-            <div class="metric-label">Emoji Intelligence</div>
-            <p style="color: rgba(255,255,255,0.7); font-size: 0.9rem; margin-top: 0.5rem;">Advanced emoji processing and context understanding</p>
-        </div>
-        ''', unsafe_allow_html=True)
-    
-    st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Technical Capabilities Section
-    st.markdown('<div class="glass-card">', unsafe_allow_html=True)
-    st.markdown('<h2 class="section-title">🔧 Technical Capabilities</h2>', unsafe_allow_html=True)
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown('''
-        <div class="metric-card">
-            <div style="font-size: 2.5rem; margin-bottom: 1rem;">📊</div>
-            <div class="metric-label">Enhanced Analytics</div>
-            <p style="color: rgba(255,255,255,0.7); font-size: 0.9rem; margin-top: 0.5rem;">Up to 1200+ comments analyzed with confidence scoring and language detection</p>
-        </div>
-        ''', unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown('''
-        <div class="metric-card">
-            <div style="font-size: 2.5rem; margin-bottom: 1rem;">🎯</div>
-            <div class="metric-label">Smart Processing</div>
-            <p style="color: rgba(255,255,255,0.7); font-size: 0.9rem; margin-top: 0.5rem;">Automatic language detection, translation, and context-aware sentiment analysis</p>
-        </div>
-        ''', unsafe_allow_html=True)
-    
-    st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Quick Start Guide
-    st.markdown('<div class="glass-card">', unsafe_allow_html=True)
-    st.markdown('<h2 class="section-title">🎬 Quick Start Guide</h2>', unsafe_allow_html=True)
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.markdown('''
-        <div class="metric-card">
-            <div style="font-size: 2rem; margin-bottom: 1rem;">1️⃣</div>
-            <div class="metric-label">Paste YouTube URL</div>
-            <p style="color: rgba(255,255,255,0.7); font-size: 0.9rem; margin-top: 0.5rem;">Copy any YouTube video link and paste it in the input above</p>
-        </div>
-        ''', unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown('''
-        <div class="metric-card">
-            <div style="font-size: 2rem; margin-bottom: 1rem;">2️⃣</div>
-            <div class="metric-label">AI Analysis</div>
-            <p style="color: rgba(255,255,255,0.7); font-size: 0.9rem; margin-top: 0.5rem;">Our advanced AI models analyze comments in multiple languages</p>
-        </div>
-        ''', unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown('''
-        <div class="metric-card">
-            <div style="font-size: 2rem; margin-bottom: 1rem;">3️⃣</div>
-            <div class="metric-label">Get Insights</div>
-            <p style="color: rgba(255,255,255,0.7); font-size: 0.9rem; margin-top: 0.5rem;">View beautiful charts, statistics, and download results as CSV</p>
-        </div>
-        ''', unsafe_allow_html=True)
-    
-    st.markdown('</div>', unsafe_allow_html=True)
+    # Feature Sections
+    for section_title, icon_size, cards in profile['sections']:
+        st.markdown('<div class="glass-card">', unsafe_allow_html=True)
+        st.markdown(f'<h2 class="section-title">{section_title}</h2>', unsafe_allow_html=True)
         
+        for column, (icon, label, text) in zip(st.columns(len(cards)), cards):
+            with column:
+                st.markdown(f'''
+                <div class="metric-card">
+                    <div style="font-size: {icon_size}; margin-bottom: 1rem;">{icon}</div>
+                    <div class="metric-label">{label}</div>
+                    <p style="color: rgba(255,255,255,0.7); font-size: 0.9rem; margin-top: 0.5rem;">{text}</p>
+                </div>
+                ''', unsafe_allow_html=True)
         
-  
-    
-    
-        
-
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    # Search everything analyzed so far, without pasting a link first
+    if get_comment_index().stats()['comments']:
+        st.markdown('<div class="glass-card">', unsafe_allow_html=True)
+        st.markdown('<h2 class="section-title">🔎 Search Stored Comments</h2>', unsafe_allow_html=True)
+        show_comment_search()
+        st.markdown('</div>', unsafe_allow_html=True)
 
+# Stage timings of the last analysis, added to the sidebar once the run has finished
+if show_timings:
+    with st.sidebar:
+        st.markdown("### 📈 Stage Timings")
+        last_trace = st.session_state.get('last_run_trace')
+        if last_trace:
+            st.write(f"🎬 {last_trace['name']} — {last_trace['wall_seconds']:.2f}s total")
+            st.dataframe([
+                {
+                    'Stage': stage,
+                    'Calls': timing['calls'],
+                    'Items': timing['items'],
+                    'Total (s)': round(timing['total_seconds'], 3),
+                    'p50 (ms)': round(timing['p50_seconds'] * 1000, 1),
+                    'p95 (ms)': round(timing['p95_seconds'] * 1000, 1),
+                }
+                for stage, timing in sorted(last_trace['stages'].items(), key=lambda item: -item[1]['total_seconds'])
+            ], hide_index=True)
+            if last_trace['profile']:
+                st.write("🔥 Hotspots")
+                st.dataframe(last_trace['profile']['hotspots'][:10], hide_index=True)
+        else:
+            st.write("⏳ Analyze a video to see timings")
 
+        st.markdown("### 🤖 Models")
+        loaded_models = [stats for stats in model_stats() if stats['loads']]
+        if loaded_models:
+            st.dataframe([
+                {
+                    'Backend': stats['backend'],
+                    'Status': '✅ loaded' if stats['loaded'] else '💤 unloaded',
+                    'Load (s)': round(stats['load_seconds'], 2),
+                    'Memory (MB)': round(stats['resident_mb'], 1),
+                    'Idle (s)': round(stats['idle_seconds']) if stats['idle_seconds'] is not None else None,
+                }
+                for stats in loaded_models
+            ], hide_index=True)
+        else:
+            st.write("📭 No models loaded yet")
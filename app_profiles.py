@@ -0,0 +1,94 @@
+# UI text for each deployment tier. The page layout is shared; only the
+# branding and the welcome copy differ between the editions.
+
+URL_FORMATS_HTML = """
+            <h4 style="color: rgba(255, 255, 255, 0.9); font-size: 1.1rem; margin-bottom: 1rem; font-weight: 600;">✨ Supported URL formats:</h4>
+            <p style="color: rgba(255, 255, 255, 0.7); font-size: 0.9rem; margin: 0.5rem 0; font-family: 'Monaco', monospace;">https://www.youtube.com/watch?v=VIDEO_ID</p>
+            <p style="color: rgba(255, 255, 255, 0.7); font-size: 0.9rem; margin: 0.5rem 0; font-family: 'Monaco', monospace;">https://youtu.be/VIDEO_ID</p>
+            <p style="color: rgba(255, 255, 255, 0.7); font-size: 0.9rem; margin: 0.5rem 0; font-family: 'Monaco', monospace;">youtube.com/watch?v=VIDEO_ID</p>
+            <p style="color: rgba(255, 255, 255, 0.7); font-size: 0.9rem; margin: 0.5rem 0; font-family: 'Monaco', monospace;">youtube.com/@HANDLE (whole channel)</p>
+""".strip()
+
+FAST_FEATURES_HTML = """
+            <h4 style="color: rgba(255, 255, 255, 0.9); font-size: 1.1rem; margin-bottom: 1rem; font-weight: 600;">⚡ Fast & Lightweight Features:</h4>
+            <p style="color: rgba(255,255,255,0.7); font-size: 0.9rem; margin: 0.5rem 0;">• No heavy AI model downloads (saves bandwidth & storage)</p>
+            <p style="color: rgba(255,255,255,0.7); font-size: 0.9rem; margin: 0.5rem 0;">• Lightning-fast analysis with VADER sentiment</p>
+            <p style="color: rgba(255,255,255,0.7); font-size: 0.9rem; margin: 0.5rem 0;">• Basic emoji processing for better accuracy</p>
+            <p style="color: rgba(255,255,255,0.7); font-size: 0.9rem; margin: 0.5rem 0;">• Up to 1200+ comments analyzed</p>
+""".strip()
+
+PROFILES = {
+    'advanced': {
+        'page_title': 'YouTube Sentiment Pro',
+        'page_icon': '🎬',
+        'about': "# YouTube Sentiment Analysis Pro\nModern AI-powered sentiment analysis for YouTube comments with stunning glassmorphism UI!",
+        'title_html': '🎬 YouTube Sentiment Pro',
+        'subtitle': 'AI-Powered Comment Analysis with Stunning Insights',
+        'hero_subtitle': 'Paste any YouTube video URL to analyze its comments with AI',
+        'intro_html': URL_FORMATS_HTML,
+        'processing_message': '🔄 Processing your request...',
+        'spinner': '🔄 Processing your request...',
+        'success_message': '✅ Comments successfully analyzed!',
+        'sentiment_title': '🎭 Sentiment Analysis',
+        'bar_title': '📊 Advanced AI Sentiment Analysis',
+        'pie_title': '🥧 Multilingual Sentiment Breakdown',
+        'welcome_title': '🚀 Welcome to YouTube Sentiment Pro',
+        'welcome_html': """
+    Experience the future of comment analysis with our <strong>advanced multilingual AI</strong> sentiment engine.
+    Simply paste a YouTube link above to get started with beautiful,
+    insightful analytics powered by cutting-edge transformer models.
+""".strip(),
+        'sections': [
+            ('✨ Advanced AI Features', '2.5rem', [
+                ('🌍', 'Multilingual Support', 'Supports Hindi, English, Spanish, French, German, and 100+ languages'),
+                ('🤖', 'AI Transformer Models', 'Advanced BERT & RoBERTa models trained on social media data'),
+                ('😊', 'Emoji Intelligence', 'Advanced emoji processing and context understanding'),
+            ]),
+            ('🔧 Technical Capabilities', '2.5rem', [
+                ('📊', 'Enhanced Analytics', 'Up to 1200+ comments analyzed with confidence scoring and language detection'),
+                ('🎯', 'Smart Processing', 'Automatic language detection, translation, and context-aware sentiment analysis'),
+            ]),
+            ('🎬 Quick Start Guide', '2rem', [
+                ('1️⃣', 'Paste YouTube URL', 'Copy any YouTube video link and paste it in the input above'),
+                ('2️⃣', 'AI Analysis', 'Our advanced AI models analyze comments in multiple languages'),
+                ('3️⃣', 'Get Insights', 'View beautiful charts, statistics, and download results as CSV'),
+            ]),
+        ],
+    },
+    'lightweight': {
+        'page_title': 'YouTube Sentiment Pro - Fast Edition',
+        'page_icon': '⚡',
+        'about': "# YouTube Sentiment Analysis Pro - Fast Edition\nLightweight sentiment analysis for YouTube comments with beautiful glassmorphism UI!",
+        'title_html': '⚡ YouTube Sentiment Pro - Fast Edition <span class="fast-badge">Lightning Fast</span>',
+        'subtitle': 'Lightweight sentiment analysis without heavy downloads - Perfect for slower PCs!',
+        'hero_subtitle': 'Fast analysis with no heavy AI model downloads',
+        'intro_html': FAST_FEATURES_HTML,
+        'processing_message': None,
+        'spinner': '⚡ Fast processing your request...',
+        'success_message': '⚡ Comments processed lightning fast!',
+        'sentiment_title': '⚡ Lightning Fast Sentiment Analysis',
+        'bar_title': '📊 Lightweight Sentiment Analysis',
+        'pie_title': '🥧 Fast Sentiment Breakdown',
+        'welcome_title': '⚡ Welcome to Fast Edition',
+        'welcome_html': """
+    <strong>Perfect for slower PCs!</strong> This lightweight version provides excellent sentiment analysis
+    without downloading heavy AI models. Fast processing, beautiful results, minimal system load.
+""".strip(),
+        'sections': [
+            ('⚡ Lightning Fast Features', '2.5rem', [
+                ('🚀', 'No Heavy Downloads', 'Uses lightweight VADER - no 600MB+ AI models'),
+                ('😊', 'Smart Emoji Processing', 'Converts 😊😢😡 to meaningful text for better analysis'),
+            ]),
+            ('💡 Why Choose Fast Edition?', '2rem', [
+                ('💾', 'Saves Storage', 'No 600MB+ AI model downloads'),
+                ('🌐', 'Saves Bandwidth', 'Perfect for limited internet connections'),
+                ('⚡', 'Lightning Speed', 'Instant analysis, no waiting for models to load'),
+            ]),
+        ],
+    },
+}
+
+
+def profile_for_backend(backend_name):
+    """The lightweight UI for VADER-only deployments, the advanced UI otherwise"""
+    return PROFILES['lightweight'] if backend_name == 'vader' else PROFILES['advanced']
@@ -0,0 +1,394 @@
+import os
+import json
+import time
+import uuid
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+import streamlit as st
+from datetime import datetime
+import metrics
+
+# Cross-process manifest lock (forked workers share the cache directory); POSIX only
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+# Cache location and eviction limits (override with environment variables)
+CACHE_DIR = os.environ.get('COMMENT_CACHE_DIR', os.path.join(os.getcwd(), '.comment_cache'))
+MAX_CACHE_MB = float(os.environ.get('COMMENT_CACHE_MAX_MB', 500))
+MAX_CACHE_AGE_HOURS = float(os.environ.get('COMMENT_CACHE_MAX_AGE_HOURS', 24))
+LEASE_SECONDS = 2 * 3600  # A session reference expires if not renewed within this window
+LEASE_RENEW_SECONDS = LEASE_SECONDS / 4  # Reruns only rewrite the manifest for leases older than this
+TOUCH_INTERVAL = 60  # Only persist last-access updates this often
+
+MANIFEST_NAME = 'manifest.json'
+LOCK_NAME = 'manifest.lock'
+BLOB_DIR = 'blobs'
+
+
+def atomic_write(path, writer, mode='wb', **open_kwargs):
+    """
+    Write a file atomically: stream into a temp file in the same directory,
+    fsync it, then os.replace it over the destination.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix='.tmp_', dir=directory)
+    try:
+        with open(fd, mode, **open_kwargs) as handle:
+            writer(handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return path
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def artifact_digest(path):
+    """
+    SHA-256 of a file without reading it when it is a cache blob (blobs are
+    named by their content hash); other files are hashed.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if os.path.basename(os.path.dirname(path)) == BLOB_DIR and len(stem) == 64 \
+            and all(c in '0123456789abcdef' for c in stem):
+        return stem
+    return file_digest(path)
+
+
+class ArtifactCache:
+    """
+    Content-addressed, per-video artifact cache.
+
+    Artifacts are stored once under blobs/<sha256><ext> and indexed by
+    (video_id, name) in a manifest that records size and age metadata.
+    Sessions hold leases on the videos they are showing so eviction never
+    removes files another session is still using; blobs replaced by newer
+    content are only deleted by eviction, under the same lease rules.
+    Pinned artifacts never expire by age and go last under size pressure.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_CACHE_MB * 1024 * 1024,
+                 max_age_seconds=MAX_CACHE_AGE_HOURS * 3600):
+        self.root = root
+        self.blob_dir = os.path.join(root, BLOB_DIR)
+        self.manifest_path = os.path.join(root, MANIFEST_NAME)
+        self.lock_path = os.path.join(root, LOCK_NAME)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_handle = None
+        self._manifest = {'version': 1, 'artifacts': {}, 'refs': {}, 'orphans': {}}
+        self._manifest_mtime = None
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._load()
+
+    @contextmanager
+    def _locked(self):
+        """
+        Hold the manifest for a read-modify-write: the thread lock, plus an
+        exclusive file lock against other processes (taken once per nesting).
+        """
+        with self._lock:
+            self._lock_depth += 1
+            try:
+                if self._lock_depth == 1 and FCNTL_AVAILABLE:
+                    self._lock_handle = open(self.lock_path, 'a')
+                    fcntl.flock(self._lock_handle, fcntl.LOCK_EX)
+                self._load()
+                yield
+            finally:
+                if self._lock_depth == 1 and self._lock_handle is not None:
+                    fcntl.flock(self._lock_handle, fcntl.LOCK_UN)
+                    self._lock_handle.close()
+                    self._lock_handle = None
+                self._lock_depth -= 1
+
+    def _load(self):
+        """Reload the manifest if another process replaced it"""
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._manifest_mtime:
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as handle:
+                manifest = json.load(handle)
+            manifest.setdefault('artifacts', {})
+            manifest.setdefault('refs', {})
+            manifest.setdefault('orphans', {})
+            self._manifest = manifest
+            self._manifest_mtime = mtime
+        except (OSError, ValueError):
+            # A corrupt manifest is rebuilt on the next save
+            pass
+
+    def _save(self):
+        data = json.dumps(self._manifest, indent=2).encode('utf-8')
+        atomic_write(self.manifest_path, lambda handle: handle.write(data))
+        self._manifest_mtime = os.stat(self.manifest_path).st_mtime_ns
+        artifacts = self._manifest['artifacts'].values()
+        metrics.cache_artifacts.set(len(artifacts))
+        metrics.cache_bytes.set(sum(entry['size'] for entry in artifacts))
+
+    @staticmethod
+    def _key(video_id, name):
+        return f"{video_id}/{name}"
+
+    def write_with(self, video_id, name, writer, mode='wb', **open_kwargs):
+        """
+        Stream an artifact into the cache through writer(file_handle) and
+        return the path of the stored blob.
+        """
+        ext = os.path.splitext(name)[1]
+        staging = os.path.join(self.blob_dir, f".staging_{os.getpid()}_{threading.get_ident()}{ext}")
+        atomic_write(staging, writer, mode=mode, **open_kwargs)
+        metrics.cache_written_bytes.inc(os.path.getsize(staging))
+        digest = file_digest(staging)
+        blob_path = os.path.join(self.blob_dir, f"{digest}{ext}")
+        # Under the lock, so eviction can't delete the blob between the check and the registration
+        with self._locked():
+            # Identical content is already stored: drop the duplicate
+            if os.path.exists(blob_path):
+                os.remove(staging)
+            else:
+                os.replace(staging, blob_path)
+            return self._register(video_id, name, digest, blob_path)
+
+    def write_bytes(self, video_id, name, data):
+        """Store an in-memory artifact"""
+        return self.write_with(video_id, name, lambda handle: handle.write(data))
+
+    def link(self, video_id, name, source_name):
+        """
+        Register an existing artifact's blob under a second name (no copy), so
+        it outlives the source being replaced. Returns the path, or None if
+        the source isn't cached.
+        """
+        with self._locked():
+            entry = self.get(video_id, source_name)
+            if entry is None:
+                return None
+            return self._register(video_id, name, entry['digest'], os.path.join(self.root, entry['path']))
+
+    def _register(self, video_id, name, digest, blob_path):
+        now = time.time()
+        with self._locked():
+            previous = self._manifest['artifacts'].get(self._key(video_id, name))
+            self._manifest['artifacts'][self._key(video_id, name)] = {
+                'video_id': video_id,
+                'name': name,
+                'digest': digest,
+                'path': os.path.relpath(blob_path, self.root),
+                'size': os.path.getsize(blob_path),
+                'created': now,
+                'last_access': now,
+                'pinned': bool(previous and previous.get('pinned'))
+            }
+            # Another session may still be reading the replaced blob: leave it to evict()
+            if previous and previous['digest'] != digest:
+                self._manifest['orphans'][previous['path']] = {'video_id': video_id, 'since': now}
+            self._save()
+        return blob_path
+
+    def pin(self, video_id, name):
+        """
+        Exempt an artifact (and whatever later replaces it under the same name)
+        from age eviction. Returns False if it isn't cached.
+        """
+        with self._locked():
+            entry = self._manifest['artifacts'].get(self._key(video_id, name))
+            if entry is None:
+                return False
+            if not entry.get('pinned'):
+                entry['pinned'] = True
+                self._save()
+            return True
+
+    def get(self, video_id, name):
+        """Return the manifest entry for an artifact (or None) and mark it as used"""
+        with self._locked():
+            entry = self._manifest['artifacts'].get(self._key(video_id, name))
+            if entry is None:
+                metrics.cache_requests.inc(result='miss')
+                return None
+            if not os.path.exists(os.path.join(self.root, entry['path'])):
+                del self._manifest['artifacts'][self._key(video_id, name)]
+                self._save()
+                metrics.cache_requests.inc(result='miss')
+                return None
+            metrics.cache_requests.inc(result='hit')
+            now = time.time()
+            if now - entry['last_access'] > TOUCH_INTERVAL:
+                entry['last_access'] = now
+                self._save()
+            return dict(entry)
+
+    def path_for(self, video_id, name):
+        """Absolute path of a cached artifact, or None if it is not cached"""
+        entry = self.get(video_id, name)
+        return os.path.join(self.root, entry['path']) if entry else None
+
+    def digest_for(self, video_id, name):
+        """Content hash of a cached artifact, or None"""
+        entry = self.get(video_id, name)
+        return entry['digest'] if entry else None
+
+    def acquire(self, video_id, holder):
+        """Take (or renew) a lease on a video's artifacts for a session"""
+        # Every rerun calls this: a recent lease needs no manifest write
+        with self._lock:
+            self._load()
+            taken = self._manifest['refs'].get(video_id, {}).get(holder)
+            if taken is not None and time.time() - taken < LEASE_RENEW_SECONDS:
+                return
+        with self._locked():
+            self._manifest['refs'].setdefault(video_id, {})[holder] = time.time()
+            self._save()
+
+    def release(self, video_id, holder):
+        """Drop a session's lease on a video"""
+        with self._locked():
+            holders = self._manifest['refs'].get(video_id, {})
+            if holders.pop(holder, None) is not None:
+                if not holders:
+                    self._manifest['refs'].pop(video_id, None)
+                self._save()
+
+    def refcount(self, video_id):
+        """Number of live (non-expired) leases on a video"""
+        now = time.time()
+        holders = self._manifest['refs'].get(video_id, {})
+        return sum(1 for taken in holders.values() if now - taken < LEASE_SECONDS)
+
+    def evict(self, max_bytes=None, max_age_seconds=None):
+        """
+        Evict least-recently-used artifacts until the cache fits the size
+        limit, and drop anything older than the age limit. Videos with live
+        leases are never evicted; pinned artifacts don't age out and are the
+        last to go for size. Returns the evicted manifest keys.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        max_age_seconds = self.max_age_seconds if max_age_seconds is None else max_age_seconds
+        now = time.time()
+        evicted = []
+
+        with self._locked():
+            artifacts = self._manifest['artifacts']
+
+            # Expire stale leases first so crashed sessions don't pin files forever
+            for video_id in list(self._manifest['refs']):
+                holders = self._manifest['refs'][video_id]
+                for holder in [h for h, taken in holders.items() if now - taken >= LEASE_SECONDS]:
+                    del holders[holder]
+                if not holders:
+                    del self._manifest['refs'][video_id]
+
+            candidates = sorted(
+                (entry for entry in artifacts.values() if self.refcount(entry['video_id']) == 0),
+                key=lambda entry: (entry.get('pinned', False), entry['last_access'])
+            )
+            total = sum(entry['size'] for entry in artifacts.values())
+
+            for entry in candidates:
+                too_old = not entry.get('pinned') and now - entry['last_access'] > max_age_seconds
+                too_big = total > max_bytes
+                if not (too_old or too_big):
+                    continue
+                key = self._key(entry['video_id'], entry['name'])
+                del artifacts[key]
+                total -= entry['size']
+                evicted.append(key)
+
+            # Replaced blobs go once their video has no live lease
+            orphans = self._manifest['orphans']
+            released = [path for path, orphan in orphans.items() if self.refcount(orphan['video_id']) == 0]
+            for path in released:
+                del orphans[path]
+
+            self._save()
+            for entry in candidates:
+                if self._key(entry['video_id'], entry['name']) in evicted:
+                    self._remove_orphan_blob(entry['path'])
+            for path in released:
+                self._remove_orphan_blob(path)
+
+        metrics.cache_evictions.inc(len(evicted))
+        return evicted
+
+    def _remove_orphan_blob(self, relative_path):
+        """Delete a blob once no manifest entry points at it"""
+        if any(entry['path'] == relative_path for entry in self._manifest['artifacts'].values()):
+            return
+        try:
+            os.remove(os.path.join(self.root, relative_path))
+        except FileNotFoundError:
+            pass
+
+    def entries(self):
+        """Manifest entries, most recently used first (no directory scans)"""
+        with self._locked():
+            now = time.time()
+            rows = []
+            for entry in self._manifest['artifacts'].values():
+                row = dict(entry)
+                row['age_seconds'] = now - entry['created']
+                row['refcount'] = self.refcount(entry['video_id'])
+                row['modified'] = datetime.fromtimestamp(entry['created']).strftime("%Y-%m-%d %H:%M:%S")
+                rows.append(row)
+        return sorted(rows, key=lambda row: row['last_access'], reverse=True)
+
+    def stats(self):
+        """Totals for the sidebar"""
+        entries = self.entries()
+        return {
+            'artifacts': len(entries),
+            'videos': len({entry['video_id'] for entry in entries}),
+            'size': sum(entry['size'] for entry in entries),
+            'max_bytes': self.max_bytes
+        }
+
+
+@st.cache_resource
+def get_artifact_cache():
+    """One cache instance per server process, shared by all sessions"""
+    return ArtifactCache()
+
+
+def session_holder_id():
+    """Stable identifier for the current Streamlit session"""
+    if 'cache_holder_id' not in st.session_state:
+        st.session_state['cache_holder_id'] = uuid.uuid4().hex[:16]
+    return st.session_state['cache_holder_id']
+
+
+def hold_video(video_id):
+    """
+    Lease the current session's video and release the one it showed before,
+    so eviction only ever touches videos nobody is looking at.
+    """
+    cache = get_artifact_cache()
+    holder = session_holder_id()
+    previous = st.session_state.get('cache_held_video')
+    if previous and previous != video_id:
+        cache.release(previous, holder)
+    cache.acquire(video_id, holder)
+    st.session_state['cache_held_video'] = video_id
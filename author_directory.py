@@ -0,0 +1,166 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import streamlit as st
+from googleapiclient.errors import HttpError
+from YoutubeCommentScrapper import youtube, QuotaBudget, QuotaBudgetExceeded, execute_within
+from artifact_cache import CACHE_DIR
+from authors import concentration
+from instrumentation import span
+from sentiment_backends import config_value
+
+# Commenter channel metadata (name, subscribers, account age) from
+# channels.list, 50 ids per call. It rarely changes, so it is cached in SQLite
+# for weeks, including ids the API no longer knows. Only the most active
+# commenters are looked up and each view has a small quota cap, so a video with
+# thousands of commenters costs a handful of units once and nothing after.
+
+AUTHOR_CACHE_PATH = config_value('AUTHOR_CACHE_PATH') or os.path.join(CACHE_DIR, 'authors.db')
+AUTHOR_CACHE_TTL_DAYS = float(config_value('AUTHOR_CACHE_TTL_DAYS', 30))
+AUTHOR_LOOKUP_LIMIT = int(config_value('AUTHOR_LOOKUP_LIMIT', 200))  # Most active commenters looked up per view
+AUTHOR_QUOTA_BUDGET = int(config_value('AUTHOR_QUOTA_BUDGET', 5))  # channels.list units per view
+CHANNELS_PER_CALL = 50  # channels.list id limit
+TOP_AUTHORS = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS authors (
+    channel_id TEXT PRIMARY KEY,
+    metadata TEXT,
+    fetched REAL NOT NULL
+);
+"""
+
+
+def channel_metadata(item):
+    """The fields of a channels.list item shown next to a commenter"""
+    snippet = item.get('snippet', {})
+    statistics = item.get('statistics', {})
+    hidden = statistics.get('hiddenSubscriberCount', False)
+    return {
+        'title': snippet.get('title', ''),
+        'handle': snippet.get('customUrl', ''),
+        'created': (snippet.get('publishedAt') or '')[:10],
+        'country': snippet.get('country', ''),
+        'subscribers': None if hidden or 'subscriberCount' not in statistics else int(statistics['subscriberCount']),
+        'videos': int(statistics['videoCount']) if 'videoCount' in statistics else None,
+    }
+
+
+class AuthorDirectory:
+    """Long-lived cache of commenter channel metadata, filled by batched channels.list calls"""
+
+    def __init__(self, path=AUTHOR_CACHE_PATH, ttl_days=AUTHOR_CACHE_TTL_DAYS):
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.executescript(SCHEMA)
+
+    def cached(self, channel_ids):
+        """{channel id: metadata, or None if the API didn't know it} for fresh entries"""
+        found = {}
+        oldest = time.time() - self.ttl
+        channel_ids = list(channel_ids)
+        with self._lock:
+            for start in range(0, len(channel_ids), 500):
+                chunk = channel_ids[start:start + 500]
+                rows = self._connection.execute(
+                    f"SELECT channel_id, metadata FROM authors WHERE fetched >= ? "
+                    f"AND channel_id IN ({','.join('?' * len(chunk))})", [oldest, *chunk]
+                ).fetchall()
+                found.update({channel_id: json.loads(metadata) if metadata else None for channel_id, metadata in rows})
+        return found
+
+    def store(self, metadata):
+        """Cache {channel id: metadata or None}"""
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO authors (channel_id, metadata, fetched) VALUES (?, ?, ?) "
+                "ON CONFLICT (channel_id) DO UPDATE SET metadata = excluded.metadata, fetched = excluded.fetched",
+                [(channel_id, json.dumps(value) if value else None, now) for channel_id, value in metadata.items()]
+            )
+
+    def lookup(self, channel_ids, budget):
+        """
+        Metadata for the given channels: cached entries first, the rest fetched
+        50 per call while the budget lasts and the API answers. Returns
+        (metadata by id, lookup stats); an API error leaves the remaining
+        channels counted under 'errors' with the HTTP status in 'error_status'.
+        """
+        channel_ids = list(dict.fromkeys(channel_id for channel_id in channel_ids if str(channel_id).startswith('UC')))
+        metadata = self.cached(channel_ids)
+        stats = {'cached': len(metadata), 'fetched': 0, 'calls': 0, 'skipped': 0, 'errors': 0, 'error_status': None}
+        missing = [channel_id for channel_id in channel_ids if channel_id not in metadata]
+        for start in range(0, len(missing), CHANNELS_PER_CALL):
+            chunk = missing[start:start + CHANNELS_PER_CALL]
+            try:
+                with span('author_lookup', len(chunk)):
+                    response = execute_within(budget, youtube.channels().list(
+                        part='snippet,statistics', id=','.join(chunk), maxResults=CHANNELS_PER_CALL
+                    ), 'channels.list')
+            except QuotaBudgetExceeded:
+                stats['skipped'] = len(missing) - start
+                break
+            except HttpError as error:
+                stats['errors'] = len(missing) - start
+                stats['error_status'] = error.resp.status
+                break
+            fetched = {channel_id: None for channel_id in chunk}
+            fetched.update({item['id']: channel_metadata(item) for item in response.get('items', [])})
+            self.store(fetched)
+            metadata.update(fetched)
+            stats['fetched'] += len(chunk)
+            stats['calls'] += 1
+        return {channel_id: value for channel_id, value in metadata.items() if value}, stats
+
+
+@st.cache_resource
+def get_author_directory():
+    """The process-wide commenter directory"""
+    return AuthorDirectory()
+
+
+def show_author_analytics(authors, top=TOP_AUTHORS, quota_budget=AUTHOR_QUOTA_BUDGET):
+    """
+    The accounts behind the most negative comments, with their channel details
+    from the directory (looked up in batches within the quota budget).
+    """
+    if authors is None or not len(authors):
+        return
+    ranked = authors.sort_values(['Negative', 'Comments'], ascending=False)
+    budget = QuotaBudget(quota_budget)
+    metadata, stats = get_author_directory().lookup(ranked['AuthorChannelId'].head(AUTHOR_LOOKUP_LIMIT), budget)
+
+    st.caption(
+        f"👥 {len(authors)} commenters · top 5 accounts wrote {concentration(authors, 'Negative'):.0%} of negative "
+        f"and {concentration(authors, 'Comments'):.0%} of all comments"
+    )
+    rows = []
+    for row in ranked.head(top).itertuples(index=False):
+        channel = metadata.get(row.AuthorChannelId, {})
+        rows.append({
+            'Author': row.Author,
+            'Comments': row.Comments,
+            'Negative': row.Negative,
+            'Positive': row.Positive,
+            'Neutral': row.Neutral,
+            'Negative %': round(100 * row.Negative / row.Comments, 1),
+            'Confidence': round(row.ConfidenceSum / row.Comments, 2),
+            'Subscribers': channel.get('subscribers'),
+            'Channel Since': channel.get('created', ''),
+        })
+    st.dataframe(rows, hide_index=True)
+    if stats['calls']:
+        st.caption(f"🔍 Looked up {stats['fetched']} commenter channels in {stats['calls']} calls "
+                   f"({budget.used} quota units), {stats['cached']} from cache")
+    if stats['skipped']:
+        st.caption(f"🚦 {stats['skipped']} commenter channels left for later to stay within {budget.units} quota units")
+    if stats['errors']:
+        st.warning(f"⚠️ Channel lookup failed (API error {stats['error_status']}); "
+                   f"{stats['errors']} commenter channels have no details")
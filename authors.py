@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+from result_batch import SENTIMENT_CODES
+
+# Per-commenter aggregates: how many comments each account wrote and their
+# sentiment mix, so a few accounts behind most of the negativity stand out.
+# Accounts are keyed by authorChannelId since display names change and
+# collide; legacy comments without one fall back to the display name.
+
+AUTHOR_COLUMNS = ['AuthorChannelId', 'Author', 'Comments', 'Positive', 'Negative', 'Neutral', 'ConfidenceSum']
+
+
+def author_frame(comments_df, results):
+    """One row per account, most comments first (comments_df rows line up with results)"""
+    count = len(comments_df)
+    names = comments_df['Username'].fillna('').astype(str) if 'Username' in comments_df.columns else pd.Series([''] * count)
+    if 'AuthorChannelId' in comments_df.columns:
+        ids = comments_df['AuthorChannelId'].astype(object)
+        keys = ids.where(ids.notna() & (ids != ''), names)
+    else:
+        keys = names
+    sentiment = results.sentiment
+    df = pd.DataFrame({
+        'AuthorChannelId': keys.to_numpy(dtype=object),
+        'Author': names.to_numpy(dtype=object),
+        'Comments': np.ones(count, dtype=np.int64),
+        'Positive': (sentiment == SENTIMENT_CODES['positive']).astype(np.int64),
+        'Negative': (sentiment == SENTIMENT_CODES['negative']).astype(np.int64),
+        'Neutral': (sentiment == SENTIMENT_CODES['neutral']).astype(np.int64),
+        'ConfidenceSum': results.confidence.astype(np.float64),
+    })
+    return _combine(df)
+
+
+def merge_author_frames(frames):
+    """Per-account totals across videos"""
+    frames = [frame for frame in frames if frame is not None and len(frame)]
+    if not frames:
+        return pd.DataFrame(columns=AUTHOR_COLUMNS)
+    return _combine(pd.concat(frames, ignore_index=True))
+
+
+def _combine(df):
+    grouped = df.groupby('AuthorChannelId', sort=False).agg(
+        Author=('Author', 'first'), Comments=('Comments', 'sum'), Positive=('Positive', 'sum'),
+        Negative=('Negative', 'sum'), Neutral=('Neutral', 'sum'), ConfidenceSum=('ConfidenceSum', 'sum'),
+    ).reset_index()
+    return grouped.sort_values(['Comments', 'Negative'], ascending=False, ignore_index=True)[AUTHOR_COLUMNS]
+
+
+def concentration(authors, column='Negative', top=5):
+    """Share of all `column` comments written by the `top` accounts with the most of them"""
+    total = authors[column].sum() if len(authors) else 0
+    if not total:
+        return 0.0
+    return float(authors[column].nlargest(top).sum() / total)
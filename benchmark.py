@@ -0,0 +1,271 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+from datetime import datetime
+
+# Keep benchmark artifacts out of the real cache and skip per-run traces. The cache
+# directory is only named here (modules read it on import) and is created on first
+# use; main() removes it when it isn't a caller-provided one.
+OWN_CACHE_DIR = 'COMMENT_CACHE_DIR' not in os.environ
+BENCHMARK_CACHE_DIR = os.environ.setdefault('COMMENT_CACHE_DIR', os.path.join(tempfile.gettempdir(), f'benchmark_cache_{os.getpid()}'))
+os.environ.setdefault('TRACE_DIR', '')
+
+import pandas as pd
+import streamlit.logger
+from streamlit import config as streamlit_config
+from comment_corpus import generate_comments
+from artifact_cache import ArtifactCache
+from comment_store import write_comments, load_comments, comments_frame
+from result_batch import ResultBatch
+from comment_index import CommentIndex
+from keywords import KeywordSketch
+from authors import author_frame
+from snapshots import SnapshotStore, take_snapshot, compare_snapshots
+from analysis_jobs import AnalysisJob
+from vader_batch import VaderBatchScorer
+from text_processing import preprocess_text, preprocess_text_basic, detect_language
+from sentiment_backends import get_backend, CascadeBackend
+import Senti
+import Senti_lightweight
+
+# st.* calls outside `streamlit run` warn about a missing ScriptRunContext on every call
+streamlit_config.set_option('logger.level', 'error')
+streamlit.logger.set_log_level('error')
+
+DEFAULT_THRESHOLD = 0.15  # Best run may be 15% slower than the baseline's before we call it a regression
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'baseline.json')
+DETECT_LANGUAGE_SAMPLE = 200  # langdetect is slow; time it on a slice of the corpus
+
+
+class Benchmark:
+    """A named timing target over `items` comments"""
+
+    def __init__(self, name, group, func, items, available=True, reason=None):
+        self.name = name
+        self.group = group
+        self.func = func
+        self.items = items
+        self.available = available
+        self.reason = reason
+
+
+def measure(func, repeat, warmup=1):
+    """Wall-clock seconds for each of `repeat` calls, after warm-up calls"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def summarize(samples, items):
+    median = statistics.median(samples)
+    return {
+        'items': items,
+        'repeat': len(samples),
+        'min_s': min(samples),
+        'median_s': median,
+        'mean_s': statistics.fmean(samples),
+        'stdev_s': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'per_item_us': median / items * 1e6 if items else None,
+        'items_per_s': items / median if median else None,
+    }
+
+
+def build_benchmarks(records, workdir):
+    """Per-stage micro benchmarks and end-to-end macro benchmarks over one corpus"""
+    texts = [record['Comment'] for record in records]
+    processed = [preprocess_text(text) for text in texts]
+    processed_basic = [preprocess_text_basic(text) for text in texts]
+    vader = get_backend('vader')
+    cache = ArtifactCache(root=os.path.join(workdir, 'cache'))
+    csv_path = os.path.join(workdir, 'comments.csv')
+    frame = comments_frame(records)
+    frame.to_csv(csv_path, index=False)
+    parquet_path = write_comments(cache, 'benchmark01', records)
+    sample = processed[:DETECT_LANGUAGE_SAMPLE]
+    result_dicts = vader.analyze_batch(texts)
+    result_batch = ResultBatch.from_dicts(result_dicts)
+    batch_scorer = VaderBatchScorer(vader.model)
+    index = CommentIndex(os.path.join(workdir, 'comments.db'))
+    index.index_video('benchmark01', frame, result_batch)
+    snapshots = SnapshotStore(os.path.join(workdir, 'snapshots.db'))
+    take_snapshot(snapshots, cache, 'benchmark01', csv_path, result_batch[:len(texts) // 2], 'vader')
+    take_snapshot(snapshots, cache, 'benchmark01', parquet_path, result_batch, 'vader')
+    history = snapshots.history('benchmark01')
+    counts = result_batch.sentiment_counts()
+    totals = {f'num_{sentiment}': counts.get(sentiment, 0) for sentiment in ('positive', 'negative', 'neutral')}
+    jobs_dir = os.path.join(workdir, 'jobs')
+
+    def checkpointed_scoring():
+        AnalysisJob('benchmark', root=jobs_dir).remove()
+        return Senti.score_comments(texts, 'vader', job=AnalysisJob.open('benchmark', 'benchmark', root=jobs_dir))
+
+    cascade_available = CascadeBackend.is_available()
+    unavailable = "needs torch and transformers" if not cascade_available else None
+
+    return [
+        # Per-stage
+        Benchmark('preprocess_text_basic', 'stage', lambda: [preprocess_text_basic(t) for t in texts], len(texts)),
+        Benchmark('preprocess_text', 'stage', lambda: [preprocess_text(t) for t in texts], len(texts)),
+        Benchmark('detect_language', 'stage', lambda: [detect_language(t) for t in sample], len(sample)),
+        Benchmark('analyze_with_vader', 'stage', lambda: [Senti.analyze_with_vader(t, vader) for t in processed_basic], len(texts)),
+        Benchmark('vader_analyze_batch', 'stage', lambda: vader.analyze_batch(texts), len(texts)),
+        # Compound scores alone: NLTK per comment vs the vectorized batch scorer
+        Benchmark('vader_compound_nltk', 'stage', lambda: [vader.model.polarity_scores(t)['compound'] for t in processed_basic], len(texts)),
+        Benchmark('vader_compound_batch', 'stage', lambda: batch_scorer.compound_scores(processed_basic), len(texts)),
+        Benchmark('analyze_sentiment_advanced', 'stage', lambda: [Senti.analyze_sentiment_advanced(t) for t in texts[:100]],
+                  min(100, len(texts)), available=cascade_available, reason=unavailable),
+        Benchmark('cascade_analyze_batch', 'stage', lambda: get_backend('cascade').analyze_batch(texts), len(texts),
+                  available=cascade_available, reason=unavailable),
+        # Batched scoring with and without a resumable job's checkpoints
+        Benchmark('score_comments', 'stage', lambda: Senti.score_comments(texts, 'vader'), len(texts)),
+        Benchmark('score_comments_checkpointed', 'stage', checkpointed_scoring, len(texts)),
+        Benchmark('results_from_dicts', 'stage', lambda: ResultBatch.from_dicts(result_dicts), len(texts)),
+        Benchmark('aggregate_results', 'stage', lambda: (result_batch.sentiment_counts(), result_batch.method_counts(),
+                                                         result_batch.language_counts(), result_batch.mean_confidence()), len(texts)),
+        Benchmark('keyword_sketch', 'stage', lambda: KeywordSketch().add(texts, result_batch.sentiment), len(texts)),
+        Benchmark('author_aggregates', 'stage', lambda: author_frame(frame, result_batch), len(texts)),
+        # Drift tests between two stored snapshots, from their aggregates only
+        Benchmark('drift_compare', 'stage', lambda: compare_snapshots(history[0], history[-1]), 1),
+        # Charts: building the figures vs a rerun served from the figure cache
+        Benchmark('chart_figures', 'stage', lambda: (Senti.bar_figure(totals, 'bar'), Senti.sentiment_figure(totals, 'pie')), 1),
+        Benchmark('chart_cached', 'stage', lambda: (Senti.bar_chart(totals), Senti.plot_sentiment(totals)), 1),
+        # Storage
+        Benchmark('csv_write', 'io', lambda: frame.to_csv(csv_path, index=False), len(texts)),
+        Benchmark('csv_read', 'io', lambda: pd.read_csv(csv_path), len(texts)),
+        Benchmark('store_comments', 'io', lambda: write_comments(cache, 'benchmark01', records), len(texts)),
+        Benchmark('load_comments', 'io', lambda: load_comments(parquet_path, columns=['CommentId', 'Comment']), len(texts)),
+        Benchmark('index_comments', 'io', lambda: index.index_video('benchmark01', frame, result_batch), len(texts)),
+        # One results page: text match plus sentiment and confidence filters
+        Benchmark('search_comments', 'io', lambda: index.search('great', sentiments=['positive'], min_confidence=0.5), 1),
+        # One page of the results table, sorted server-side
+        Benchmark('page_results', 'io', lambda: index.search(page=10, sort='confidence', video_ids=['benchmark01']), 1),
+        # End to end: stored comments -> aggregated results (and stored per-comment results)
+        Benchmark('senti_lightweight_end_to_end', 'end_to_end',
+                  lambda: Senti_lightweight.analyze_sentiment(parquet_path, video_id='benchmark01'), len(texts)),
+        Benchmark('senti_vader_end_to_end', 'end_to_end',
+                  lambda: Senti.analyze_sentiment(parquet_path, video_id='benchmark01', backend='vader'), len(texts)),
+        Benchmark('senti_cascade_end_to_end', 'end_to_end',
+                  lambda: Senti.analyze_sentiment(parquet_path, video_id='benchmark01', backend='cascade'), len(texts),
+                  available=cascade_available, reason=unavailable),
+    ]
+
+
+def run_benchmarks(size=1000, seed=42, repeat=5, only=None):
+    """Run every benchmark (or those whose name contains `only`) and return the results document"""
+    records = generate_comments(size, seed=seed)
+    results = {}
+    skipped = {}
+    with tempfile.TemporaryDirectory(prefix='benchmark_') as workdir:
+        for benchmark in build_benchmarks(records, workdir):
+            if only and only not in benchmark.name:
+                continue
+            if not benchmark.available:
+                skipped[benchmark.name] = benchmark.reason
+                print(f"  skip  {benchmark.name:<32} ({benchmark.reason})")
+                continue
+            samples = measure(benchmark.func, repeat)
+            results[benchmark.name] = dict(summarize(samples, benchmark.items), group=benchmark.group)
+            row = results[benchmark.name]
+            print(f"  {benchmark.group:<10} {benchmark.name:<32} median {row['median_s'] * 1000:9.2f} ms"
+                  f"  {row['per_item_us']:9.1f} us/item")
+
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'corpus_size': size,
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'benchmarks': results,
+        'skipped': skipped,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare best-of-N times against a baseline document (the minimum is the
+    least noisy statistic on a shared machine). Returns (rows, regressions)
+    where a regression is a benchmark whose time grew by more than `threshold`.
+    """
+    rows = []
+    regressions = []
+    for name, result in current['benchmarks'].items():
+        reference = baseline.get('benchmarks', {}).get(name)
+        if reference is None or result['items'] != reference['items']:
+            rows.append((name, None))
+            continue
+        ratio = result['min_s'] / reference['min_s'] if reference['min_s'] else float('inf')
+        rows.append((name, ratio))
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the comment analysis pipeline on a synthetic corpus")
+    parser.add_argument('--size', type=int, default=1000, help="Comments in the synthetic corpus")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument('--only', help="Run benchmarks whose name contains this text")
+    parser.add_argument('--output', default='benchmark_results.json', help="Where to write the results JSON")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Results JSON to compare against (default: the committed baseline)")
+    parser.add_argument('--no-baseline', dest='baseline', action='store_const', const=None, help="Skip the comparison")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown as a fraction (0.15 = 15%%)")
+    parser.add_argument('--save-baseline', metavar='PATH', help="Also write the results as a new baseline")
+    args = parser.parse_args(argv)
+
+    print(f"Benchmarking on {args.size} synthetic comments (seed {args.seed}, {args.repeat} runs each)")
+    try:
+        current = run_benchmarks(size=args.size, seed=args.seed, repeat=args.repeat, only=args.only)
+    finally:
+        if OWN_CACHE_DIR:
+            shutil.rmtree(BENCHMARK_CACHE_DIR, ignore_errors=True)
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(current, handle, indent=2)
+        print(f"Results written to {path}")
+
+    if not args.baseline:
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; record one with --save-baseline")
+        return 0
+    with open(args.baseline, encoding='utf-8') as handle:
+        baseline = json.load(handle)
+    if baseline.get('meta', {}).get('machine') != current['meta']['machine']:
+        print("Note: the baseline was recorded on a different machine type; ratios may not be comparable")
+
+    rows, regressions = compare(current, baseline, args.threshold)
+    print(f"\nComparison with {args.baseline} (threshold +{args.threshold:.0%}):")
+    for name, ratio in rows:
+        if ratio is None:
+            print(f"  {name:<32} no comparable baseline")
+        else:
+            flag = "REGRESSION" if name in regressions else "ok"
+            print(f"  {name:<32} {ratio:6.2f}x  {flag}")
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,199 @@
+import time
+import threading
+from sentiment_backends import get_backend, BACKEND_REGISTRY, TIERS
+from text_processing import preprocess_text, detect_language
+from instrumentation import span
+from metrics import backend_throughput, budget_upgrades_dropped
+
+# Starting guesses (seconds per comment on CPU) until real measurements arrive
+DEFAULT_SECONDS_PER_COMMENT = {
+    'vader': 0.0003,
+    'langdetect': 0.003,
+    'multilingual': 0.05,
+    'social': 0.04,
+}
+UPGRADE_TIERS = ('multilingual', 'social')
+UPGRADE_CHUNK_SIZE = 32
+SAFETY_MARGIN = 0.9  # Plan against 90% of the remaining budget
+
+
+class ThroughputTracker:
+    """Per-backend seconds-per-comment, measured at runtime (EWMA)"""
+
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self._seconds_per_comment = dict(DEFAULT_SECONDS_PER_COMMENT)
+        self._lock = threading.Lock()
+
+    def observe(self, name, count, seconds):
+        """Record that `count` comments took `seconds` on a backend"""
+        if count <= 0:
+            return
+        sample = seconds / count
+        with self._lock:
+            previous = self._seconds_per_comment.get(name)
+            self._seconds_per_comment[name] = sample if previous is None else (
+                self.alpha * sample + (1 - self.alpha) * previous
+            )
+
+    def seconds_per_comment(self, name):
+        with self._lock:
+            return self._seconds_per_comment.get(name, DEFAULT_SECONDS_PER_COMMENT['multilingual'])
+
+    def estimate(self, name, count):
+        """Expected seconds for `count` comments"""
+        return self.seconds_per_comment(name) * count
+
+    def snapshot(self):
+        """Comments per second for each measured backend"""
+        with self._lock:
+            return {name: (1 / spc if spc else float('inf')) for name, spc in self._seconds_per_comment.items()}
+
+
+# Shared by every session in the process, so measurements accumulate
+throughput_tracker = ThroughputTracker()
+
+
+def timed_call(name, count, func, *args, **kwargs):
+    """Call func and feed its duration into the tracker"""
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    throughput_tracker.observe(name, count, time.perf_counter() - started)
+    backend_throughput.set(1 / throughput_tracker.seconds_per_comment(name), backend=name)
+    return result
+
+
+def warm_up(name):
+    """Load a backend's model in the background so the next request can use it"""
+    backend = get_backend(name)
+    if not backend.loaded:
+        threading.Thread(target=lambda: backend.model, name=f"warm-{name}", daemon=True).start()
+
+
+def usable_tier(name):
+    """A tier can join a budgeted run only once its model is resident"""
+    if name not in BACKEND_REGISTRY or not BACKEND_REGISTRY[name].is_available():
+        return False
+    if get_backend(name).loaded:
+        return True
+    warm_up(name)
+    return False
+
+
+def budget_tiers(backend=None):
+    """
+    Upgrade tiers a budgeted run may use for a requested backend: all of them
+    for the cascade (or no preference), only that model for one of the tiers,
+    none (VADER only) for VADER.
+    """
+    name = TIERS.get(backend, backend) if backend else None
+    if name is None or name == 'cascade':
+        return UPGRADE_TIERS
+    if name not in BACKEND_REGISTRY:
+        raise ValueError(f"Unknown sentiment backend '{name}'. Available: {', '.join(BACKEND_REGISTRY)}")
+    return tuple(tier for tier in UPGRADE_TIERS if tier == name)
+
+
+def analyze_with_budget(texts, time_budget, tiers=UPGRADE_TIERS):
+    """
+    Analyze comments within `time_budget` seconds.
+
+    Every comment first gets a VADER answer (the guaranteed floor). The
+    remaining budget is then spent upgrading comments, least confident
+    first, to the model tier that suits them: social RoBERTa for English,
+    multilingual BERT for other languages. Chunk sizes come from measured
+    throughput, so the run stops before the deadline and returns partial,
+    upgraded results with a per-comment method label. The plan reports the
+    candidates left on VADER: never reached, skipped for time, or failed.
+    """
+    started = time.perf_counter()
+    deadline = started + time_budget
+
+    def remaining():
+        return (deadline - time.perf_counter()) * SAFETY_MARGIN
+
+    # Floor: VADER for everything
+    vader = get_backend('vader')
+    with span('preprocess', len(texts)):
+        processed = [preprocess_text(text) for text in texts]
+    with span('infer.vader', len(texts)):
+        results = timed_call('vader', len(texts), vader.score_batch, processed)
+    for result, text in zip(results, texts):
+        if not text or len(str(text).strip()) == 0:
+            result.update({'sentiment': 'neutral', 'confidence': 0.0, 'method': 'empty', 'language': 'unknown'})
+
+    english_tier = 'social' if 'social' in tiers and usable_tier('social') else None
+    foreign_tier = 'multilingual' if 'multilingual' in tiers and usable_tier('multilingual') else None
+    if english_tier is None and foreign_tier is not None:
+        english_tier = foreign_tier
+
+    # Short texts stay on VADER, as in the cascade; without tiers (a VADER-only run) nothing is upgradable
+    candidates = [i for i, text in enumerate(processed) if tiers and len(text.split()) >= 2]
+    candidates.sort(key=lambda i: results[i]['confidence'])
+
+    upgraded = 0
+    skipped = 0
+    failed = 0
+    errors = {}
+    position = 0
+    while position < len(candidates) and (english_tier or foreign_tier):
+        budget_left = remaining()
+        per_comment = throughput_tracker.seconds_per_comment('langdetect') + max(
+            throughput_tracker.seconds_per_comment(english_tier or foreign_tier),
+            throughput_tracker.seconds_per_comment(foreign_tier or english_tier)
+        )
+        chunk_size = min(UPGRADE_CHUNK_SIZE, int(budget_left / per_comment))
+        if chunk_size <= 0:
+            break
+
+        chunk = candidates[position:position + chunk_size]
+        position += len(chunk)
+        with span('detect_language', len(chunk)):
+            languages = timed_call('langdetect', len(chunk), lambda: [detect_language(processed[i]) for i in chunk])
+
+        groups = {}
+        for i, lang in zip(chunk, languages):
+            tier = english_tier if lang == 'en' else foreign_tier
+            if tier:
+                groups.setdefault(tier, []).append((i, lang))
+
+        for tier, members in groups.items():
+            if throughput_tracker.estimate(tier, len(members)) > remaining():
+                skipped += len(members)
+                budget_upgrades_dropped.inc(len(members), tier=tier, reason='budget')
+                continue
+            backend = get_backend(tier)
+            try:
+                outputs = timed_call(
+                    tier, len(members), backend.predict,
+                    [processed[i] for i, _ in members], [lang for _, lang in members]
+                )
+            except Exception as error:
+                # The VADER answers stand; count the failure so it shows in the plan and metrics
+                failed += len(members)
+                budget_upgrades_dropped.inc(len(members), tier=tier, reason='error')
+                message = f"{tier}: {type(error).__name__}: {error}"
+                errors[message] = errors.get(message, 0) + len(members)
+                continue
+            for (i, _), output in zip(members, outputs):
+                results[i] = output
+                upgraded += 1
+
+    elapsed = time.perf_counter() - started
+    methods = {}
+    for result in results:
+        methods[result['method']] = methods.get(result['method'], 0) + 1
+
+    plan = {
+        'time_budget': time_budget,
+        'elapsed': elapsed,
+        'upgraded': upgraded,
+        'candidates': len(candidates),
+        'skipped': skipped,
+        'failed': failed,
+        'errors': errors,
+        'partial': position < len(candidates) or skipped > 0 or failed > 0,
+        'tiers': [tier for tier in (english_tier, foreign_tier) if tier],
+        'method_counts': methods,
+    }
+    return results, plan
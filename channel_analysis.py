@@ -0,0 +1,247 @@
+import re
+import threading
+import contextvars
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pandas as pd
+import streamlit as st
+from googleapiclient.errors import HttpError
+from YoutubeCommentScrapper import youtube, comment_pages, QuotaBudget, execute_within
+from artifact_cache import get_artifact_cache
+from comment_store import comment_record, write_comments
+from Senti import run_analysis
+from keywords import merge_keywords
+from authors import merge_author_frames
+from instrumentation import span
+from metrics import QUOTA_COSTS, comments_fetched
+from sentiment_backends import config_value, get_backend
+
+# Channel mode: analyze a channel's latest uploads. Videos are listed from the
+# channel's uploads playlist (playlistItems.list, 1 quota unit per 50 videos)
+# rather than search.list (100 units a page). Comment fetching fans out over a
+# small thread pool while analysis runs a few videos at a time, since the
+# models already use every core, and every API call is charged to a quota
+# budget so one channel can't drain the day's quota.
+
+CHANNEL_MAX_VIDEOS = int(config_value('CHANNEL_MAX_VIDEOS', 20))
+CHANNEL_CONCURRENCY = int(config_value('CHANNEL_CONCURRENCY', 4))  # Videos fetched at once
+CHANNEL_ANALYSIS_WORKERS = int(config_value('CHANNEL_ANALYSIS_WORKERS', 1))  # Videos analyzed at once
+CHANNEL_QUOTA_BUDGET = int(config_value('CHANNEL_QUOTA_BUDGET', 200))  # Quota units per channel run
+CHANNEL_COMMENTS_PER_VIDEO = int(config_value('CHANNEL_COMMENTS_PER_VIDEO', 500))
+
+PLAYLIST_PAGE_SIZE = 50  # playlistItems.list maximum
+COMMENT_PAGE_SIZE = 100  # commentThreads.list maximum
+
+_analysis_slots = threading.BoundedSemaphore(max(1, CHANNEL_ANALYSIS_WORKERS))
+
+
+def extract_channel_ref(youtube_link):
+    """
+    ('id', channel_id) for channel URLs and bare UC... ids, ('handle', '@name')
+    for @handle URLs and handles, otherwise None
+    """
+    link = youtube_link.strip()
+    prefix = r"^(?:https?:\/\/)?(?:www\.|m\.)?(?:youtube\.com\/)?"
+    match = re.search(prefix + r"(?:channel\/)?(UC[a-zA-Z0-9_-]{22})(?:[\/?#]|$)", link)
+    if match:
+        return ('id', match.group(1))
+    match = re.search(prefix + r"(@[\w.-]{3,30})(?:[\/?#]|$)", link)
+    if match:
+        return ('handle', match.group(1))
+    return None
+
+
+def resolve_channel(channel_ref, budget):
+    """Channel id, title and uploads playlist for a channel reference"""
+    kind, value = channel_ref
+    lookup = {'id': value} if kind == 'id' else {'forHandle': value}
+    response = execute_within(budget, youtube.channels().list(part='snippet,contentDetails', **lookup), 'channels.list')
+    if not response.get('items'):
+        raise ValueError(f"Channel {value} not found")
+    item = response['items'][0]
+    return {
+        'channel_id': item['id'],
+        'channel_title': item['snippet']['title'],
+        'uploads_playlist_id': item['contentDetails']['relatedPlaylists']['uploads'],
+    }
+
+
+def list_channel_videos(uploads_playlist_id, max_videos, budget):
+    """Latest uploads (newest first), paging playlistItems.list while the budget allows"""
+    videos = []
+    request_args = dict(part='snippet,contentDetails', playlistId=uploads_playlist_id)
+    while len(videos) < max_videos:
+        request_args['maxResults'] = min(PLAYLIST_PAGE_SIZE, max_videos - len(videos))
+        with span('list_videos') as list_span:
+            response = execute_within(budget, youtube.playlistItems().list(**request_args), 'playlistItems.list')
+            list_span.count = len(response.get('items', []))
+        for item in response['items']:
+            videos.append({
+                'video_id': item['contentDetails']['videoId'],
+                'title': item['snippet'].get('title', ''),
+                'published_at': item['contentDetails'].get('videoPublishedAt') or item['snippet'].get('publishedAt'),
+            })
+        if 'nextPageToken' not in response or not response['items']:
+            break
+        request_args['pageToken'] = response['nextPageToken']
+    return videos[:max_videos]
+
+
+def plan_pages(video_count, budget, comments_per_video=CHANNEL_COMMENTS_PER_VIDEO):
+    """
+    Comment pages each video may fetch: an even share of the remaining budget,
+    capped at what comments_per_video needs. Returns (videos to analyze, pages each).
+    """
+    wanted = max(1, -(-comments_per_video // COMMENT_PAGE_SIZE))
+    remaining = budget.remaining // QUOTA_COSTS['commentThreads.list']
+    videos = min(video_count, remaining)
+    if videos == 0:
+        return 0, 0
+    return videos, max(1, min(wanted, remaining // videos))
+
+
+def analyze_video(video, budget, max_pages, backend=None, time_budget=None,
+                  comments_per_video=CHANNEL_COMMENTS_PER_VIDEO):
+    """
+    Fetch and analyze one video (runs on a worker thread, renders nothing).
+    Returns the video dict with 'status', 'comments' and the analysis 'results'.
+    """
+    row = dict(video, status='ok', comments=0, results=None)
+    records = []
+    try:
+        for items in comment_pages(video['video_id'], max_comments=comments_per_video, max_pages=max_pages,
+                                   allow_page=lambda: budget.spend('commentThreads.list')):
+            records.extend(comment_record(item) for item in items)
+            comments_fetched.inc(len(items))
+    except HttpError as error:
+        if not records:
+            row['status'] = 'comments disabled' if 'commentsDisabled' in str(error) else f"API error {error.resp.status}"
+            return row
+    row['comments'] = len(records)
+    if not records:
+        row['status'] = 'no comments'
+        return row
+
+    cache = get_artifact_cache()
+    with span('store_comments', len(records)):
+        comments_path = write_comments(cache, video['video_id'], records)
+    with _analysis_slots:
+        row['results'] = run_analysis(comments_path, video_id=video['video_id'], backend=backend, time_budget=time_budget)
+    return row
+
+
+def iter_channel_analyses(videos, budget, backend=None, time_budget=None, concurrency=CHANNEL_CONCURRENCY,
+                          comments_per_video=CHANNEL_COMMENTS_PER_VIDEO):
+    """
+    Analyze videos on a bounded thread pool and yield each finished row as it
+    completes. Videos the quota budget can't cover are yielded as skipped.
+    """
+    count, max_pages = plan_pages(len(videos), budget, comments_per_video)
+    for video in videos[count:]:
+        yield dict(video, status='skipped (quota budget)', comments=0, results=None)
+    if not count:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix='channel')
+    try:
+        futures = {}
+        for video in videos[:count]:
+            budget.spend('commentThreads.list')  # First page, reserved by plan_pages
+            # Run in a copy of the caller's context so spans land in the current run's trace
+            futures[executor.submit(contextvars.copy_context().run, analyze_video, video, budget, max_pages,
+                                    backend, time_budget, comments_per_video)] = video
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as error:
+                yield dict(futures[future], status=f"error: {error}", comments=0, results=None)
+    finally:
+        # A closed generator (a rerun stopped the page) drops the queued videos instead of waiting
+        # for them; those already running finish in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def channel_aggregates(rows):
+    """Channel-level totals in the same shape as a single video's results"""
+    analyzed = [row['results'] for row in rows if row['results']]
+    total = sum(results['total_comments'] for results in analyzed)
+    language_stats, method_stats = Counter(), Counter()
+    for results in analyzed:
+        language_stats.update(results['language_stats'])
+        method_stats.update(results['method_stats'])
+    return {
+        'num_positive': sum(results['num_positive'] for results in analyzed),
+        'num_negative': sum(results['num_negative'] for results in analyzed),
+        'num_neutral': sum(results['num_neutral'] for results in analyzed),
+        'avg_confidence': sum(results['avg_confidence'] * results['total_comments'] for results in analyzed) / total if total else 0.0,
+        'language_stats': dict(language_stats),
+        'method_stats': dict(method_stats),
+        'total_comments': total,
+        'keywords': merge_keywords(results.get('keywords') for results in analyzed),
+        'authors': merge_author_frames(results.get('authors') for results in analyzed),
+        'videos_analyzed': len(analyzed),
+        'videos': len(rows),
+    }
+
+
+def video_frame(rows):
+    """One row per video for the channel table, most positive first"""
+    records = []
+    for row in rows:
+        results = row['results']
+        total = results['total_comments'] if results else 0
+        records.append({
+            'Video': row['title'] or row['video_id'],
+            'Published': (row['published_at'] or '')[:10],
+            'Comments': total,
+            'Positive %': round(100 * results['num_positive'] / total, 1) if total else None,
+            'Negative %': round(100 * results['num_negative'] / total, 1) if total else None,
+            'Neutral %': round(100 * results['num_neutral'] / total, 1) if total else None,
+            'Confidence': round(results['avg_confidence'], 2) if total else None,
+            'Status': row['status'],
+        })
+    df = pd.DataFrame(records, columns=['Video', 'Published', 'Comments', 'Positive %', 'Negative %',
+                                        'Neutral %', 'Confidence', 'Status'])
+    return df.sort_values('Positive %', ascending=False, na_position='last', ignore_index=True)
+
+
+def analyze_channel(channel_ref, backend=None, time_budget=None, max_videos=CHANNEL_MAX_VIDEOS,
+                    quota_budget=CHANNEL_QUOTA_BUDGET):
+    """
+    Channel mode for the app: list the uploads, then stream each video's row
+    into a live table as it finishes. Returns (channel, rows, aggregates).
+    """
+    budget = QuotaBudget(quota_budget)
+    with st.spinner("📺 Reading the channel's uploads..."):
+        channel = resolve_channel(channel_ref, budget)
+        videos = list_channel_videos(channel['uploads_playlist_id'], max_videos, budget)
+    if not videos:
+        st.warning(f"📭 {channel['channel_title']} has no public uploads")
+        return channel, [], channel_aggregates([])
+
+    # Load models once here rather than racing to load them on the workers
+    if not time_budget:
+        sentiment_backend = get_backend(backend)
+        if not sentiment_backend.loaded:
+            with st.spinner("🤖 Loading sentiment models..."):
+                sentiment_backend.model
+
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    table = st.empty()
+    rows = []
+    for row in iter_channel_analyses(videos, budget, backend=backend, time_budget=time_budget):
+        rows.append(row)
+        progress_bar.progress(len(rows) / len(videos))
+        status_text.text(f"Finished {len(rows)}/{len(videos)} videos ({budget.used}/{budget.units} quota units used)...")
+        table.dataframe(video_frame(rows), hide_index=True)
+    progress_bar.empty()
+    status_text.empty()
+
+    aggregates = channel_aggregates(rows)
+    st.success(f"✅ Analyzed {aggregates['total_comments']} comments across {aggregates['videos_analyzed']}/{len(videos)} "
+               f"videos with {aggregates['avg_confidence']:.2f} average confidence ({budget.used} quota units)")
+    skipped = sum(1 for row in rows if row['status'].startswith('skipped'))
+    if skipped:
+        st.info(f"🚦 {skipped} videos skipped to stay within the {budget.units}-unit quota budget")
+    return channel, rows, aggregates
@@ -0,0 +1,69 @@
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+import streamlit as st
+from sentiment_backends import config_value
+
+# Chart layer: figures are memoized under a hash of the data they plot, so a
+# rerun with unchanged results reuses the finished Plotly figure instead of
+# rebuilding its traces and layout. Scatter plots switch to WebGL above a point
+# count and are binned server-side above a larger one, so what reaches the
+# browser stays bounded however many comments were analyzed.
+
+FIGURE_CACHE_SIZE = 128
+WEBGL_THRESHOLD = int(config_value('CHART_WEBGL_THRESHOLD', 1000))  # Points before scatters render with scattergl
+MAX_SCATTER_POINTS = int(config_value('CHART_MAX_POINTS', 10000))  # Points before scatters are binned
+
+
+def chart_key(kind, *parts):
+    """Hash of a chart kind and the data it plots"""
+    payload = json.dumps([kind, parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def cached_figure(key, _build):
+    """
+    The figure for `key`, built by `_build` on first use. Shared across
+    sessions; st.plotly_chart only reads it, and a Figure passes through it
+    without the re-validation a JSON dict would get.
+    """
+    return _build()
+
+
+def bin_points(data, x_column, y_column, color_column, max_points=MAX_SCATTER_POINTS):
+    """
+    Numeric scatter data reduced to at most max_points markers: per category,
+    one marker per occupied grid cell at the mean position of its points,
+    with their number in 'Count'. Non-numeric axes are sampled instead.
+    """
+    categories = pd.unique(data[color_column])
+    if not (pd.api.types.is_numeric_dtype(data[x_column]) and pd.api.types.is_numeric_dtype(data[y_column])):
+        fraction = max_points / len(data)
+        sampled = data.groupby(color_column, sort=False, group_keys=False).sample(frac=fraction, random_state=0)
+        return sampled.assign(Count=1)
+
+    x = data[x_column].to_numpy(dtype=np.float64)
+    y = data[y_column].to_numpy(dtype=np.float64)
+    finite = np.isfinite(x) & np.isfinite(y)
+    x, y = x[finite], y[finite]
+    bins = max(1, int(np.sqrt(max_points / max(1, len(categories)))))
+
+    def cells(values):
+        if not len(values):
+            return values.astype(np.int64)
+        low, high = values.min(), values.max()
+        width = (high - low) or 1.0
+        return np.minimum(((values - low) / width * bins).astype(np.int64), bins - 1)
+
+    points = pd.DataFrame({
+        color_column: data[color_column].to_numpy()[finite],
+        'cell': cells(x) * bins + cells(y),
+        x_column: x,
+        y_column: y,
+    })
+    binned = points.groupby([color_column, 'cell'], sort=False).agg(
+        **{x_column: (x_column, 'mean'), y_column: (y_column, 'mean'), 'Count': (x_column, 'size')}
+    ).reset_index()
+    return binned.drop(columns='cell')
@@ -0,0 +1,144 @@
+import math
+import random
+import argparse
+from datetime import datetime, timedelta, timezone
+
+# Seeded synthetic YouTube comments for benchmarks and offline tests. The mix
+# follows what real comment sections look like: mostly short English comments
+# with a long tail of essays, emoji-heavy replies, @mentions, timestamps and
+# links, a sizeable share of other languages and scripts, and copy-paste spam.
+
+POSITIVE_WORDS = ['great', 'awesome', 'love', 'amazing', 'best', 'helpful', 'beautiful', 'fantastic', 'perfect', 'brilliant']
+NEGATIVE_WORDS = ['bad', 'boring', 'worst', 'hate', 'terrible', 'annoying', 'useless', 'awful', 'clickbait', 'disappointing']
+NEUTRAL_WORDS = ['video', 'part', 'time', 'music', 'song', 'channel', 'editing', 'the', 'this', 'that', 'watching',
+                 'first', 'again', 'today', 'episode', 'tutorial', 'minute', 'really', 'just', 'and', 'was', 'is', 'so']
+
+FOREIGN_PHRASES = {
+    'hi': ['बहुत अच्छा वीडियो है', 'मुझे यह गाना बहुत पसंद है', 'बेकार वीडियो', 'धन्यवाद भाई'],
+    'hinglish': ['bhai kya video hai', 'mast video bhai', 'bakwas content yaar', 'sahi hai boss'],
+    'es': ['me encanta este video', 'qué buena canción', 'muy aburrido la verdad', 'saludos desde México'],
+    'pt': ['que vídeo incrível', 'muito bom parabéns', 'não gostei nada', 'alguém em 2024?'],
+    'fr': ['super vidéo merci', "j'adore cette chanson", "c'est nul", 'trop bien'],
+    'de': ['tolles Video danke', 'sehr langweilig', 'einfach genial', 'wer hört das noch'],
+    'ar': ['فيديو رائع جدا', 'شكرا لك', 'سيء جدا', 'أحسنت'],
+    'ja': ['最高の動画です', 'この曲大好き', 'つまらない', 'ありがとうございます'],
+    'ko': ['정말 좋은 영상이에요', '노래 너무 좋아요', '별로예요', '감사합니다'],
+    'ru': ['отличное видео', 'спасибо большое', 'очень скучно', 'лучшая песня'],
+}
+
+EMOJIS = ['😊', '😂', '🤣', '😍', '❤️', '🔥', '👍', '👏', '💯', '🙏', '😭', '😢', '😡', '👎', '💩', '🤔', '😐', '🥰', '✨', '🎉']
+
+SPAM_COMMENTS = ['First!', 'Who is watching in 2024?', 'Like if you agree', 'Check out my channel!', 'Notification squad 🔔']
+
+
+class CorpusConfig:
+    """Knobs for the synthetic corpus; rates are per-comment probabilities"""
+
+    def __init__(self, median_words=8, length_sigma=1.0, max_words=150, emoji_rate=0.35, emoji_only_rate=0.04,
+                 mention_rate=0.08, url_rate=0.03, timestamp_rate=0.06, foreign_rate=0.25, duplicate_rate=0.07,
+                 empty_rate=0.005, author_pool=5000):
+        self.median_words = median_words
+        self.length_sigma = length_sigma
+        self.max_words = max_words
+        self.emoji_rate = emoji_rate
+        self.emoji_only_rate = emoji_only_rate
+        self.mention_rate = mention_rate
+        self.url_rate = url_rate
+        self.timestamp_rate = timestamp_rate
+        self.foreign_rate = foreign_rate
+        self.duplicate_rate = duplicate_rate
+        self.empty_rate = empty_rate
+        self.author_pool = author_pool
+
+
+def _word_count(rng, config):
+    """Log-normal comment length: many short comments and a long tail"""
+    count = int(round(rng.lognormvariate(math.log(config.median_words), config.length_sigma)))
+    return max(1, min(config.max_words, count))
+
+
+def _english_text(rng, words):
+    polarity = rng.random()
+    pool = POSITIVE_WORDS if polarity < 0.45 else NEGATIVE_WORDS if polarity < 0.7 else NEUTRAL_WORDS
+    return ' '.join(rng.choice(pool) if rng.random() < 0.3 else rng.choice(NEUTRAL_WORDS) for _ in range(words))
+
+
+def _foreign_text(rng, words):
+    phrases = FOREIGN_PHRASES[rng.choice(list(FOREIGN_PHRASES))]
+    parts = [rng.choice(phrases)]
+    while len(' '.join(parts).split()) < words:
+        parts.append(rng.choice(phrases))
+    return ' '.join(parts)
+
+
+def synthetic_comment(rng, config):
+    """One comment text drawn from the configured distribution"""
+    if rng.random() < config.empty_rate:
+        return ''
+    if rng.random() < config.emoji_only_rate:
+        return ''.join(rng.choice(EMOJIS) for _ in range(rng.randint(1, 6)))
+
+    words = _word_count(rng, config)
+    text = _foreign_text(rng, words) if rng.random() < config.foreign_rate else _english_text(rng, words)
+    if rng.random() < 0.5:
+        text = text.capitalize()
+    if rng.random() < config.timestamp_rate:
+        text = f"{rng.randint(0, 59)}:{rng.randint(0, 59):02d} {text}"
+    if rng.random() < config.mention_rate:
+        text = f"@user{rng.randint(1, 99999)} {text}"
+    if rng.random() < config.url_rate:
+        text = f"{text} https://youtu.be/{''.join(rng.choice('abcdefghijkLMNOP0123456789_-') for _ in range(11))}"
+    if rng.random() < config.emoji_rate:
+        text = f"{text} {''.join(rng.choice(EMOJIS) for _ in range(rng.randint(1, 4)))}"
+    if rng.random() < 0.1:
+        text += rng.choice(['!', '!!!', '?', '...'])
+    return text
+
+
+def generate_comments(count, seed=42, config=None):
+    """
+    `count` comment records in the stored comment schema. The same seed and
+    config always produce the same corpus (and smaller counts a prefix of it).
+    """
+    rng = random.Random(seed)
+    config = config or CorpusConfig()
+    published = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    records = []
+    texts = []
+    for i in range(count):
+        if texts and rng.random() < config.duplicate_rate:
+            # Copy-paste spam and repeated reactions
+            text = rng.choice(SPAM_COMMENTS) if rng.random() < 0.5 else rng.choice(texts)
+        else:
+            text = synthetic_comment(rng, config)
+        texts.append(text)
+        author = rng.randint(1, config.author_pool)
+        published += timedelta(seconds=rng.expovariate(1 / 120))  # Poisson arrivals, ~2 minutes apart
+        records.append({
+            'CommentId': f"synthetic{seed}_{i:07d}",
+            'Username': f"@viewer{author}",
+            'AuthorChannelId': f"UCsynthetic{author:012d}",
+            'Comment': text,
+            'PublishedAt': published.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'LikeCount': int(rng.paretovariate(1.5)) - 1,
+            'ReplyCount': int(rng.paretovariate(2.5)) - 1,
+        })
+    return records
+
+
+def corpus_texts(count, seed=42, config=None):
+    """Just the comment texts"""
+    return [record['Comment'] for record in generate_comments(count, seed=seed, config=config)]
+
+
+if __name__ == '__main__':
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic YouTube comment corpus")
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default='synthetic_comments.csv', help="Output CSV path")
+    args = parser.parse_args()
+
+    pd.DataFrame(generate_comments(args.count, seed=args.seed)).to_csv(args.out, index=False)
+    print(f"Wrote {args.count} synthetic comments to {args.out}")
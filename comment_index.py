@@ -0,0 +1,342 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+import streamlit as st
+from artifact_cache import CACHE_DIR
+from result_batch import SENTIMENTS, SENTIMENT_CODES
+from timeline import epoch_seconds
+from sentiment_backends import config_value
+
+# Search over every stored video's comments: a SQLite table of comments joined
+# with their sentiment results, plus an FTS5 full-text index over the text.
+# Filters (sentiment, language, confidence, date, video) hit ordinary B-tree
+# indexes and pages are fetched with LIMIT/OFFSET, so a query only reads the
+# rows it shows. Without FTS5 in the local SQLite build, text search falls
+# back to LIKE.
+
+INDEX_PATH = config_value('COMMENT_INDEX_PATH') or os.path.join(CACHE_DIR, 'comments.db')
+PAGE_SIZE = 25
+
+# Sort orders for the results table, each backed by a per-video index. The id
+# breaks ties so pages never overlap; every key runs in the same direction so
+# SQLite can walk the index instead of sorting.
+SORT_COLUMNS = {
+    'published': ['c.published'],
+    'confidence': ['c.confidence'],
+    'sentiment': ['c.sentiment', 'c.confidence'],
+    'author': ['c.author COLLATE NOCASE'],
+    'length': ['length(c.text)'],
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS comments (
+    id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    comment_id TEXT NOT NULL,
+    author TEXT,
+    text TEXT NOT NULL,
+    published INTEGER,
+    sentiment INTEGER NOT NULL,
+    confidence REAL NOT NULL,
+    language TEXT,
+    method TEXT,
+    UNIQUE (video_id, comment_id)
+);
+CREATE INDEX IF NOT EXISTS comments_sentiment ON comments (sentiment, published);
+CREATE INDEX IF NOT EXISTS comments_video ON comments (video_id, published);
+CREATE INDEX IF NOT EXISTS comments_language ON comments (language);
+CREATE INDEX IF NOT EXISTS comments_video_confidence ON comments (video_id, confidence);
+CREATE INDEX IF NOT EXISTS comments_video_sentiment ON comments (video_id, sentiment, confidence);
+CREATE INDEX IF NOT EXISTS comments_video_author ON comments (video_id, author COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS comments_video_length ON comments (video_id, length(text));
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS comments_fts USING fts5(
+    text, content='comments', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS comments_ai AFTER INSERT ON comments BEGIN
+    INSERT INTO comments_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS comments_ad AFTER DELETE ON comments BEGIN
+    INSERT INTO comments_fts (comments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS comments_au AFTER UPDATE ON comments BEGIN
+    INSERT INTO comments_fts (comments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    INSERT INTO comments_fts (rowid, text) VALUES (new.id, new.text);
+END;
+"""
+
+
+def _fts5_available():
+    try:
+        sqlite3.connect(':memory:').execute('CREATE VIRTUAL TABLE probe USING fts5(x)')
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+FTS5_AVAILABLE = _fts5_available()
+
+
+class CommentIndex:
+    """
+    Searchable store of analyzed comments. Each thread gets its own
+    connection (WAL mode, so searches don't wait for an indexing write).
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._write_lock:
+            connection = self.connection()
+            connection.executescript(SCHEMA + (FTS_SCHEMA if FTS5_AVAILABLE else ''))
+
+    def connection(self):
+        if not hasattr(self._local, 'connection'):
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return self._local.connection
+
+    def index_video(self, video_id, comments_df, results, replace=True):
+        """
+        Store a video's comments with their results (rows line up with
+        `results`). replace=True drops the video's previous rows first;
+        otherwise rows are added or updated by comment id.
+        """
+        published = epoch_seconds(comments_df['PublishedAt']) if 'PublishedAt' in comments_df.columns else None
+        authors = comments_df['Username'].tolist() if 'Username' in comments_df.columns else [None] * len(comments_df)
+        rows = zip(
+            [video_id] * len(comments_df),
+            comments_df['CommentId'].fillna('').astype(str).tolist(),
+            authors,
+            comments_df['Comment'].fillna('').tolist(),
+            [None if seconds < 0 else seconds for seconds in published.tolist()] if published is not None else [None] * len(comments_df),
+            results.sentiment.tolist(),
+            results.confidence.tolist(),
+            [results.languages[code] for code in results.language.tolist()],
+            [results.methods[code] for code in results.method.tolist()],
+        )
+        with self._write_lock:
+            connection = self.connection()
+            with connection:
+                if replace:
+                    connection.execute('DELETE FROM comments WHERE video_id = ?', (video_id,))
+                connection.executemany(
+                    'INSERT INTO comments (video_id, comment_id, author, text, published, sentiment, confidence, language, method) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (video_id, comment_id) DO UPDATE SET author = excluded.author, text = excluded.text, '
+                    'published = excluded.published, sentiment = excluded.sentiment, confidence = excluded.confidence, '
+                    'language = excluded.language, method = excluded.method',
+                    rows
+                )
+        return len(comments_df)
+
+    @staticmethod
+    def _filters(sentiments=None, languages=None, min_confidence=None, since=None, until=None, video_ids=None):
+        """SQL conditions and parameters for the search filters"""
+        clauses, params = [], []
+        if sentiments:
+            clauses.append(f"c.sentiment IN ({', '.join('?' * len(sentiments))})")
+            params.extend(SENTIMENT_CODES[sentiment] for sentiment in sentiments)
+        if languages:
+            clauses.append(f"c.language IN ({', '.join('?' * len(languages))})")
+            params.extend(languages)
+        if video_ids:
+            clauses.append(f"c.video_id IN ({', '.join('?' * len(video_ids))})")
+            params.extend(video_ids)
+        if min_confidence:
+            clauses.append('c.confidence >= ?')
+            params.append(min_confidence)
+        if since is not None:
+            clauses.append('c.published >= ?')
+            params.append(since)
+        if until is not None:
+            clauses.append('c.published < ?')
+            params.append(until)
+        return clauses, params
+
+    def search(self, query=None, page=1, page_size=PAGE_SIZE, sort=None, descending=True, **filters):
+        """
+        One page of matching comments and the total number of matches. Rows
+        are ordered by `sort` (a SORT_COLUMNS key) when given, otherwise best
+        text matches first, or newest first without a query.
+        """
+        clauses, params = self._filters(**filters)
+        source, order = 'comments c', 'c.published DESC'
+        if query and FTS5_AVAILABLE:
+            # Match and rank inside the FTS index first (CROSS JOIN fixes the join order), then filter
+            source, order = 'comments_fts CROSS JOIN comments c ON c.id = comments_fts.rowid', 'comments_fts.rank'
+            clauses.insert(0, 'comments_fts MATCH ?')
+            params.insert(0, fts_query(query))
+        elif query:
+            for term in query.split():
+                clauses.append('c.text LIKE ?')
+                params.append(f"%{term.rstrip('*')}%")
+        if sort:
+            direction = 'DESC' if descending else 'ASC'
+            order = ', '.join(f"{column} {direction}" for column in SORT_COLUMNS[sort] + ['c.id'])
+        where = (' WHERE ' + ' AND '.join(clauses)) if clauses else ''
+
+        connection = self.connection()
+        total = connection.execute(f'SELECT COUNT(*) FROM {source}{where}', params).fetchone()[0]
+        rows = connection.execute(
+            f'SELECT c.video_id, c.comment_id, c.author, c.text, c.published, c.sentiment, c.confidence, c.language, c.method '
+            f'FROM {source}{where} ORDER BY {order} LIMIT ? OFFSET ?',
+            params + [page_size, (max(1, page) - 1) * page_size]
+        ).fetchall()
+        return [_row_dict(row) for row in rows], total
+
+    def languages(self):
+        return [row[0] for row in self.connection().execute(
+            'SELECT DISTINCT language FROM comments WHERE language IS NOT NULL ORDER BY language')]
+
+    def stats(self):
+        count, videos = self.connection().execute('SELECT COUNT(*), COUNT(DISTINCT video_id) FROM comments').fetchone()
+        return {'comments': count, 'videos': videos}
+
+
+def fts_query(text):
+    """
+    User text as an FTS5 query: every word must match, each quoted so
+    punctuation and operators are taken literally; a trailing * keeps prefix search.
+    """
+    terms = []
+    for word in text.split():
+        prefix = word.endswith('*')
+        word = word.rstrip('*').replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ('*' if prefix else ''))
+    return ' AND '.join(terms) or '""'
+
+
+def _row_dict(row):
+    video_id, comment_id, author, text, published, sentiment, confidence, language, method = row
+    return {
+        'video_id': video_id,
+        'comment_id': comment_id,
+        'author': author,
+        'text': text,
+        'published': datetime.fromtimestamp(published, tz=timezone.utc) if published is not None else None,
+        'sentiment': SENTIMENTS[sentiment],
+        'confidence': confidence,
+        'language': language,
+        'method': method,
+    }
+
+
+@st.cache_resource
+def get_comment_index():
+    """One index per server process, shared by all sessions"""
+    return CommentIndex()
+
+
+def show_comment_search(video_id=None, key='comment_search'):
+    """
+    Search box with filters over the index, scoped to one video or all of
+    them. Runs as a fragment, so typing a query doesn't rerun the analysis.
+    """
+    @st.fragment
+    def search_panel():
+        index = get_comment_index()
+        query = st.text_input("🔎 Search comments", placeholder='refund, "sound quality", subscri*', key=f'{key}_query')
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            sentiments = st.multiselect("Sentiment", list(reversed(SENTIMENTS)), key=f'{key}_sentiment')
+        with col2:
+            languages = st.multiselect("Language", index.languages(), key=f'{key}_language')
+        with col3:
+            min_confidence = st.slider("Min confidence", 0.0, 1.0, 0.0, 0.05, key=f'{key}_confidence')
+        with col4:
+            dates = st.date_input("Published between", value=(), key=f'{key}_dates')
+        all_videos = video_id is None or st.checkbox("Search all stored videos", key=f'{key}_all')
+
+        since = until = None
+        if len(dates) == 2:
+            since = int(datetime(dates[0].year, dates[0].month, dates[0].day, tzinfo=timezone.utc).timestamp())
+            until = int(datetime(dates[1].year, dates[1].month, dates[1].day, tzinfo=timezone.utc).timestamp()) + 86400
+        filters = dict(sentiments=sentiments, languages=languages, min_confidence=min_confidence, since=since, until=until,
+                       video_ids=None if all_videos else [video_id])
+
+        page = _current_page(key, (query, filters))
+        rows, total = index.search(query.strip() or None, page=page, **filters)
+        _show_rows(rows)
+        _page_controls(key, page, total, PAGE_SIZE, "matching comments")
+
+    search_panel()
+
+
+def show_results_table(video_id, key='results_table'):
+    """
+    Per-comment results of one video, sorted, filtered and paged in SQLite:
+    only the visible page ever reaches the browser, however many comments
+    the video has.
+    """
+    @st.fragment
+    def table_panel():
+        index = get_comment_index()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            sort = st.selectbox("Sort by", list(SORT_COLUMNS), key=f'{key}_sort')
+        with col2:
+            descending = st.radio("Order", ["Descending", "Ascending"], horizontal=True, key=f'{key}_order') == "Descending"
+        with col3:
+            sentiments = st.multiselect("Sentiment", list(reversed(SENTIMENTS)), key=f'{key}_sentiment')
+        with col4:
+            page_size = st.selectbox("Rows per page", [25, 50, 100, 250], key=f'{key}_page_size')
+        min_confidence = st.slider("Min confidence", 0.0, 1.0, 0.0, 0.05, key=f'{key}_confidence')
+        filters = dict(sentiments=sentiments, min_confidence=min_confidence, video_ids=[video_id])
+
+        page = _current_page(key, (sort, descending, page_size, filters))
+        rows, total = index.search(page=page, page_size=page_size, sort=sort, descending=descending, **filters)
+        _show_rows(rows, show_video=False)
+        _page_controls(key, page, total, page_size, "comments")
+
+    table_panel()
+
+
+def _current_page(key, signature):
+    """The panel's page number, back to 1 whenever its query or filters change"""
+    signature = repr(signature)
+    if st.session_state.get(f'{key}_signature') != signature:
+        st.session_state[f'{key}_signature'] = signature
+        st.session_state[f'{key}_page'] = 1
+    return st.session_state.get(f'{key}_page', 1)
+
+
+def _show_rows(rows, show_video=True):
+    if not rows:
+        return
+    st.dataframe([
+        {
+            'Comment': row['text'],
+            'Sentiment': row['sentiment'],
+            'Confidence': round(row['confidence'], 2),
+            'Language': row['language'],
+            'Author': row['author'],
+            'Published': row['published'].strftime('%Y-%m-%d %H:%M') if row['published'] else '',
+            **({'Video': row['video_id']} if show_video else {}),
+        }
+        for row in rows
+    ], hide_index=True)
+
+
+def _set_page(key, page):
+    st.session_state[f'{key}_page'] = page
+
+
+def _page_controls(key, page, total, page_size, noun):
+    """Caption plus previous/next buttons (the page changes in their callbacks, before the fragment reruns)"""
+    pages = max(1, -(-total // page_size))
+    prev_col, caption_col, next_col = st.columns([1, 4, 1])
+    with caption_col:
+        st.caption(f"{total} {noun} · page {min(page, pages)} of {pages}")
+    with prev_col:
+        st.button("⬅️ Previous", disabled=page <= 1, key=f'{key}_prev', on_click=_set_page, args=(key, page - 1))
+    with next_col:
+        st.button("Next ➡️", disabled=page >= pages, key=f'{key}_next', on_click=_set_page, args=(key, page + 1))
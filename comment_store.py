@@ -0,0 +1,131 @@
+import csv
+import pandas as pd
+from result_batch import ResultBatch
+
+# Parquet is optional: without pyarrow we fall back to plain CSV artifacts
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+PARQUET_COMPRESSION = 'zstd'
+
+# Typed columns kept from the commentThreads API response
+COMMENT_COLUMNS = ['CommentId', 'Username', 'AuthorChannelId', 'Comment', 'PublishedAt', 'LikeCount', 'ReplyCount']
+
+# Per-comment sentiment output, joined to comments on CommentId
+RESULT_COLUMNS = ['CommentId', 'Sentiment', 'Confidence', 'Method', 'Language']
+
+SCHEMAS = {}
+if PARQUET_AVAILABLE:
+    SCHEMAS['comments'] = pa.schema([
+        ('CommentId', pa.string()),
+        ('Username', pa.string()),
+        ('AuthorChannelId', pa.dictionary(pa.int32(), pa.string())),
+        ('Comment', pa.string()),
+        ('PublishedAt', pa.timestamp('s', tz='UTC')),
+        ('LikeCount', pa.int64()),
+        ('ReplyCount', pa.int32()),
+    ])
+    SCHEMAS['results'] = pa.schema([
+        ('CommentId', pa.string()),
+        ('Sentiment', pa.dictionary(pa.int8(), pa.string())),
+        ('Confidence', pa.float32()),
+        ('Method', pa.dictionary(pa.int8(), pa.string())),
+        ('Language', pa.dictionary(pa.int16(), pa.string())),
+    ])
+
+
+def comment_record(item):
+    """Flatten one commentThreads item into a storage row"""
+    thread_snippet = item['snippet']
+    top_level = thread_snippet['topLevelComment']
+    snippet = top_level['snippet']
+    return {
+        'CommentId': top_level.get('id', item.get('id')),
+        'Username': snippet.get('authorDisplayName', ''),
+        'AuthorChannelId': snippet.get('authorChannelId', {}).get('value'),
+        'Comment': snippet.get('textDisplay', ''),
+        'PublishedAt': snippet.get('publishedAt'),
+        'LikeCount': int(snippet.get('likeCount', 0)),
+        'ReplyCount': int(thread_snippet.get('totalReplyCount', 0)),
+    }
+
+
+def comments_frame(records):
+    """Build a typed comments DataFrame from storage rows"""
+    df = pd.DataFrame.from_records(records, columns=COMMENT_COLUMNS)
+    for column in ['CommentId', 'Username', 'AuthorChannelId', 'Comment']:
+        df[column] = df[column].astype(object)
+    df['PublishedAt'] = pd.to_datetime(df['PublishedAt'], utc=True, errors='coerce')
+    df['LikeCount'] = df['LikeCount'].fillna(0).astype('int64')
+    df['ReplyCount'] = df['ReplyCount'].fillna(0).astype('int32')
+    return df
+
+
+def _write_table(cache, video_id, name, table):
+    return cache.write_with(
+        video_id, f"{name}.parquet",
+        lambda handle: pq.write_table(table, handle, compression=PARQUET_COMPRESSION)
+    )
+
+
+def _write_frame(cache, video_id, name, df, kind):
+    """Store a DataFrame as a Parquet artifact (or CSV without pyarrow)"""
+    if PARQUET_AVAILABLE:
+        return _write_table(cache, video_id, name, pa.Table.from_pandas(df, schema=SCHEMAS[kind], preserve_index=False))
+    return cache.write_with(
+        video_id, f"{name}.csv",
+        lambda handle: df.to_csv(handle, index=False),
+        mode='w', newline='', encoding='utf-8'
+    )
+
+
+def write_comments(cache, video_id, records, name='comments'):
+    """Store fetched comments for a video and return the artifact path"""
+    return _write_frame(cache, video_id, name, comments_frame(records), 'comments')
+
+
+def write_results(cache, video_id, comment_ids, results):
+    """Store per-comment sentiment results (a ResultBatch or list of result dicts) for a video"""
+    if not isinstance(results, ResultBatch):
+        results = ResultBatch.from_dicts(results)
+    if PARQUET_AVAILABLE:
+        # The result arrays are wrapped, not copied, on the way to Parquet
+        return _write_table(cache, video_id, 'results', results.to_arrow(comment_ids).cast(SCHEMAS['results']))
+    return _write_frame(cache, video_id, 'results', results.to_frame(comment_ids), 'results')
+
+
+def load_results(path):
+    """Stored per-comment results as (comment ids, ResultBatch)"""
+    if path.endswith('.parquet'):
+        table = pq.read_table(path)
+        return table.column('CommentId').to_pylist(), ResultBatch.from_arrow(table)
+    df = pd.read_csv(path, encoding='utf-8-sig')
+    return df['CommentId'].tolist(), ResultBatch.from_frame(df)
+
+
+def load_frame(path, columns=None):
+    """
+    Read a stored artifact, projecting only the requested columns.
+    Parquet reads touch only those column chunks; CSV is parsed as before.
+    """
+    if path.endswith('.parquet'):
+        return pq.read_table(path, columns=columns).to_pandas()
+    df = pd.read_csv(path, encoding='utf-8-sig', usecols=columns)
+    if 'PublishedAt' in df.columns:
+        df['PublishedAt'] = pd.to_datetime(df['PublishedAt'], utc=True, errors='coerce')
+    return df
+
+
+def load_comments(path, columns=None):
+    """Read comments for analysis or charts; legacy CSVs only carry Username/Comment"""
+    if columns is not None and not path.endswith('.parquet'):
+        with open(path, 'r', encoding='utf-8-sig') as handle:
+            header = next(csv.reader(handle), [])
+        columns = [column for column in columns if column in header]
+    return load_frame(path, columns)
+
+
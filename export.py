@@ -0,0 +1,187 @@
+import io
+import os
+import gzip
+import hashlib
+import streamlit as st
+from comment_store import PARQUET_AVAILABLE, load_frame, load_results
+
+if PARQUET_AVAILABLE:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+# Downloads of a video's comments joined with their sentiment columns, as
+# CSV, JSONL or Parquet with optional gzip/zstd. Nothing is built until the
+# download button is clicked; the file is then written in record batches
+# straight into the artifact cache, named after the source artifacts' content
+# hashes, so repeat downloads of unchanged data are served from disk.
+
+CHUNK_ROWS = 10_000
+
+FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+COMPRESSION_MIME = {'gzip': 'application/gzip', 'zstd': 'application/zstd'}
+
+
+def available_formats():
+    return list(FORMATS) if PARQUET_AVAILABLE else ['csv', 'jsonl']
+
+
+def available_compressions():
+    # zstd streams come from pyarrow's codec; gzip only needs the standard library
+    return [None, 'gzip'] + (['zstd'] if PARQUET_AVAILABLE and pa.Codec.is_available('zstd') else [])
+
+
+def export_file_name(video_id, fmt, compression=None):
+    # Parquet compresses its column chunks internally, so the file keeps its extension
+    suffix = '' if fmt == 'parquet' else COMPRESSION_SUFFIXES.get(compression, '')
+    return f"{video_id}_comments.{fmt}{suffix}"
+
+
+def export_mime(fmt, compression=None):
+    if compression and fmt != 'parquet':
+        return COMPRESSION_MIME[compression]
+    return FORMATS[fmt]
+
+
+def _blob_digest(path):
+    """Artifact blobs are named by their content hash"""
+    return os.path.splitext(os.path.basename(path))[0] if path else ''
+
+
+class _KeepOpen(io.RawIOBase):
+    """Write-through wrapper whose close() leaves the cache's file open for fsync"""
+
+    def __init__(self, handle):
+        self.handle = handle
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self.handle.write(data)
+
+    def close(self):
+        self.handle.flush()
+
+
+def _export_table(comments_path, results_path):
+    """Comments plus their Sentiment/Confidence/Method/Language columns when results are stored"""
+    if comments_path.endswith('.parquet'):
+        comments = pq.read_table(comments_path)
+    else:
+        comments = pa.Table.from_pandas(load_frame(comments_path), preserve_index=False)
+    if results_path is None:
+        return comments
+    comment_ids, results = load_results(results_path)
+    table = _plain_columns(results.to_arrow(comment_ids))
+    if comments.column('CommentId').to_pylist() == comment_ids:
+        # Results are stored in comment order: add the columns without a join
+        for name in table.column_names[1:]:
+            comments = comments.append_column(name, table.column(name))
+        return comments
+    return _plain_columns(comments).join(table, keys='CommentId', join_type='left outer')
+
+
+def _plain_columns(table):
+    """Dictionary columns decoded, for writers that don't take them"""
+    return table.cast(pa.schema([
+        (field.name, field.type.value_type if pa.types.is_dictionary(field.type) else field.type) for field in table.schema
+    ]))
+
+
+def _write_export(table, handle, fmt, compression):
+    if fmt == 'parquet':
+        with pq.ParquetWriter(handle, table.schema, compression=compression or 'none') as writer:
+            for batch in table.to_batches(max_chunksize=CHUNK_ROWS):
+                writer.write_batch(batch)
+        return
+
+    sink = pa.PythonFile(_KeepOpen(handle), mode='w')
+    if compression:
+        sink = pa.CompressedOutputStream(sink, compression)
+    try:
+        if fmt == 'csv':
+            table = _plain_columns(table)
+            writer = pa_csv.CSVWriter(sink, table.schema)
+            for batch in table.to_batches(max_chunksize=CHUNK_ROWS):
+                writer.write_batch(batch)
+            writer.close()
+        else:
+            for batch in table.to_batches(max_chunksize=CHUNK_ROWS):
+                lines = batch.to_pandas().to_json(orient='records', lines=True, date_format='iso', force_ascii=False)
+                sink.write((lines if lines.endswith('\n') else lines + '\n').encode('utf-8'))
+    finally:
+        sink.close()
+
+
+def _write_export_pandas(comments_path, results_path, handle, fmt, compression):
+    """Without pyarrow: CSV artifacts in, CSV/JSONL (optionally gzip) out"""
+    df = load_frame(comments_path)
+    if results_path is not None:
+        df = df.merge(load_frame(results_path), on='CommentId', how='left')
+    stream = gzip.GzipFile(fileobj=handle, mode='wb') if compression == 'gzip' else handle
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    if fmt == 'csv':
+        df.to_csv(text, index=False)
+    else:
+        df.to_json(text, orient='records', lines=True, date_format='iso', force_ascii=False)
+    text.flush()
+    text.detach()
+    if stream is not handle:
+        stream.close()
+
+
+def export_artifact(cache, video_id, comments_path, fmt='csv', compression=None):
+    """
+    Path of the export for the video's current comments and results, built
+    on first request. A changed comments or results artifact gives a new name.
+    """
+    if fmt not in available_formats() or compression not in available_compressions():
+        raise ValueError(f"Unsupported export: {fmt} with {compression or 'no'} compression")
+    results_path = cache.path_for(video_id, 'results.parquet') or cache.path_for(video_id, 'results.csv')
+    source = hashlib.sha256(f"{_blob_digest(comments_path)}:{_blob_digest(results_path)}".encode()).hexdigest()[:16]
+    name = f"export_{source}_{compression or 'raw'}_{export_file_name(video_id, fmt, compression)}"
+    cached = cache.path_for(video_id, name)
+    if cached:
+        return cached
+
+    if PARQUET_AVAILABLE:
+        table = _export_table(comments_path, results_path)
+        return cache.write_with(video_id, name, lambda handle: _write_export(table, handle, fmt, compression))
+    return cache.write_with(video_id, name, lambda handle: _write_export_pandas(comments_path, results_path, handle, fmt, compression))
+
+
+def show_export_controls(cache, video_id, comments_path, key='export'):
+    """
+    Format and compression pickers with a download button. Runs as a
+    fragment so changing them doesn't rerun the analysis; the file is built
+    (or found in the cache) only when the button is clicked.
+    """
+    @st.fragment
+    def export_panel():
+        col1, col2, col3 = st.columns([1, 1, 1])
+        with col1:
+            fmt = st.selectbox("Format", available_formats(), key=f'{key}_format')
+        with col2:
+            compression = st.selectbox("Compression", available_compressions(), key=f'{key}_compression',
+                                       format_func=lambda value: value or 'none')
+
+        def build():
+            with open(export_artifact(cache, video_id, comments_path, fmt, compression), 'rb') as handle:
+                return handle.read()
+
+        with col3:
+            st.download_button(
+                label="📥 Download Comments",
+                data=build,
+                file_name=export_file_name(video_id, fmt, compression),
+                mime=export_mime(fmt, compression),
+                key=f'{key}_download'
+            )
+
+    export_panel()
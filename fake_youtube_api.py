@@ -0,0 +1,542 @@
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from comment_corpus import generate_comments
+from metrics import QUOTA_COSTS
+
+# A local stand-in for the YouTube Data API v3. It answers the same REST paths
+# the discovery client calls, so pointing build() at it with
+# client_options={'api_endpoint': server.endpoint} (or YOUTUBE_API_ENDPOINT for
+# the app) exercises the real scraper code without Google or an API key.
+
+API_PREFIX = '/youtube/v3/'
+RESOURCE_METHODS = {
+    'commentThreads': 'commentThreads.list',
+    'comments': 'comments.list',
+    'videos': 'videos.list',
+    'channels': 'channels.list',
+    'playlistItems': 'playlistItems.list',
+}
+
+
+class FakeApiConfig:
+    """Behaviour knobs; all of them can be changed while the server runs"""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, page_size=100, error_rate=0.0, quota_limit=None,
+                 rate_limit=None, comments_per_video=1500, videos_per_channel=12, seed=42):
+        self.latency_ms = latency_ms  # Added to every response
+        self.jitter_ms = jitter_ms  # Uniform random extra latency
+        self.page_size = page_size  # Upper bound on items per page, whatever maxResults asks for
+        self.error_rate = error_rate  # Probability of a 500/503 backendError
+        self.quota_limit = quota_limit  # Quota units before every call fails with quotaExceeded
+        self.rate_limit = rate_limit  # Requests per second before rateLimitExceeded
+        self.comments_per_video = comments_per_video
+        self.videos_per_channel = videos_per_channel  # Uploads listed for a synthetic channel
+        self.seed = seed
+
+
+def _stable_seed(value, seed):
+    return zlib.crc32(value.encode('utf-8')) ^ seed
+
+
+def _timestamp(value):
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class FakeYouTubeData:
+    """
+    Resources served by the fake API: recorded responses from `recordings_dir`
+    (one <video_id>.json per video, see record_video) when present, otherwise
+    synthetic ones generated deterministically from the video id.
+    """
+
+    def __init__(self, config, recordings_dir=None):
+        self.config = config
+        self.recordings_dir = recordings_dir
+        self._videos = {}
+        self._lock = threading.Lock()
+
+    def _load(self, video_id):
+        with self._lock:
+            if video_id not in self._videos:
+                self._videos[video_id] = self._recorded(video_id) or self._synthetic(video_id)
+            return self._videos[video_id]
+
+    def _recorded(self, video_id):
+        if not self.recordings_dir:
+            return None
+        path = os.path.join(self.recordings_dir, f"{video_id}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as handle:
+            return json.load(handle)
+
+    def _synthetic(self, video_id, channel_id=None, published=None):
+        if self.recordings_dir:
+            return None  # Replay mode serves recordings only
+        seed = _stable_seed(video_id, self.config.seed)
+        rng = random.Random(seed)
+        channel_id = channel_id or f"UCfake{seed % 10 ** 12:012d}"
+        records = generate_comments(self.config.comments_per_video, seed=seed)
+        threads = []
+        for record in records:
+            comment_id = f"{video_id}.{record['CommentId']}"
+            threads.append({
+                'kind': 'youtube#commentThread',
+                'id': comment_id,
+                'snippet': {
+                    'videoId': video_id,
+                    'channelId': channel_id,
+                    'topLevelComment': {
+                        'kind': 'youtube#comment',
+                        'id': comment_id,
+                        'snippet': {
+                            'videoId': video_id,
+                            'authorDisplayName': record['Username'],
+                            'authorChannelId': {'value': record['AuthorChannelId']},
+                            'textDisplay': record['Comment'],
+                            'textOriginal': record['Comment'],
+                            'likeCount': record['LikeCount'],
+                            'publishedAt': record['PublishedAt'],
+                            'updatedAt': record['PublishedAt'],
+                        },
+                    },
+                    'canReply': True,
+                    'totalReplyCount': record['ReplyCount'],
+                    'isPublic': True,
+                },
+            })
+        published = published or datetime(2023, 12, 31, tzinfo=timezone.utc)
+        return {
+            'video': {
+                'kind': 'youtube#video',
+                'id': video_id,
+                'snippet': {
+                    'publishedAt': _timestamp(published),
+                    'channelId': channel_id,
+                    'title': f"Synthetic video {video_id}",
+                    'description': 'Served by the fake YouTube API',
+                    'channelTitle': f"Synthetic channel {channel_id[-4:]}",
+                },
+                'statistics': {
+                    'viewCount': str(rng.randint(10 ** 3, 10 ** 8)),
+                    'likeCount': str(rng.randint(10, 10 ** 6)),
+                    'favoriteCount': '0',
+                    'commentCount': str(len(threads)),
+                },
+            },
+            'channel': self._synthetic_channel(channel_id),
+            'commentThreads': threads,
+            'replies': {},
+        }
+
+    def _synthetic_channel(self, channel_id):
+        rng = random.Random(_stable_seed(channel_id, self.config.seed))
+        published = datetime(2023, 12, 31, tzinfo=timezone.utc)
+        return {
+            'kind': 'youtube#channel',
+            'id': channel_id,
+            'snippet': {
+                'title': f"Synthetic channel {channel_id[-4:]}",
+                'description': 'A channel that only exists on localhost',
+                'publishedAt': _timestamp(published - timedelta(days=rng.randint(30, 4000))),
+                'thumbnails': {'high': {'url': 'https://yt3.ggpht.com/a/default-user=s800-c-k-c0x00ffffff-no-rj',
+                                        'width': 800, 'height': 800}},
+            },
+            'contentDetails': {'relatedPlaylists': {'uploads': 'UU' + channel_id[2:]}},
+            'statistics': {
+                'videoCount': str(self.config.videos_per_channel),
+                'subscriberCount': str(rng.randint(0, 10 ** 7)),
+                'viewCount': str(rng.randint(10 ** 4, 10 ** 10)),
+            },
+            'brandingSettings': {'channel': {'title': f"Synthetic channel {channel_id[-4:]}"}},
+        }
+
+    def video(self, video_id):
+        data = self._load(video_id)
+        return data['video'] if data else None
+
+    def channel(self, channel_id):
+        with self._lock:
+            videos = list(self._videos.values())
+        for data in videos:
+            if data and data['channel']['id'] == channel_id:
+                return data['channel']
+        if self.recordings_dir or not channel_id.startswith('UC'):
+            return None
+        return self._synthetic_channel(channel_id)
+
+    def channel_for_handle(self, handle):
+        if self.recordings_dir:
+            return None
+        seed = _stable_seed(handle.lstrip('@').lower(), self.config.seed)
+        return self.channel(f"UCfake{seed % 10 ** 18:018d}")
+
+    def uploads(self, playlist_id):
+        """playlistItems of a synthetic channel's uploads playlist, newest first"""
+        if self.recordings_dir or not playlist_id.startswith('UU'):
+            return None
+        channel_id = 'UC' + playlist_id[2:]
+        newest = datetime(2023, 12, 31, tzinfo=timezone.utc)
+        items = []
+        for position in range(self.config.videos_per_channel):
+            video_id = f"{channel_id[-7:]}{position:04d}"
+            published = newest - timedelta(days=3 * position)
+            with self._lock:
+                if video_id not in self._videos:
+                    self._videos[video_id] = self._synthetic(video_id, channel_id=channel_id, published=published)
+                title = self._videos[video_id]['video']['snippet']['title']
+            items.append({
+                'kind': 'youtube#playlistItem',
+                'id': f"{playlist_id}.{video_id}",
+                'snippet': {
+                    'publishedAt': _timestamp(published),
+                    'channelId': channel_id,
+                    'title': title,
+                    'playlistId': playlist_id,
+                    'position': position,
+                    'resourceId': {'kind': 'youtube#video', 'videoId': video_id},
+                },
+                'contentDetails': {'videoId': video_id, 'videoPublishedAt': _timestamp(published)},
+            })
+        return items
+
+    def comment_threads(self, video_id, order='relevance'):
+        data = self._load(video_id)
+        if data is None:
+            return None
+        threads = data['commentThreads']
+        if order == 'time':
+            return sorted(threads, key=lambda t: t['snippet']['topLevelComment']['snippet']['publishedAt'], reverse=True)
+        return sorted(threads, key=lambda t: t['snippet']['topLevelComment']['snippet'].get('likeCount', 0), reverse=True)
+
+    def replies(self, parent_id):
+        video_id = parent_id.split('.', 1)[0]
+        data = self._load(video_id)
+        if data is None:
+            return []
+        if parent_id in data['replies']:
+            return data['replies'][parent_id]
+        thread = next((t for t in data['commentThreads'] if t['id'] == parent_id), None)
+        if thread is None:
+            return []
+        rng = random.Random(_stable_seed(parent_id, self.config.seed))
+        top = thread['snippet']['topLevelComment']['snippet']
+        replies = []
+        for i, record in enumerate(generate_comments(thread['snippet']['totalReplyCount'], seed=rng.randint(0, 2 ** 31))):
+            replies.append({
+                'kind': 'youtube#comment',
+                'id': f"{parent_id}.r{i}",
+                'snippet': {
+                    'parentId': parent_id,
+                    'authorDisplayName': record['Username'],
+                    'authorChannelId': {'value': record['AuthorChannelId']},
+                    'textDisplay': record['Comment'],
+                    'textOriginal': record['Comment'],
+                    'likeCount': record['LikeCount'],
+                    'publishedAt': max(top['publishedAt'], record['PublishedAt']),
+                },
+            })
+        data['replies'][parent_id] = replies
+        return replies
+
+
+class ApiError(Exception):
+    """An error response in the Google API JSON error format"""
+
+    def __init__(self, status, reason, message, domain='youtube.api'):
+        super().__init__(message)
+        self.status = status
+        self.body = {'error': {'code': status, 'message': message,
+                               'errors': [{'domain': domain, 'reason': reason, 'message': message}]}}
+
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        fake = self.server.fake
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if url.path == '/_stats':
+            return self._send(200, fake.stats())
+
+        try:
+            if not url.path.startswith(API_PREFIX):
+                raise ApiError(404, 'notFound', f"Unknown path {url.path}", domain='global')
+            resource = url.path[len(API_PREFIX):].strip('/')
+            method = RESOURCE_METHODS.get(resource)
+            if method is None:
+                raise ApiError(404, 'notFound', f"Unsupported resource {resource}", domain='global')
+            fake.before_request(method)
+            payload = getattr(self, f"_list_{resource}")(fake, params)
+        except ApiError as error:
+            fake.count('errors', error.body['error']['errors'][0]['reason'])
+            return self._send(error.status, error.body)
+        self._send(200, payload)
+
+    def do_POST(self):
+        if urlparse(self.path).path == '/_reset':
+            self.server.fake.reset()
+            return self._send(200, {'reset': True})
+        self._send(404, {'error': {'code': 404, 'message': 'Not found'}})
+
+    def _page(self, fake, items, params, kind):
+        page_size = max(1, min(int(params.get('maxResults', 20)), fake.config.page_size))
+        offset = int(params['pageToken'][1:]) if params.get('pageToken', '').startswith('p') else 0
+        page = items[offset:offset + page_size]
+        payload = {
+            'kind': kind,
+            'pageInfo': {'totalResults': len(items), 'resultsPerPage': page_size},
+            'items': page,
+        }
+        if offset + page_size < len(items):
+            payload['nextPageToken'] = f"p{offset + page_size}"
+        return payload
+
+    def _list_commentThreads(self, fake, params):
+        video_id = params.get('videoId')
+        threads = fake.data.comment_threads(video_id, params.get('order', 'relevance')) if video_id else None
+        if threads is None:
+            raise ApiError(404, 'videoNotFound', f"The video identified by the videoId parameter ({video_id}) could not be found.")
+        return self._page(fake, threads, params, 'youtube#commentThreadListResponse')
+
+    def _list_comments(self, fake, params):
+        parent_id = params.get('parentId')
+        if not parent_id:
+            raise ApiError(400, 'missingRequiredParameter', 'No filter selected. Expected one of: parentId, id')
+        return self._page(fake, fake.data.replies(parent_id), params, 'youtube#commentListResponse')
+
+    def _list_videos(self, fake, params):
+        ids = [i for i in params.get('id', '').split(',') if i]
+        items = [video for video in (fake.data.video(i) for i in ids) if video]
+        return {'kind': 'youtube#videoListResponse', 'pageInfo': {'totalResults': len(items), 'resultsPerPage': len(items)}, 'items': items}
+
+    def _list_channels(self, fake, params):
+        if params.get('forHandle'):
+            items = [channel for channel in [fake.data.channel_for_handle(params['forHandle'])] if channel]
+        else:
+            ids = [i for i in params.get('id', '').split(',') if i]
+            if len(ids) > 50:
+                raise ApiError(400, 'invalidValue', 'The id parameter accepts at most 50 comma-separated values.')
+            items = [channel for channel in (fake.data.channel(i) for i in ids) if channel]
+        return {'kind': 'youtube#channelListResponse', 'pageInfo': {'totalResults': len(items), 'resultsPerPage': len(items)}, 'items': items}
+
+    def _list_playlistItems(self, fake, params):
+        playlist_id = params.get('playlistId')
+        if not playlist_id:
+            raise ApiError(400, 'missingRequiredParameter', 'No filter selected. Expected one of: playlistId, id')
+        items = fake.data.uploads(playlist_id)
+        if items is None:
+            raise ApiError(404, 'playlistNotFound', "The playlist identified with the request's playlistId parameter cannot be found.")
+        return self._page(fake, items, params, 'youtube#playlistItemListResponse')
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeYouTubeServer:
+    """
+    Threaded fake API server. Use as a context manager or call start()/stop();
+    `endpoint` is the value for client_options['api_endpoint'].
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, config=None, recordings_dir=None):
+        self.config = config or FakeApiConfig()
+        self.data = FakeYouTubeData(self.config, recordings_dir=recordings_dir)
+        self._httpd = ThreadingHTTPServer((host, port), FakeApiHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self._thread = None
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.config.seed)
+        self.reset()
+
+    @property
+    def endpoint(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='fake-youtube-api', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def reset(self):
+        """Forget used quota, rate-limit state and request counts"""
+        with self._lock:
+            self._quota_used = 0
+            self._tokens = float(self.config.rate_limit or 0)
+            self._last_refill = time.monotonic()
+            self._counts = {'requests': {}, 'errors': {}}
+
+    def count(self, group, key):
+        with self._lock:
+            self._counts[group][key] = self._counts[group].get(key, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return {'quota_used': self._quota_used, **json.loads(json.dumps(self._counts))}
+
+    def before_request(self, method):
+        """Apply latency and fault injection for one API call (raises ApiError)"""
+        config = self.config
+        delay = config.latency_ms + (self._rng.uniform(0, config.jitter_ms) if config.jitter_ms else 0)
+        if delay:
+            time.sleep(delay / 1000)
+        self.count('requests', method)
+
+        with self._lock:
+            if config.rate_limit:
+                now = time.monotonic()
+                self._tokens = min(config.rate_limit, self._tokens + (now - self._last_refill) * config.rate_limit)
+                self._last_refill = now
+                if self._tokens < 1:
+                    raise ApiError(429, 'rateLimitExceeded', 'The request cannot be completed because you have exceeded your quota.', domain='youtube.quota')
+                self._tokens -= 1
+            if config.quota_limit is not None and self._quota_used >= config.quota_limit:
+                raise ApiError(403, 'quotaExceeded', 'The request cannot be completed because you have exceeded your <a href="/youtube/v3/getting-started#quota">quota</a>.', domain='youtube.quota')
+            self._quota_used += QUOTA_COSTS.get(method, 1)
+            fail = config.error_rate and self._rng.random() < config.error_rate
+
+        if fail:
+            status = self._rng.choice([500, 503])
+            raise ApiError(status, 'backendError', 'Backend Error', domain='global')
+
+
+def record_video(youtube, video_id, out_dir, max_threads=1200):
+    """Save a real video's API responses as a recording the fake server can replay"""
+    video = youtube.videos().list(part='snippet,statistics', id=video_id).execute()['items'][0]
+    channel = youtube.channels().list(part='snippet,statistics,brandingSettings', id=video['snippet']['channelId']).execute()['items'][0]
+    threads = []
+    request = youtube.commentThreads().list(part='snippet', videoId=video_id, textFormat='plainText', maxResults=100, order='relevance')
+    while request is not None and len(threads) < max_threads:
+        response = request.execute()
+        threads.extend(response['items'])
+        request = youtube.commentThreads().list_next(request, response)
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{video_id}.json")
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump({'video': video, 'channel': channel, 'commentThreads': threads, 'replies': {}}, handle)
+    return path
+
+
+def self_check():
+    """Paginate, inject a quota error and a 5xx through the real discovery client"""
+    from googleapiclient.discovery import build
+    from googleapiclient.errors import HttpError
+
+    with FakeYouTubeServer(config=FakeApiConfig(page_size=50, comments_per_video=230)) as server:
+        youtube = build('youtube', 'v3', developerKey='offline-test-key', client_options={'api_endpoint': server.endpoint})
+        request = youtube.commentThreads().list(part='snippet', videoId='dQw4w9WgXcQ', maxResults=100, order='relevance')
+        items = []
+        while request is not None:
+            response = request.execute()
+            items.extend(response['items'])
+            request = youtube.commentThreads().list_next(request, response)
+        channel_id = youtube.videos().list(part='snippet', id='dQw4w9WgXcQ').execute()['items'][0]['snippet']['channelId']
+        channel = youtube.channels().list(part='snippet,statistics', id=channel_id).execute()['items'][0]
+        assert len(items) == 230, len(items)
+        assert channel['id'] == channel_id
+
+        uploads = youtube.channels().list(part='contentDetails', forHandle='@offline').execute()['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+        request = youtube.playlistItems().list(part='contentDetails', playlistId=uploads, maxResults=5)
+        videos = []
+        while request is not None:
+            response = request.execute()
+            videos.extend(item['contentDetails']['videoId'] for item in response['items'])
+            request = youtube.playlistItems().list_next(request, response)
+        assert len(videos) == server.config.videos_per_channel, len(videos)
+
+        authors = sorted({item['snippet']['topLevelComment']['snippet']['authorChannelId']['value'] for item in items})[:50]
+        found = youtube.channels().list(part='snippet', id=','.join(authors), maxResults=50).execute()['items']
+        assert sorted(channel['id'] for channel in found) == authors, len(found)
+
+        server.config.quota_limit = server.stats()['quota_used']
+        try:
+            youtube.videos().list(part='statistics', id='dQw4w9WgXcQ').execute()
+            raise AssertionError("quotaExceeded was not raised")
+        except HttpError as error:
+            assert error.resp.status == 403 and 'quotaExceeded' in str(error.content)
+
+        server.config.quota_limit = None
+        server.config.error_rate = 1.0
+        try:
+            youtube.videos().list(part='statistics', id='dQw4w9WgXcQ').execute(num_retries=0)
+            raise AssertionError("backendError was not raised")
+        except HttpError as error:
+            assert error.resp.status in (500, 503)
+        print(json.dumps(server.stats(), indent=2))
+    print("Self-check passed: pagination, uploads playlists, batched channel lookups, quotaExceeded and 5xx injection work through build()")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a fake YouTube Data API v3 for offline testing")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Probability of a 500/503 per request")
+    parser.add_argument('--quota-limit', type=int, help="Quota units before quotaExceeded")
+    parser.add_argument('--rate-limit', type=float, help="Requests per second before rateLimitExceeded")
+    parser.add_argument('--comments', type=int, default=1500, help="Comment threads per synthetic video")
+    parser.add_argument('--videos', type=int, default=12, help="Uploads per synthetic channel")
+    parser.add_argument('--recordings', help="Directory of recorded <video_id>.json responses to replay")
+    parser.add_argument('--record', nargs='+', metavar='VIDEO_ID', help="Record real responses (needs YOUTUBE_API_KEY) instead of serving")
+    parser.add_argument('--self-check', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.self_check:
+        return self_check()
+
+    if args.record:
+        from googleapiclient.discovery import build
+        youtube = build('youtube', 'v3', developerKey=os.environ['YOUTUBE_API_KEY'])
+        for video_id in args.record:
+            print(f"Recorded {record_video(youtube, video_id, args.recordings or 'recordings')}")
+        return 0
+
+    config = FakeApiConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, page_size=args.page_size,
+                           error_rate=args.error_rate, quota_limit=args.quota_limit, rate_limit=args.rate_limit,
+                           comments_per_video=args.comments, videos_per_channel=args.videos)
+    server = FakeYouTubeServer(host=args.host, port=args.port, config=config, recordings_dir=args.recordings)
+    print(f"Fake YouTube API on {server.endpoint} (stats at {server.endpoint}/_stats)")
+    print(f"Point the app at it with: YOUTUBE_API_ENDPOINT={server.endpoint}")
+    server.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
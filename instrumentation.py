@@ -0,0 +1,232 @@
+import os
+import sys
+import json
+import time
+import threading
+import contextvars
+from datetime import datetime
+from contextlib import contextmanager
+from artifact_cache import CACHE_DIR, atomic_write
+from metrics import observe_stage
+
+# Per-run JSON traces land here; set TRACE_DIR='' to disable writing them
+TRACE_DIR = os.environ.get('TRACE_DIR', os.path.join(CACHE_DIR, 'traces'))
+MAX_TRACE_FILES = 50
+PROFILE_SAMPLING = os.environ.get('PROFILE_SAMPLING', '') not in ('', '0', 'false')
+SAMPLE_INTERVAL = float(os.environ.get('PROFILE_SAMPLE_INTERVAL', 0.005))
+
+_current_trace = contextvars.ContextVar('current_trace', default=None)
+# Open collect_stages() dicts for this context (a tuple, so copied contexts don't share appends)
+_stage_collectors = contextvars.ContextVar('stage_collectors', default=())
+
+# Callables invoked as hook(stage, seconds, count) for every finished span
+span_hooks = []
+
+# thread id -> stack of active stage names, read by the sampling profiler (empty stacks are dropped)
+_active_stages = {}
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+class RunTrace:
+    """Timings for one analysis run, grouped by stage"""
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.wall_started = time.perf_counter()
+        self.wall_seconds = None
+        self.stages = {}
+        self.profile = None
+        self._lock = threading.Lock()
+        self._token = None
+        self._profiler = None
+
+    def record(self, stage, seconds, count=1):
+        with self._lock:
+            calls = self.stages.setdefault(stage, {'durations': [], 'items': 0})
+            calls['durations'].append(seconds)
+            calls['items'] += count
+
+    def summary(self):
+        """Per-stage call count, item count, total and latency percentiles"""
+        with self._lock:
+            stages = {stage: (list(data['durations']), data['items']) for stage, data in self.stages.items()}
+        report = {}
+        for stage, (durations, items) in stages.items():
+            durations.sort()
+            total = sum(durations)
+            report[stage] = {
+                'calls': len(durations),
+                'items': items,
+                'total_seconds': total,
+                'items_per_second': items / total if total else None,
+                'p50_seconds': percentile(durations, 0.50),
+                'p95_seconds': percentile(durations, 0.95),
+                'p99_seconds': percentile(durations, 0.99),
+                'max_seconds': durations[-1] if durations else 0.0,
+            }
+        return report
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'started_at': self.started_at,
+            'wall_seconds': self.wall_seconds,
+            'stages': self.summary(),
+            'profile': self.profile,
+        }
+
+    def write_json(self, directory=TRACE_DIR):
+        """Persist the trace as JSON and prune old traces"""
+        if not directory:
+            return None
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        safe_name = ''.join(c if c.isalnum() or c in '-_' else '_' for c in self.name)
+        path = os.path.join(directory, f"{stamp}_{safe_name}.json")
+        data = json.dumps(self.to_dict(), indent=2).encode('utf-8')
+        atomic_write(path, lambda handle: handle.write(data))
+        traces = sorted(f for f in os.listdir(directory) if f.endswith('.json'))
+        for old in traces[:-MAX_TRACE_FILES]:
+            try:
+                os.remove(os.path.join(directory, old))
+            except OSError:
+                pass
+        return path
+
+
+class _Span:
+    """Handle yielded by span(); set .count once the number of items is known"""
+    __slots__ = ('count',)
+
+    def __init__(self, count):
+        self.count = count
+
+
+@contextmanager
+def span(stage, count=1):
+    """Time a stage and record it on the current run trace (if any)"""
+    thread_id = threading.get_ident()
+    stack = _active_stages.setdefault(thread_id, [])
+    stack.append(stage)
+    handle = _Span(count)
+    started = time.perf_counter()
+    try:
+        yield handle
+    finally:
+        seconds = time.perf_counter() - started
+        stack.pop()
+        if not stack:
+            _active_stages.pop(thread_id, None)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.record(stage, seconds, handle.count)
+        for collector in _stage_collectors.get():
+            collector[stage] = collector.get(stage, 0) + handle.count
+        observe_stage(stage, seconds, handle.count)
+        for hook in span_hooks:
+            try:
+                hook(stage, seconds, handle.count)
+            except Exception:
+                pass
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def collect_stages():
+    """
+    Item counts per stage for the spans finished inside this block, in this
+    context only: unlike the run trace, concurrent analyses (e.g. channel
+    mode's per-video contexts) don't add into each other.
+    """
+    collector = {}
+    token = _stage_collectors.set(_stage_collectors.get() + (collector,))
+    try:
+        yield collector
+    finally:
+        _stage_collectors.reset(token)
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's Python stack at a fixed interval and attributes
+    each sample to the innermost active span, so hot functions show up per
+    stage. Enabled with PROFILE_SAMPLING=1.
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL, top=25):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.top = top
+        self.samples = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.report()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = _active_stages.get(self.thread_id) or ['(untracked)']
+            code = frame.f_code
+            key = (stack[-1], f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+            self.samples[key] = self.samples.get(key, 0) + 1
+
+    def report(self):
+        """Most frequently sampled locations, with their stage"""
+        ranked = sorted(self.samples.items(), key=lambda item: item[1], reverse=True)[:self.top]
+        return {
+            'interval_seconds': self.interval,
+            'total_samples': sum(self.samples.values()),
+            'hotspots': [{'stage': stage, 'location': location, 'samples': count} for (stage, location), count in ranked],
+        }
+
+
+def start_run(name, profile=PROFILE_SAMPLING):
+    """Make a new RunTrace current for this context; pair with finish_run()"""
+    trace = RunTrace(name)
+    trace._token = _current_trace.set(trace)
+    trace._profiler = SamplingProfiler(threading.get_ident()).start() if profile else None
+    return trace
+
+
+def finish_run(trace, write_json=True):
+    """Stop collecting for `trace` and write its JSON report"""
+    trace.wall_seconds = time.perf_counter() - trace.wall_started
+    if trace._profiler is not None:
+        trace.profile = trace._profiler.stop()
+    _current_trace.reset(trace._token)
+    if write_json:
+        try:
+            trace.write_json()
+        except OSError:
+            pass
+    return trace
+
+
+@contextmanager
+def trace_run(name, write_json=True, profile=PROFILE_SAMPLING):
+    """Collect spans for one run; write the JSON trace when it finishes"""
+    trace = start_run(name, profile=profile)
+    try:
+        yield trace
+    finally:
+        finish_run(trace, write_json=write_json)
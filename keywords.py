@@ -0,0 +1,206 @@
+import re
+import json
+import heapq
+from collections import Counter
+import numpy as np
+import pandas as pd
+import streamlit as st
+from result_batch import SENTIMENTS
+from sentiment_backends import config_value
+
+# What commenters talk about: the most frequent terms and two-word phrases per
+# sentiment class, counted as the number of comments that mention them. Each
+# (sentiment, n-gram size) pair keeps a Space-Saving summary of at most
+# KEYWORD_CAPACITY counters, so memory stays fixed however many comments
+# stream through, and summaries merge across batches, videos and channels.
+
+KEYWORD_CAPACITY = int(config_value('KEYWORD_CAPACITY', 1000))  # Counters per sentiment and n-gram size
+KEYWORD_BATCH = 2000  # Comments counted exactly before folding into the summaries
+NGRAM_SIZES = (1, 2)
+TOP_TERMS = 15
+KEYWORDS_ARTIFACT = 'keywords.json'
+
+TOKEN_PATTERN = re.compile(r"[^\W\d_][\w']+")
+CLEANUP_PATTERN = re.compile(r"https?://\S+|[@#]\w+")
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are aren't as at be because been before being below
+between both but by can can't cannot could couldn't did didn't do does doesn't doing don't down during each
+even ever every few for from further get gets got had hadn't has hasn't have haven't having he he'd he'll he's
+her here here's hers herself him himself his how how's i i'd i'll i'm i've if im in into is isn't it it's its
+itself just let's like me more most much mustn't my myself no nor not now of off on once one only or other
+ought our ours ourselves out over own really same shan't she she'd she'll she's should shouldn't so some
+still such than that that's the their theirs them themselves then there there's these they they'd they'll
+they're they've this those through to too under until up us very was wasn't we we'd we'll we're we've were
+weren't what what's when when's where where's which while who who's whom why why's will with won't would
+wouldn't yeah you you'd you'll you're you've your yours yourself yourselves
+""".split())
+
+
+def tokenize(text):
+    """Lowercased words without links, mentions, hashtags or numbers"""
+    return TOKEN_PATTERN.findall(CLEANUP_PATTERN.sub(' ', str(text).lower()))
+
+
+def comment_terms(tokens, n):
+    """Distinct n-grams of a comment, skipping stopwords (phrases may not start or end with one)"""
+    if n == 1:
+        return {token for token in tokens if token not in STOPWORDS}
+    return {
+        ' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1)
+        if tokens[i] not in STOPWORDS and tokens[i + n - 1] not in STOPWORDS
+    }
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter summary: at most `capacity` counters, each an
+    overestimate of its term's count by at most `errors[term]` (and never by
+    more than total / capacity). Merging two summaries keeps both guarantees.
+    """
+
+    def __init__(self, capacity=KEYWORD_CAPACITY, counts=None, errors=None, total=0):
+        self.capacity = capacity
+        self.counts = counts or {}
+        self.errors = errors or {}
+        self.total = total
+
+    @property
+    def floor(self):
+        """Highest count an untracked term can have"""
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def update(self, term_counts):
+        """Fold in exact counts for a batch"""
+        self._combine(term_counts, {}, 0, sum(term_counts.values()))
+        return self
+
+    def merge(self, other):
+        """Fold in another summary"""
+        self._combine(other.counts, other.errors, other.floor, other.total)
+        return self
+
+    def _combine(self, counts, errors, floor, total):
+        own_floor = self.floor
+        merged = {}
+        for term in self.counts.keys() | counts.keys():
+            count, error = (self.counts[term], self.errors[term]) if term in self.counts else (own_floor, own_floor)
+            if term in counts:
+                count, error = count + counts[term], error + errors.get(term, 0)
+            else:
+                count, error = count + floor, error + floor
+            merged[term] = (count, error)
+        kept = heapq.nlargest(self.capacity, merged.items(), key=lambda item: item[1][0])
+        self.counts = {term: count for term, (count, _) in kept}
+        self.errors = {term: error for term, (_, error) in kept}
+        self.total += total
+
+    def top(self, k=TOP_TERMS):
+        """[(term, estimated count, maximum overestimate)], most frequent first"""
+        return [(term, count, self.errors[term])
+                for term, count in heapq.nlargest(k, self.counts.items(), key=lambda item: item[1])]
+
+    def to_dict(self):
+        return {'capacity': self.capacity, 'total': self.total,
+                'terms': [[term, count, self.errors[term]] for term, count in self.counts.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            capacity=data['capacity'], total=data['total'],
+            counts={term: count for term, count, _ in data['terms']},
+            errors={term: error for term, _, error in data['terms']},
+        )
+
+
+class KeywordSketch:
+    """Space-Saving summaries of terms and phrases per sentiment class"""
+
+    def __init__(self, backend=None, capacity=KEYWORD_CAPACITY, summaries=None):
+        self.backend = backend
+        self.summaries = summaries or {
+            (sentiment, n): SpaceSaving(capacity) for sentiment in SENTIMENTS for n in NGRAM_SIZES
+        }
+
+    def add(self, texts, sentiment):
+        """Count the terms of comments (texts with their int8 sentiment codes) in fixed-size batches"""
+        sentiment = np.asarray(sentiment)
+        for start in range(0, len(texts), KEYWORD_BATCH):
+            batch = {key: Counter() for key in self.summaries}
+            for text, code in zip(texts[start:start + KEYWORD_BATCH], sentiment[start:start + KEYWORD_BATCH].tolist()):
+                tokens = tokenize(text)
+                for n in NGRAM_SIZES:
+                    batch[(SENTIMENTS[code], n)].update(comment_terms(tokens, n))
+            for key, counts in batch.items():
+                if counts:
+                    self.summaries[key].update(counts)
+        return self
+
+    def merge(self, other):
+        """Fold in another sketch (another batch, shard or video)"""
+        for key, summary in other.summaries.items():
+            self.summaries[key].merge(summary)
+        return self
+
+    def top(self, sentiment, n=1, k=TOP_TERMS):
+        return self.summaries[(sentiment, n)].top(k)
+
+    @property
+    def empty(self):
+        return not any(summary.counts for summary in self.summaries.values())
+
+    def to_json(self):
+        return json.dumps({
+            'backend': self.backend,
+            'summaries': {f'{sentiment}:{n}': summary.to_dict() for (sentiment, n), summary in self.summaries.items()},
+        })
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        summaries = {}
+        for key, summary in data['summaries'].items():
+            sentiment, n = key.split(':')
+            summaries[(sentiment, int(n))] = SpaceSaving.from_dict(summary)
+        return cls(backend=data.get('backend'), summaries=summaries)
+
+
+def merge_keywords(sketches):
+    """One sketch over several videos' sketches, leaving them unchanged"""
+    merged = KeywordSketch()
+    for sketch in sketches:
+        if sketch is not None:
+            merged.merge(sketch)
+    return merged
+
+
+def store_keywords(cache, video_id, sketch):
+    cache.write_with(video_id, KEYWORDS_ARTIFACT, lambda handle: handle.write(sketch.to_json()),
+                     mode='w', encoding='utf-8')
+
+
+def load_keywords(cache, video_id):
+    """The stored keyword sketch for a video, or None"""
+    path = cache.path_for(video_id, KEYWORDS_ARTIFACT)
+    if path is None:
+        return None
+    with open(path, encoding='utf-8') as handle:
+        return KeywordSketch.from_json(handle.read())
+
+
+def show_keywords(sketch, k=TOP_TERMS):
+    """Top terms and phrases side by side for each sentiment class"""
+    for tab, n in zip(st.tabs(["Terms", "Phrases"]), NGRAM_SIZES):
+        with tab:
+            for column, (sentiment, icon) in zip(st.columns(3), [
+                ('positive', '😊'), ('negative', '😠'), ('neutral', '😐'),
+            ]):
+                with column:
+                    st.markdown(f'<h3 style="color: white; text-align: center;">{icon} {sentiment.title()}</h3>',
+                                unsafe_allow_html=True)
+                    top = sketch.top(sentiment, n, k)
+                    if top:
+                        st.dataframe(pd.DataFrame([(term, count) for term, count, _ in top],
+                                                  columns=['Term' if n == 1 else 'Phrase', 'Comments']),
+                                     hide_index=True)
+                    else:
+                        st.caption("No terms yet")
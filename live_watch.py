@@ -0,0 +1,244 @@
+import time
+from collections import Counter
+import numpy as np
+import pandas as pd
+import streamlit as st
+from googleapiclient.errors import HttpError
+from YoutubeCommentScrapper import comment_pages
+from artifact_cache import get_artifact_cache
+from comment_store import comment_record, load_comments
+from comment_index import get_comment_index
+from result_batch import SENTIMENTS
+from Senti import score_comments
+from timeline import epoch_seconds, update_timeline
+from keywords import store_keywords
+from instrumentation import span
+from metrics import comments_fetched
+from sentiment_backends import config_value, get_backend
+
+# Watch mode for launches and premieres: poll commentThreads with
+# order='time' and stop paging as soon as a page reaches comments already
+# counted, so each poll costs one quota unit unless comments arrive faster than
+# a page per interval. Only the new comments are scored and folded into the
+# running totals, and the interval follows the arrival rate.
+
+WATCH_TICK_SECONDS = 5  # How often the live panel wakes up to check whether a poll is due
+WATCH_MIN_INTERVAL = float(config_value('WATCH_MIN_INTERVAL', 15))
+WATCH_MAX_INTERVAL = float(config_value('WATCH_MAX_INTERVAL', 600))
+WATCH_TARGET_PER_POLL = float(config_value('WATCH_TARGET_PER_POLL', 50))  # New comments we aim to see per poll
+WATCH_MAX_PAGES = int(config_value('WATCH_MAX_PAGES', 5))  # Catch-up cap per poll
+RATE_SMOOTHING = 0.5  # Weight of the latest poll in the arrival-rate average
+
+
+class CommentWatcher:
+    """
+    Delta polling state for one video: the newest comment counted so far
+    (watermark, plus the ids published in that same second), running
+    sentiment totals and the adaptive polling interval.
+    """
+
+    def __init__(self, video_id, backend=None, watermark=None, watermark_ids=(), totals=None, keywords=None):
+        self.video_id = video_id
+        self.backend = backend
+        self.watermark = watermark
+        self.watermark_ids = set(watermark_ids)
+        totals = totals or {}
+        self.counts = Counter({sentiment: totals.get(f'num_{sentiment}', 0) for sentiment in ('positive', 'negative', 'neutral')})
+        self.total = totals.get('total_comments', 0)
+        self.confidence_sum = totals.get('avg_confidence', 0.0) * self.total
+        self.language_stats = Counter(totals.get('language_stats', {}))
+        self.method_stats = Counter(totals.get('method_stats', {}))
+        self.keywords = keywords
+        self.interval = WATCH_MIN_INTERVAL
+        self.rate = None  # Comments per second, smoothed
+        self.polls = 0
+        self.quota_used = 0
+        self.last_poll = time.time()
+        self.next_poll = self.last_poll + self.interval
+        self.last_delta = []  # (comment record, sentiment, confidence) from the latest poll
+
+    @classmethod
+    def from_stored(cls, video_id, comments_path, results, backend=None):
+        """Start from a finished analysis: its totals and its newest stored comment"""
+        comments_df = load_comments(comments_path, columns=['CommentId', 'PublishedAt'])
+        published = epoch_seconds(comments_df['PublishedAt'])
+        watermark, watermark_ids = None, ()
+        if len(published) and published.max() >= 0:
+            watermark = int(published.max())
+            watermark_ids = comments_df['CommentId'][published == watermark].tolist()
+        return cls(video_id, backend=backend, watermark=watermark, watermark_ids=watermark_ids, totals=results,
+                   keywords=results.get('keywords'))
+
+    @property
+    def avg_confidence(self):
+        return self.confidence_sum / self.total if self.total else 0.0
+
+    def results(self):
+        """Running totals in the shape of analyze_sentiment's results"""
+        return {
+            'num_positive': self.counts['positive'],
+            'num_negative': self.counts['negative'],
+            'num_neutral': self.counts['neutral'],
+            'avg_confidence': self.avg_confidence,
+            'language_stats': dict(self.language_stats),
+            'method_stats': dict(self.method_stats),
+            'total_comments': self.total,
+        }
+
+    def _is_new(self, published, comment_id):
+        return self.watermark is None or published > self.watermark or (
+            published == self.watermark and comment_id not in self.watermark_ids)
+
+    def fetch_delta(self):
+        """Comments published since the watermark, newest first"""
+        delta = []
+        caught_up = False
+        pages = comment_pages(self.video_id, max_comments=WATCH_MAX_PAGES * 100, max_pages=WATCH_MAX_PAGES,
+                              order='time', allow_page=lambda: not caught_up)
+        for items in pages:
+            self.quota_used += 1
+            records = [comment_record(item) for item in items]
+            comments_fetched.inc(len(records))
+            published = epoch_seconds([record['PublishedAt'] for record in records])
+            for record, seconds in zip(records, published.tolist()):
+                if self._is_new(seconds, record['CommentId']):
+                    delta.append((record, seconds))
+                else:
+                    caught_up = True  # Newest-first: everything after this was counted already
+            # First poll without a stored analysis: one page is the baseline
+            caught_up = caught_up or self.watermark is None
+        return delta
+
+    def poll(self, cache=None, index=None):
+        """
+        Fetch and score new comments, fold them into the totals (and the
+        stored timeline and search index when given) and schedule the next poll.
+        Returns the number of new comments.
+        """
+        now = time.time()
+        elapsed = max(now - self.last_poll, 1.0)
+        with span('watch_fetch') as fetch_span:
+            delta = self.fetch_delta()
+            fetch_span.count = len(delta)
+
+        self.last_delta = []
+        if delta:
+            records = [record for record, _ in delta]
+            with span('watch_analyze', len(records)):
+                scored, backend_name = score_comments([record['Comment'] or '' for record in records], self.backend)
+            self._merge(scored)
+            self.last_delta = list(zip(records, [SENTIMENTS[code] for code in scored.sentiment.tolist()], scored.confidence.tolist()))
+
+            published = np.array([seconds for _, seconds in delta], dtype=np.int64)
+            newest = int(published.max())
+            newest_ids = {record['CommentId'] for record, seconds in delta if seconds == newest}
+            if self.watermark is None or newest > self.watermark:
+                self.watermark, self.watermark_ids = newest, newest_ids
+            elif newest == self.watermark:
+                self.watermark_ids |= newest_ids
+
+            if self.keywords is not None:
+                with span('keywords', len(records)):
+                    self.keywords.add([record['Comment'] or '' for record in records], scored.sentiment)
+            if cache is not None:
+                with span('timeline', len(records)):
+                    update_timeline(cache, self.video_id, [record['CommentId'] for record in records],
+                                    [record['PublishedAt'] for record in records], scored, backend_name)
+                if self.keywords is not None:
+                    store_keywords(cache, self.video_id, self.keywords)
+            if index is not None:
+                with span('search_index', len(records)):
+                    index.index_video(self.video_id, pd.DataFrame(records), scored, replace=False)
+
+        self.polls += 1
+        self.last_poll = now
+        self._adapt(len(delta), elapsed)
+        return len(delta)
+
+    def _merge(self, scored):
+        for sentiment, count in scored.sentiment_counts().items():
+            self.counts[sentiment] += count
+        self.total += len(scored)
+        self.confidence_sum += float(scored.confidence.sum(dtype=np.float64))
+        self.language_stats.update(scored.language_counts())
+        self.method_stats.update(scored.method_counts())
+
+    def _adapt(self, new_comments, elapsed):
+        """
+        Aim for WATCH_TARGET_PER_POLL new comments per poll at the smoothed
+        arrival rate; quiet videos back off towards WATCH_MAX_INTERVAL, and a
+        poll that hit the page cap comes back as soon as allowed.
+        """
+        rate = new_comments / elapsed
+        self.rate = rate if self.rate is None else RATE_SMOOTHING * rate + (1 - RATE_SMOOTHING) * self.rate
+        if new_comments >= WATCH_MAX_PAGES * 100:
+            interval = WATCH_MIN_INTERVAL
+        elif self.rate > 0:
+            interval = WATCH_TARGET_PER_POLL / self.rate
+        else:
+            interval = self.interval * 2
+        self.interval = min(WATCH_MAX_INTERVAL, max(WATCH_MIN_INTERVAL, interval))
+        self.next_poll = self.last_poll + self.interval
+
+    def backoff(self):
+        """After a failed poll: wait twice as long before trying again"""
+        self.last_poll = time.time()
+        self.interval = min(WATCH_MAX_INTERVAL, self.interval * 2)
+        self.next_poll = self.last_poll + self.interval
+
+
+def get_watcher(video_id, comments_path, results, backend=None):
+    """The session's watcher for a video, created from its finished analysis"""
+    watchers = st.session_state.setdefault('comment_watchers', {})
+    if video_id not in watchers:
+        watchers[video_id] = CommentWatcher.from_stored(video_id, comments_path, results, backend=backend)
+    return watchers[video_id]
+
+
+def show_live_watch(video_id, comments_path, results, backend=None):
+    """
+    Live panel for watch mode. It reruns on its own every few seconds (a
+    Streamlit fragment, so the rest of the page stays as it is) and polls the
+    API only when the adaptive interval has passed.
+    """
+    watcher = get_watcher(video_id, comments_path, results, backend=backend)
+    # Timeline rollups restart on a backend change, so only extend them with the same backend
+    track_timeline = results.get('backend') == get_backend(backend).name
+
+    @st.fragment(run_every=WATCH_TICK_SECONDS)
+    def live_panel():
+        if time.time() >= watcher.next_poll:
+            try:
+                watcher.poll(get_artifact_cache() if track_timeline else None, get_comment_index())
+            except HttpError as e:
+                watcher.backoff()
+                st.warning(f"⚠️ Live poll failed ({e.resp.status}), retrying in {watcher.interval:.0f}s")
+
+        totals = watcher.results()
+        for column, (icon, label, value) in zip(st.columns(4), [
+            ('💬', 'Comments', totals['total_comments']),
+            ('😊', 'Positive', totals['num_positive']),
+            ('😠', 'Negative', totals['num_negative']),
+            ('😐', 'Neutral', totals['num_neutral']),
+        ]):
+            with column:
+                st.markdown(f'''
+                <div class="metric-card">
+                    <div class="metric-value">{icon} {value}</div>
+                    <div class="metric-label">{label}</div>
+                </div>
+                ''', unsafe_allow_html=True)
+
+        rate = f"{watcher.rate * 60:.1f}/min" if watcher.rate is not None else "measuring"
+        st.caption(f"🔴 Live: {len(watcher.last_delta)} new in the last poll · arrival rate {rate} · "
+                   f"next poll in {max(0, watcher.next_poll - time.time()):.0f}s (every {watcher.interval:.0f}s) · "
+                   f"{watcher.polls} polls, {watcher.quota_used} quota units")
+        if watcher.last_delta:
+            st.dataframe([
+                {'Comment': record['Comment'], 'Sentiment': sentiment, 'Confidence': round(confidence, 2),
+                 'Published': record['PublishedAt']}
+                for record, sentiment, confidence in watcher.last_delta[:20]
+            ], hide_index=True)
+
+    live_panel()
+    return watcher
@@ -0,0 +1,259 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from instrumentation import percentile
+from model_hosting import current_rss, PSUTIL_AVAILABLE
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Tier -> (app script, SENTIMENT_BACKEND override)
+TIER_APPS = {
+    'lightweight': ('app_lightweight.py', None),
+    'advanced': ('app.py', 'advanced'),
+    'vader': ('app.py', 'vader'),  # The unified app on the lightweight backend
+}
+
+RESULT_MARKER = 'LOAD_TEST_RESULT '
+# share_test_runtime() patches Streamlit internals; requirements pin this release
+STREAMLIT_TESTED = '1.66'
+# AppTest compiles the script on first run and that is not thread-safe, so
+# page loads are serialized; the analysis runs themselves overlap freely
+_page_load_lock = threading.Lock()
+DEFAULT_LEVELS = (1, 2, 4, 8)
+
+
+def cpu_seconds():
+    times = os.times()
+    return times.user + times.system
+
+
+class ResourceSampler:
+    """Tracks peak RSS on a background thread while a load level runs"""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak_rss = current_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, current_rss())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, current_rss())
+
+
+def share_test_runtime():
+    """
+    AppTest installs a mock Runtime singleton for each run and clears it when
+    the run ends, which breaks any other session still running. Keep the last
+    mock visible so overlapping sessions behave like one server process.
+    This relies on Runtime's private singleton, so any other Streamlit
+    release is refused rather than patched blindly.
+    """
+    import streamlit
+    from streamlit.runtime.runtime import Runtime
+
+    version = '.'.join(streamlit.__version__.split('.')[:2])
+    if version != STREAMLIT_TESTED or not hasattr(Runtime, '_instance'):
+        raise RuntimeError(f"load_test.py supports Streamlit {STREAMLIT_TESTED}.x, not {streamlit.__version__}; "
+                           f"install the version pinned in requirements.txt")
+
+    last = {}
+
+    def instance(cls):
+        if cls._instance is not None:
+            last['runtime'] = cls._instance
+        if 'runtime' not in last:
+            raise RuntimeError("Runtime hasn't been created!")
+        return last['runtime']
+
+    Runtime.instance = classmethod(instance)
+
+
+def run_session(app_path, video_id, timeout):
+    """One simulated user: open the app, submit a URL and wait for the results"""
+    from streamlit.testing.v1 import AppTest
+
+    started = time.perf_counter()
+    loaded = finished = None
+    try:
+        at = AppTest.from_file(app_path, default_timeout=timeout)
+        with _page_load_lock:
+            at.run()
+        loaded = time.perf_counter()
+        at.text_input(key='youtube_url_input').input(f"https://www.youtube.com/watch?v={video_id}").run()
+        finished = time.perf_counter()
+        errors = [str(e.value) for e in at.exception]
+        errors += [m.value for m in at.markdown if 'class="error-message"' in m.value]
+        analyzed = any('Analyzed' in s.value for s in at.success)
+    except Exception as e:
+        errors = [f"{type(e).__name__}: {e}"]
+        analyzed = False
+    loaded = loaded or time.perf_counter()
+    finished = finished or time.perf_counter()
+    return {
+        'video_id': video_id,
+        'page_load_s': loaded - started,
+        'analysis_s': finished - loaded,
+        'total_s': finished - started,
+        'ok': analyzed and not errors,
+        'errors': errors[:3] if errors or analyzed else ['results were not rendered'],
+    }
+
+
+def run_level(app_path, concurrency, sessions, first_session, timeout, repeat_video):
+    """Run `sessions` sessions with `concurrency` in flight and measure the process"""
+    video_ids = ['loadtest000' if repeat_video else f"load{first_session + i:07d}" for i in range(sessions)]
+    cpu_started = cpu_seconds()
+    wall_started = time.perf_counter()
+    with ResourceSampler() as sampler, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda video_id: run_session(app_path, video_id, timeout), video_ids))
+    wall = time.perf_counter() - wall_started
+    cpu = cpu_seconds() - cpu_started
+
+    latencies = sorted(result['analysis_s'] for result in results)
+    failures = [result for result in results if not result['ok']]
+    return {
+        'concurrency': concurrency,
+        'sessions': sessions,
+        'failures': len(failures),
+        'failure_samples': [failure['errors'] for failure in failures[:3]],
+        'wall_s': wall,
+        'sessions_per_s': sessions / wall if wall else None,
+        'latency_p50_s': percentile(latencies, 0.50),
+        'latency_p90_s': percentile(latencies, 0.90),
+        'latency_p95_s': percentile(latencies, 0.95),
+        'latency_p99_s': percentile(latencies, 0.99),
+        'latency_max_s': latencies[-1] if latencies else 0.0,
+        'page_load_p50_s': percentile(sorted(result['page_load_s'] for result in results), 0.50),
+        'peak_rss_mb': sampler.peak_rss / (1024 * 1024),
+        'cpu_s': cpu,
+        'cpu_percent': cpu / wall * 100 if wall else None,
+        'cpu_s_per_session': cpu / sessions if sessions else None,
+    }
+
+
+def worker(args):
+    """Child process: one app replica under increasing concurrency"""
+    import streamlit.logger
+    from streamlit import config as streamlit_config
+
+    # Sessions run outside `streamlit run`; skip the per-call ScriptRunContext warnings
+    streamlit_config.set_option('logger.level', 'error')
+    streamlit.logger.set_log_level('error')
+
+    app_path = os.path.join(HERE, args.app)
+    share_test_runtime()
+    report = {'app': args.app, 'backend': os.environ.get('SENTIMENT_BACKEND'), 'start_rss_mb': current_rss() / (1024 * 1024), 'levels': []}
+    session_number = 0
+    for concurrency in args.levels:
+        sessions = max(args.sessions, concurrency)
+        level = run_level(app_path, concurrency, sessions, session_number, args.timeout, args.repeat_video)
+        session_number += sessions
+        report['levels'].append(level)
+        print(f"  {args.app:<20} concurrency {concurrency:>3}: p95 {level['latency_p95_s']:6.2f}s  "
+              f"{level['sessions_per_s']:5.2f} sessions/s  peak RSS {level['peak_rss_mb']:7.1f} MB  "
+              f"CPU {level['cpu_percent']:5.0f}%  failures {level['failures']}", file=sys.stderr, flush=True)
+    print(RESULT_MARKER + json.dumps(report), flush=True)
+    return 0
+
+
+def capacity(levels, slo):
+    """Highest tested concurrency that met the latency SLO without failures"""
+    passing = [level['concurrency'] for level in levels if level['failures'] == 0 and level['latency_p95_s'] <= slo]
+    return max(passing) if passing else 0
+
+
+def run_tier(tier, args, endpoint):
+    """Run a tier's app in a fresh process so memory numbers are not shared between tiers"""
+    app, backend = TIER_APPS[tier]
+    env = dict(os.environ, YOUTUBE_API_ENDPOINT=endpoint, TRACE_DIR='',
+               COMMENT_CACHE_DIR=tempfile.mkdtemp(prefix=f'loadtest_{tier}_'))
+    env.pop('SENTIMENT_BACKEND', None)
+    if backend:
+        env['SENTIMENT_BACKEND'] = backend
+    command = [sys.executable, os.path.abspath(__file__), '--worker', '--app', app,
+               '--levels', ','.join(map(str, args.levels)), '--sessions', str(args.sessions),
+               '--timeout', str(args.timeout)] + (['--repeat-video'] if args.repeat_video else [])
+    completed = subprocess.run(command, env=env, cwd=HERE, stdout=subprocess.PIPE, text=True)
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    raise RuntimeError(f"{tier} worker exited with {completed.returncode} without a result")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive simulated sessions through the apps against the fake YouTube API")
+    parser.add_argument('--tiers', nargs='+', default=list(TIER_APPS), choices=list(TIER_APPS))
+    parser.add_argument('--levels', type=lambda text: [int(n) for n in text.split(',')], default=list(DEFAULT_LEVELS),
+                        help="Comma-separated concurrency levels, e.g. 1,2,4,8")
+    parser.add_argument('--sessions', type=int, default=8, help="Sessions per level (at least the concurrency)")
+    parser.add_argument('--slo', type=float, default=10.0, help="p95 analysis latency target in seconds")
+    parser.add_argument('--timeout', type=float, default=300, help="Per-run timeout for a session")
+    parser.add_argument('--repeat-video', action='store_true', help="All sessions analyze the same video (warm cache)")
+    parser.add_argument('--latency-ms', type=float, default=50, help="Fake API latency per call")
+    parser.add_argument('--comments', type=int, default=500, help="Comment threads per fake video")
+    parser.add_argument('--output', default='load_report.json')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--app', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        return worker(args)
+
+    from fake_youtube_api import FakeYouTubeServer, FakeApiConfig
+    from sentiment_backends import CascadeBackend
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'cpu_count': os.cpu_count(),
+        'fake_api': {'latency_ms': args.latency_ms, 'comments_per_video': args.comments},
+        'slo_p95_s': args.slo,
+        'psutil': PSUTIL_AVAILABLE,
+        'tiers': {},
+    }
+    config = FakeApiConfig(latency_ms=args.latency_ms, comments_per_video=args.comments)
+    with FakeYouTubeServer(config=config) as server:
+        for tier in args.tiers:
+            if tier == 'advanced' and not CascadeBackend.is_available():
+                report['tiers'][tier] = {'skipped': 'needs torch and transformers'}
+                print(f"Skipping {tier}: needs torch and transformers")
+                continue
+            print(f"Load testing {tier} ({TIER_APPS[tier][0]}) at concurrency {args.levels}")
+            result = run_tier(tier, args, server.endpoint)
+            result['capacity_sessions'] = capacity(result['levels'], args.slo)
+            report['tiers'][tier] = result
+        report['fake_api']['stats'] = server.stats()
+
+    with open(args.output, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2)
+
+    print(f"\nCapacity report (p95 <= {args.slo:.1f}s, no failures):")
+    for tier, result in report['tiers'].items():
+        if 'skipped' in result:
+            print(f"  {tier:<12} skipped ({result['skipped']})")
+            continue
+        peak = max(level['peak_rss_mb'] for level in result['levels'])
+        cpu_per_session = result['levels'][0]['cpu_s_per_session']
+        print(f"  {tier:<12} {result['capacity_sessions']} concurrent sessions per replica, "
+              f"peak RSS {peak:.0f} MB, {cpu_per_session:.2f} CPU-s per session")
+    print(f"Full report written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
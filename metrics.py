@@ -0,0 +1,315 @@
+import os
+import sys
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Port for the Prometheus endpoint; unset disables it
+METRICS_PORT = os.environ.get('METRICS_PORT')
+METRICS_HOST = os.environ.get('METRICS_HOST', '0.0.0.0')
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# YouTube Data API v3 cost in quota units per call
+QUOTA_COSTS = {
+    'commentThreads.list': 1,
+    'comments.list': 1,
+    'videos.list': 1,
+    'channels.list': 1,
+    'playlistItems.list': 1,
+    'search.list': 100,
+}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=None):
+    pairs = list(labels) + (list(extra) if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """A named metric with one series per label combination"""
+    kind = None
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._series = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted(labels.items()))
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = sorted(self._series.items())
+            lines.extend(self._render_series(key, value) for key, value in series)
+        return '\n'.join(lines)
+
+    def _render_series(self, key, value):
+        return f"{self.name}{_format_labels(key)} {_format_value(value)}"
+
+
+class Counter(Metric):
+    """Monotonically increasing total"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._series.get(self._key(labels), 0)
+
+
+class Gauge(Metric):
+    """Value that can go up and down"""
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._series[self._key(labels)] = value
+
+    def value(self, **labels):
+        with self._lock:
+            return self._series.get(self._key(labels), 0)
+
+
+class Histogram(Metric):
+    """Distribution of observations in cumulative buckets"""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][i] += 1
+                    break
+            series['sum'] += value
+            series['count'] += 1
+
+    def _render_series(self, key, series):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, series['counts']):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{_format_labels(key, [('le', _format_value(bound))])} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series['sum'])}")
+        lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return '\n'.join(lines)
+
+
+class MetricsRegistry:
+    """Process-wide set of metrics, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help_text, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric '{name}' is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name, help_text):
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name, help_text):
+        return self._get_or_create(Gauge, name, help_text)
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, buckets=buckets)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+# YouTube Data API
+api_requests = REGISTRY.counter('youtube_api_requests_total', 'YouTube Data API calls by method and outcome')
+api_quota_units = REGISTRY.counter('youtube_api_quota_units_total', 'YouTube Data API quota units spent by method')
+comments_fetched = REGISTRY.counter('youtube_comments_fetched_total', 'Comments downloaded from the YouTube API')
+
+# Sentiment engine
+comments_analyzed = REGISTRY.counter('sentiment_comments_analyzed_total', 'Comments analyzed by backend and sentiment')
+stage_duration = REGISTRY.histogram('stage_duration_seconds', 'Duration of pipeline stages (fetch, preprocess, infer, ...)')
+stage_items = REGISTRY.counter('stage_items_total', 'Items processed per pipeline stage')
+backend_throughput = REGISTRY.gauge('sentiment_backend_comments_per_second', 'Measured throughput per sentiment backend (EWMA)')
+budget_upgrades_dropped = REGISTRY.counter('budget_upgrades_dropped_total', 'Comments a budgeted run left on VADER, by tier and reason (budget/error)')
+model_loads = REGISTRY.counter('sentiment_model_loads_total', 'Model loads per backend, including reloads after idle unloading')
+model_unloads = REGISTRY.counter('sentiment_model_unloads_total', 'Models unloaded after sitting idle')
+model_resident_bytes = REGISTRY.gauge('sentiment_model_resident_bytes', 'Approximate process memory held by each loaded model')
+
+# Artifact cache
+cache_requests = REGISTRY.counter('artifact_cache_requests_total', 'Artifact cache lookups by result (hit/miss)')
+cache_written_bytes = REGISTRY.counter('artifact_cache_written_bytes_total', 'Bytes written into the artifact cache')
+cache_evictions = REGISTRY.counter('artifact_cache_evictions_total', 'Artifacts evicted from the cache')
+cache_bytes = REGISTRY.gauge('artifact_cache_bytes', 'Bytes currently held by the artifact cache')
+cache_artifacts = REGISTRY.gauge('artifact_cache_artifacts', 'Artifacts currently held by the artifact cache')
+
+
+def record_api_call(method, status='ok'):
+    """Count one YouTube API call and the quota it costs (errors are billed too)"""
+    api_requests.inc(method=method, status=status)
+    api_quota_units.inc(QUOTA_COSTS.get(method, 1), method=method)
+
+
+def observe_stage(stage, seconds, count):
+    """Feed a finished pipeline stage into the stage metrics"""
+    stage_duration.observe(seconds, stage=stage)
+    stage_items.inc(count, stage=stage)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep scrapes out of the app log
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=METRICS_PORT, host=METRICS_HOST):
+    """
+    Serve /metrics on a daemon thread. Safe to call on every Streamlit rerun:
+    only the first call in a process starts the server. Returns the server,
+    or None when no port is configured or the port is taken.
+    """
+    global _server
+    if port is None or port == '':
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, int(port)), MetricsHandler)
+            except OSError:
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name='metrics-server', daemon=True).start()
+        return _server
+
+
+def scraped_values(body):
+    """{'name{labels}': value} for the samples in a Prometheus text body"""
+    values = {}
+    for line in body.splitlines():
+        if line and not line.startswith('#'):
+            series, _, value = line.rpartition(' ')
+            values[series] = float(value)
+    return values
+
+
+def self_check(video_id='dQw4w9WgXcQ', comment_count=230):
+    """
+    Fetch a video's comments from the fake API with the real scraper, analyze
+    them with Senti.run_analysis, then scrape the endpoint and check the series
+    against what actually happened (the fake server's request log, the stored
+    comments and the analysis results).
+    """
+    import tempfile
+    import urllib.request
+    from fake_youtube_api import FakeYouTubeServer, FakeApiConfig
+
+    server = start_metrics_server(port=0, host='127.0.0.1')
+    url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+
+    with tempfile.TemporaryDirectory() as root, \
+            FakeYouTubeServer(config=FakeApiConfig(comments_per_video=comment_count)) as fake:
+        # The scraper builds its client and the cache picks its directory at import
+        os.environ['YOUTUBE_API_ENDPOINT'] = fake.endpoint
+        os.environ['COMMENT_CACHE_DIR'] = root
+        os.environ['TRACE_DIR'] = ''
+        import streamlit.logger
+        streamlit.logger.set_log_level('error')
+        from YoutubeCommentScrapper import save_video_comments
+        from artifact_cache import get_artifact_cache
+        from comment_store import load_comments
+        import Senti
+
+        path = save_video_comments(video_id)
+        fetched = len(load_comments(path, columns=['CommentId']))
+        results = Senti.run_analysis(path, video_id=video_id, backend='vader')
+        cache_evicted = len(get_artifact_cache().evict(max_bytes=0))
+        api_calls = fake.stats()['requests'].get('commentThreads.list', 0)
+
+    with urllib.request.urlopen(url, timeout=5) as response:
+        body = response.read().decode('utf-8')
+    scraped = scraped_values(body)
+
+    expected = {
+        'youtube_api_requests_total{method="commentThreads.list",status="ok"}': api_calls,
+        'youtube_api_quota_units_total{method="commentThreads.list"}': api_calls * QUOTA_COSTS['commentThreads.list'],
+        'youtube_comments_fetched_total': fetched,
+        'stage_items_total{stage="fetch_page"}': fetched,
+        'stage_items_total{stage="infer.vader"}': results['total_comments'],
+        'artifact_cache_evictions_total': cache_evicted,
+    }
+    for sentiment in ('positive', 'negative', 'neutral'):
+        expected[f'sentiment_comments_analyzed_total{{backend="vader",sentiment="{sentiment}"}}'] = results[f'num_{sentiment}']
+    present = ['stage_duration_seconds_count{stage="infer.vader"}', 'artifact_cache_requests_total{result="hit"}',
+               'sentiment_backend_comments_per_second{backend="vader"}', 'artifact_cache_bytes']
+
+    problems = [f"{series}: expected {value}, scraped {scraped.get(series)}"
+                for series, value in expected.items() if scraped.get(series) != value]
+    problems += [f"{series}: missing" for series in present if series not in scraped]
+    if fetched != comment_count:
+        problems.append(f"fetched {fetched} comments, the fake API has {comment_count}")
+    print(body)
+    if problems:
+        print("Self-check FAILED:\n  " + '\n  '.join(problems))
+        return 1
+    print(f"Self-check passed: {len(expected) + len(present)} series match a real fetch and analysis, scraped from {url}")
+    return 0
+
+
+if __name__ == '__main__':
+    if '--self-check' not in sys.argv:
+        print("Usage: python metrics.py --self-check\n"
+              "The endpoint runs inside the app; set METRICS_PORT to enable it.")
+        sys.exit(2)
+    # Run against the importable module so the app code and the check share one registry
+    import metrics
+    sys.exit(metrics.self_check())
@@ -0,0 +1,263 @@
+import os
+import gc
+import sys
+import json
+import mmap
+import time
+import signal
+import struct
+import argparse
+import importlib.util
+
+# Model weight sharing between server processes. Two complementary modes:
+#   * MODEL_SHARING=mmap: transformer weights are exported once to a
+#     safetensors file and every process maps it copy-on-write, so the
+#     weight pages live once in the page cache however many processes run.
+#   * `python model_hosting.py serve`: load the models once, freeze the heap
+#     and fork the Streamlit workers, which inherit the pages read-only.
+
+MODEL_SHARING = os.environ.get('MODEL_SHARING', 'off').lower()
+MODEL_CACHE_DIR = os.environ.get('MODEL_CACHE_DIR', os.path.join(os.getcwd(), '.model_cache'))
+
+# Optional: more accurate memory numbers
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# Checked without importing: safetensors.torch pulls in torch, which the
+# lightweight tier never needs
+SAFETENSORS_AVAILABLE = importlib.util.find_spec('safetensors') is not None
+# Buffers some checkpoints carry and others rebuild; never learned weights
+REBUILT_BUFFER_SUFFIXES = ('.position_ids',)
+
+SAFETENSORS_DTYPES = {
+    'F64': 'float64', 'F32': 'float32', 'F16': 'float16', 'BF16': 'bfloat16',
+    'I64': 'int64', 'I32': 'int32', 'I16': 'int16', 'I8': 'int8', 'U8': 'uint8', 'BOOL': 'bool',
+}
+
+# Open weight maps stay referenced for the life of the process
+_mapped_files = {}
+
+
+def weights_path(model_id):
+    return os.path.join(MODEL_CACHE_DIR, model_id.replace('/', '--') + '.safetensors')
+
+
+def export_weights(model_id):
+    """Write a model's weights as one safetensors file (once per machine)"""
+    from safetensors.torch import save_model
+    from transformers import AutoModelForSequenceClassification
+
+    path = weights_path(model_id)
+    if os.path.exists(path):
+        return path
+    model = AutoModelForSequenceClassification.from_pretrained(model_id)
+    os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+    staging = f"{path}.{os.getpid()}.tmp"
+    save_model(model, staging)  # Drops duplicate tied tensors
+    os.replace(staging, path)  # Other processes never map a half-written file
+    return path
+
+
+def mmap_state_dict(path):
+    """
+    Tensors that view a copy-on-write mapping of a safetensors file. Pages
+    are only read, so every process mapping the file shares them.
+    """
+    import torch
+
+    with open(path, 'rb') as handle:
+        header_size = struct.unpack('<Q', handle.read(8))[0]
+        header = json.loads(handle.read(header_size))
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_COPY)
+    _mapped_files[path] = mapped
+    data_start = 8 + header_size
+
+    state = {}
+    for name, info in header.items():
+        if name == '__metadata__':
+            continue
+        dtype = getattr(torch, SAFETENSORS_DTYPES[info['dtype']])
+        start, end = info['data_offsets']
+        count = (end - start) // torch.tensor([], dtype=dtype).element_size()
+        tensor = torch.frombuffer(mapped, dtype=dtype, count=count, offset=data_start + start) if count else torch.empty(0, dtype=dtype)
+        state[name] = tensor.view(info['shape'])
+    return state
+
+
+def load_shared_model(model_id):
+    """Sequence-classification model whose weights are the shared mapping"""
+    from transformers import AutoConfig, AutoModelForSequenceClassification
+
+    path = export_weights(model_id)
+    state = mmap_state_dict(path)
+    model = AutoModelForSequenceClassification.from_config(AutoConfig.from_pretrained(model_id))
+    # assign=True keeps the mapped tensors instead of copying into fresh ones; strict=False
+    # because save_model drops tied duplicates, so check what didn't load ourselves
+    outcome = model.load_state_dict(state, strict=False, assign=True)
+    model.tie_weights()
+    loaded = {tensor.data_ptr() for tensor in state.values()}
+    current = model.state_dict()
+    missing = [key for key in outcome.missing_keys
+               if not key.endswith(REBUILT_BUFFER_SUFFIXES) and current[key].data_ptr() not in loaded]
+    unexpected = [key for key in outcome.unexpected_keys if not key.endswith(REBUILT_BUFFER_SUFFIXES)]
+    if missing or unexpected:
+        raise ValueError(
+            f"Weights in {path} don't match {model_id}: missing {missing[:5]}, unexpected {unexpected[:5]}. "
+            f"Delete the file to export it again."
+        )
+    return model.eval()
+
+
+def preload_backends(names):
+    """Load backend models now and move them out of the GC's reach before forking"""
+    from sentiment_backends import get_backend
+
+    loaded = []
+    for name in names:
+        backend = get_backend(name)
+        started = time.perf_counter()
+        backend.model
+        loaded.append((name, time.perf_counter() - started))
+    # Collect once, then freeze: later collections in the children won't
+    # touch (and so copy) the inherited objects
+    gc.collect()
+    gc.freeze()
+    return loaded
+
+
+def current_rss():
+    """Resident set size of this process in bytes"""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def read_smaps_rollup(pid):
+    """Memory breakdown of one process in bytes, from /proc/<pid>/smaps_rollup"""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as handle:
+        for line in handle:
+            parts = line.split()
+            if len(parts) >= 3 and parts[-1] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) * 1024
+    unique = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    shared = fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0)
+    return {'pid': pid, 'rss': fields.get('Rss', 0), 'pss': fields.get('Pss', 0), 'unique': unique, 'shared': shared}
+
+
+def child_pids(pid):
+    """Direct children of a process (Linux)"""
+    children = []
+    try:
+        for task in os.listdir(f'/proc/{pid}/task'):
+            with open(f'/proc/{pid}/task/{task}/children') as handle:
+                children.extend(int(child) for child in handle.read().split())
+    except OSError:
+        pass
+    return children
+
+
+def memory_report(pids):
+    """Per-process unique vs shared RSS, plus the totals that actually matter for sizing"""
+    rows = []
+    for pid in pids:
+        try:
+            rows.append(read_smaps_rollup(pid))
+        except OSError:
+            continue
+    return {
+        'processes': rows,
+        'total_rss': sum(row['rss'] for row in rows),
+        'total_pss': sum(row['pss'] for row in rows),  # Real footprint: shared pages split between sharers
+        'total_unique': sum(row['unique'] for row in rows),
+    }
+
+
+def print_memory_report(report):
+    mb = 1024 * 1024
+    print(f"{'PID':>8} {'RSS MB':>10} {'PSS MB':>10} {'Unique MB':>10} {'Shared MB':>10}")
+    for row in report['processes']:
+        print(f"{row['pid']:>8} {row['rss'] / mb:10.1f} {row['pss'] / mb:10.1f} {row['unique'] / mb:10.1f} {row['shared'] / mb:10.1f}")
+    print(f"{'total':>8} {report['total_rss'] / mb:10.1f} {report['total_pss'] / mb:10.1f} {report['total_unique'] / mb:10.1f}")
+
+
+def serve(app, workers, base_port, backends):
+    """Preload models, then fork one Streamlit server per port"""
+    loaded = preload_backends(backends)
+    for name, seconds in loaded:
+        print(f"Preloaded {name} in {seconds:.1f}s")
+
+    children = []
+    for index in range(workers):
+        port = base_port + index
+        pid = os.fork()
+        if pid == 0:
+            from streamlit.web import bootstrap
+            options = {'server_port': port, 'server_headless': True}  # As `streamlit run` flags
+            bootstrap.load_config_options(options)
+            bootstrap.run(app, False, [], options)
+            os._exit(0)
+        children.append(pid)
+        print(f"Worker {pid} serving {app} on port {port}")
+
+    def stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    while True:
+        time.sleep(30)
+        print_memory_report(memory_report([os.getpid()] + children))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Share sentiment model memory between server processes")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help="Preload models and fork Streamlit workers")
+    serve_parser.add_argument('app', nargs='?', default='app.py')
+    serve_parser.add_argument('--workers', type=int, default=2)
+    serve_parser.add_argument('--base-port', type=int, default=8501)
+    serve_parser.add_argument('--backends', nargs='+', default=None, help="Backends to preload (default: the configured one)")
+
+    export_parser = commands.add_parser('export', help="Write shareable safetensors weights for MODEL_SHARING=mmap")
+    export_parser.add_argument('model_ids', nargs='*')
+
+    memory_parser = commands.add_parser('memory', help="Unique vs shared RSS of processes")
+    memory_parser.add_argument('pids', nargs='*', type=int)
+    memory_parser.add_argument('--parent', type=int, help="Report this process and its children")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        from sentiment_backends import configured_backend_name
+        backends = args.backends or [configured_backend_name()]
+        if backends == ['cascade']:
+            backends = ['vader', 'multilingual', 'social']
+        serve(args.app, args.workers, args.base_port, backends)
+    elif args.command == 'export':
+        from sentiment_backends import BACKEND_REGISTRY
+        model_ids = args.model_ids or [cls.model_id for cls in BACKEND_REGISTRY.values() if getattr(cls, 'model_id', None)]
+        for model_id in model_ids:
+            print(f"{model_id}: {export_weights(model_id)}")
+    else:
+        pids = args.pids or ([args.parent] + child_pids(args.parent) if args.parent else [os.getpid()])
+        print_memory_report(memory_report(pids))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+import numpy as np
+
+# Columnar per-comment sentiment results. One ResultBatch holds a video's
+# results as NumPy arrays (about 6 bytes per comment instead of a dict), so
+# aggregates are array reductions and slices are views, not copies.
+
+SENTIMENTS = ('negative', 'neutral', 'positive')  # int8 codes 0, 1, 2
+SENTIMENT_CODES = {sentiment: code for code, sentiment in enumerate(SENTIMENTS)}
+
+
+def _encode(values, categories):
+    """Codes for `values`, appending unseen values to `categories` (a list)"""
+    index = {value: code for code, value in enumerate(categories)}
+    codes = []
+    for value in values:
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(categories)
+            categories.append(value)
+        codes.append(code)
+    return codes
+
+
+def _recode(codes, categories, target):
+    """Map codes over `categories` onto codes over `target` (extended in place)"""
+    if list(categories) == target[:len(categories)]:
+        return codes
+    lookup = np.array(_encode(categories, target), dtype=codes.dtype)
+    return lookup[codes] if len(lookup) else codes
+
+
+class ResultBatch:
+    """
+    Sentiment results as parallel arrays: int8 sentiment codes, float32
+    confidences, and method/language codes into small category lists.
+    """
+
+    def __init__(self, sentiment, confidence, method, language, methods, languages):
+        self.sentiment = sentiment
+        self.confidence = confidence
+        self.method = method
+        self.language = language
+        self.methods = methods
+        self.languages = languages
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty(0, np.int8), np.empty(0, np.float32), np.empty(0, np.int8), np.empty(0, np.int16), [], [])
+
+    @classmethod
+    def from_dicts(cls, results):
+        """Build from backend result dicts"""
+        methods = []
+        languages = []
+        return cls(
+            np.fromiter((SENTIMENT_CODES.get(r['sentiment'], 1) for r in results), np.int8, len(results)),
+            np.fromiter((r['confidence'] for r in results), np.float32, len(results)),
+            np.array(_encode([r.get('method', 'unknown') for r in results], methods), dtype=np.int8),
+            np.array(_encode([r.get('language', 'unknown') for r in results], languages), dtype=np.int16),
+            methods,
+            languages,
+        )
+
+    @classmethod
+    def concat(cls, batches):
+        """One batch from many, merging their category lists"""
+        batches = [batch for batch in batches if len(batch)]
+        if not batches:
+            return cls.empty()
+        if len(batches) == 1:
+            return batches[0]
+        methods = list(batches[0].methods)
+        languages = list(batches[0].languages)
+        return cls(
+            np.concatenate([batch.sentiment for batch in batches]),
+            np.concatenate([batch.confidence for batch in batches]),
+            np.concatenate([_recode(batch.method, batch.methods, methods) for batch in batches]),
+            np.concatenate([_recode(batch.language, batch.languages, languages) for batch in batches]),
+            methods,
+            languages,
+        )
+
+    def __len__(self):
+        return len(self.sentiment)
+
+    def __getitem__(self, key):
+        """Slices (and boolean masks) of every column; plain slices are views"""
+        return ResultBatch(self.sentiment[key], self.confidence[key], self.method[key], self.language[key],
+                           self.methods, self.languages)
+
+    def to_dicts(self):
+        """Back to the per-comment result dicts backends produce"""
+        return [
+            {'sentiment': SENTIMENTS[s], 'confidence': float(c), 'method': self.methods[m], 'language': self.languages[l]}
+            for s, c, m, l in zip(self.sentiment.tolist(), self.confidence.tolist(), self.method.tolist(), self.language.tolist())
+        ]
+
+    # Aggregates
+
+    def sentiment_counts(self):
+        counts = np.bincount(self.sentiment, minlength=len(SENTIMENTS))
+        return {sentiment: int(count) for sentiment, count in zip(SENTIMENTS, counts)}
+
+    def mean_confidence(self):
+        return float(self.confidence.mean(dtype=np.float64)) if len(self) else 0.0
+
+    def method_counts(self):
+        counts = np.bincount(self.method, minlength=len(self.methods))
+        return {method: int(count) for method, count in zip(self.methods, counts) if count}
+
+    def language_counts(self):
+        counts = np.bincount(self.language, minlength=len(self.languages))
+        return {language: int(count) for language, count in zip(self.languages, counts) if count}
+
+    def confidence_histogram(self, bins=10):
+        """Counts of confidences in `bins` equal-width bins over [0, 1]"""
+        counts, edges = np.histogram(self.confidence, bins=bins, range=(0.0, 1.0))
+        return counts, edges
+
+    def mean_confidence_by_sentiment(self):
+        totals = np.bincount(self.sentiment, weights=self.confidence, minlength=len(SENTIMENTS))
+        counts = np.bincount(self.sentiment, minlength=len(SENTIMENTS))
+        return {sentiment: float(total / count) if count else 0.0
+                for sentiment, total, count in zip(SENTIMENTS, totals, counts)}
+
+    # Serialization
+
+    def to_arrow(self, comment_ids):
+        """
+        Arrow table in the stored results schema. The numeric columns and the
+        dictionary indices wrap the NumPy buffers without copying.
+        """
+        import pyarrow as pa
+        return pa.table({
+            'CommentId': pa.array(comment_ids, pa.string()),
+            'Sentiment': pa.DictionaryArray.from_arrays(pa.array(self.sentiment), pa.array(SENTIMENTS, pa.string())),
+            'Confidence': pa.array(self.confidence),
+            'Method': pa.DictionaryArray.from_arrays(pa.array(self.method), pa.array(self.methods, pa.string())),
+            'Language': pa.DictionaryArray.from_arrays(pa.array(self.language), pa.array(self.languages, pa.string())),
+        })
+
+    @classmethod
+    def from_arrow(cls, table):
+        """From a stored results table; dictionary indices are used as codes directly"""
+        def codes(name, dtype):
+            column = table.column(name).combine_chunks()
+            if not hasattr(column, 'indices'):
+                column = column.dictionary_encode()
+            return (column.indices.to_numpy(zero_copy_only=False).astype(dtype, copy=False),
+                    column.dictionary.to_pylist())
+
+        sentiment, sentiment_names = codes('Sentiment', np.int8)
+        method, methods = codes('Method', np.int8)
+        language, languages = codes('Language', np.int16)
+        return cls(
+            _recode(sentiment, sentiment_names, list(SENTIMENTS)),
+            table.column('Confidence').combine_chunks().to_numpy(zero_copy_only=False).astype(np.float32, copy=False),
+            method, language, methods, languages,
+        )
+
+    def to_frame(self, comment_ids=None):
+        """Pandas frame in the stored results layout, with categorical columns"""
+        import pandas as pd
+        frame = pd.DataFrame({
+            'Sentiment': pd.Categorical.from_codes(self.sentiment, SENTIMENTS),
+            'Confidence': self.confidence,
+            'Method': pd.Categorical.from_codes(self.method, self.methods),
+            'Language': pd.Categorical.from_codes(self.language, self.languages),
+        })
+        if comment_ids is not None:
+            frame.insert(0, 'CommentId', list(comment_ids))
+        return frame
+
+    @classmethod
+    def from_frame(cls, frame):
+        """From a results frame (e.g. a CSV artifact)"""
+        records = frame[['Sentiment', 'Confidence', 'Method', 'Language']].to_dict('records')
+        return cls.from_dicts([
+            {'sentiment': r['Sentiment'], 'confidence': r['Confidence'], 'method': r['Method'], 'language': r['Language']}
+            for r in records
+        ])
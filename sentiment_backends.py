@@ -0,0 +1,469 @@
+import os
+import gc
+import time
+import threading
+import importlib.util
+import streamlit as st
+from text_processing import preprocess_text, preprocess_text_basic, detect_language, translate_text, TRANSLATION_AVAILABLE
+from instrumentation import span
+from vader_batch import VaderBatchScorer
+from model_hosting import MODEL_SHARING, SAFETENSORS_AVAILABLE, load_shared_model, current_rss
+from metrics import model_loads, model_unloads, model_resident_bytes
+
+# name -> backend class; populated by @register_backend
+BACKEND_REGISTRY = {}
+
+# Deployment tiers map to a default backend
+TIERS = {
+    'lightweight': 'vader',
+    'advanced': 'cascade'
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+_reaper = None
+_reaper_pid = None  # Process that started _reaper: a forked worker inherits the variable, not the thread
+
+
+def register_backend(cls):
+    """Class decorator adding a backend to the registry"""
+    BACKEND_REGISTRY[cls.name] = cls
+    return cls
+
+
+def sentiment_result(sentiment, confidence, method, language):
+    """The per-comment result dict every backend returns"""
+    return {'sentiment': sentiment, 'confidence': confidence, 'method': method, 'language': language}
+
+
+class SentimentBackend:
+    """
+    Common batch interface for sentiment backends.
+
+    Subclasses set `name` and `requires` (importable modules) and implement
+    load_model() and analyze_batch(). Models load lazily on first use.
+    """
+    name = None
+    label = None
+    requires = ()
+
+    def __init__(self):
+        self._model = None
+        self._load_lock = threading.Lock()
+        self.last_used = None
+        self.load_seconds = None
+        self.resident_bytes = 0
+        self.loads = 0
+        self.loaded_pid = None
+
+    @classmethod
+    def is_available(cls):
+        """True when every module the backend needs can be imported"""
+        return all(importlib.util.find_spec(module) is not None for module in cls.requires)
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    @property
+    def inherited(self):
+        """Loaded before this process was forked: its pages are shared, so unloading frees nothing"""
+        return self.loaded and self.loaded_pid != os.getpid()
+
+    @property
+    def model(self):
+        """The underlying model, loaded on first access"""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    self._load()
+        self.last_used = time.monotonic()
+        return self._model
+
+    def _load(self):
+        # Memory is the process RSS growth over the load: approximate when
+        # other threads allocate meanwhile, but close for large weights
+        rss_before = current_rss()
+        started = time.perf_counter()
+        self._model = self.load_model()
+        self.load_seconds = time.perf_counter() - started
+        self.resident_bytes = max(0, current_rss() - rss_before)
+        self.loads += 1
+        self.loaded_pid = os.getpid()
+        model_loads.inc(backend=self.name)
+        model_resident_bytes.set(self.resident_bytes, backend=self.name)
+        start_idle_reaper()
+
+    def unload(self):
+        """Drop the model; the next use loads it again"""
+        with self._load_lock:
+            if self._model is None:
+                return False
+            self._model = None
+            self.resident_bytes = 0
+        gc.collect()  # Model graphs hold reference cycles
+        model_unloads.inc(backend=self.name)
+        model_resident_bytes.set(0, backend=self.name)
+        return True
+
+    def stats(self):
+        """Load time, memory and idle time of this backend's model"""
+        return {
+            'backend': self.name,
+            'loaded': self.loaded,
+            'loads': self.loads,
+            'load_seconds': self.load_seconds,
+            'resident_mb': self.resident_bytes / (1024 * 1024),
+            'idle_seconds': time.monotonic() - self.last_used if self.last_used is not None else None,
+        }
+
+    def load_model(self):
+        raise NotImplementedError
+
+    def analyze_batch(self, texts):
+        """Analyze a list of raw comment texts and return one result dict per text"""
+        raise NotImplementedError
+
+
+@register_backend
+class VaderBackend(SentimentBackend):
+    """NLTK VADER lexicon scoring: fast, English-only, no model downloads"""
+    name = 'vader'
+    label = 'Lightweight VADER (fast, no heavy downloads)'
+    requires = ('nltk',)
+
+    def __init__(self):
+        super().__init__()
+        self._batch_scorer = None
+
+    def load_model(self):
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+        return SentimentIntensityAnalyzer()
+
+    @staticmethod
+    def classify(compound):
+        if compound >= 0.05:
+            return sentiment_result('positive', abs(compound), 'vader', 'en')
+        elif compound <= -0.05:
+            return sentiment_result('negative', abs(compound), 'vader', 'en')
+        else:
+            return sentiment_result('neutral', 1 - abs(compound), 'vader', 'en')
+
+    def score(self, processed_text):
+        """Classify already-preprocessed text"""
+        try:
+            compound = self.model.polarity_scores(processed_text)['compound']
+        except Exception:
+            return sentiment_result('neutral', 0.0, 'error', 'unknown')
+        return self.classify(compound)
+
+    def score_batch(self, processed_texts):
+        """Classify many preprocessed texts with the vectorized scorer (same scores as score())"""
+        model = self.model
+        scorer = self._batch_scorer
+        if scorer is None or scorer.analyzer is not model:
+            scorer = self._batch_scorer = VaderBatchScorer(model)
+        try:
+            compounds = scorer.compound_scores(processed_texts).tolist()
+        except Exception:
+            return [self.score(text) for text in processed_texts]
+        return [self.classify(compound) for compound in compounds]
+
+    def analyze_batch(self, texts):
+        with span('preprocess', len(texts)):
+            processed = [preprocess_text_basic(text) for text in texts]
+        with span('infer.vader', len(texts)):
+            return self.score_batch(processed)
+
+
+class TransformerBackend(SentimentBackend):
+    """Hugging Face text-classification pipeline run in batches"""
+    requires = ('torch', 'transformers')
+    model_id = None
+    batch_size = 32
+
+    def load_model(self):
+        import torch
+        from transformers import pipeline
+        use_gpu = torch.cuda.is_available()
+        weights = self.model_id
+        if MODEL_SHARING == 'mmap' and SAFETENSORS_AVAILABLE and not use_gpu:
+            # Weights view a file mapping shared with every other process
+            weights = load_shared_model(self.model_id)
+        model = pipeline(
+            "sentiment-analysis",
+            model=weights,
+            tokenizer=self.model_id,
+            device=0 if use_gpu else -1
+        )
+        return model
+
+    def map_label(self, label):
+        """Map a model label to positive/negative/neutral"""
+        label = label.lower()
+        if 'positive' in label:
+            return 'positive'
+        elif 'negative' in label:
+            return 'negative'
+        return 'neutral'
+
+    def predict(self, processed_texts, languages, method=None, confidence_scale=1.0):
+        """Run the pipeline over preprocessed texts"""
+        if not processed_texts:
+            return []
+        model = self.model  # Load outside the span so load time is not counted as inference
+        with span(f'infer.{self.name}', len(processed_texts)):
+            outputs = model(list(processed_texts), batch_size=self.batch_size, truncation=True)
+        return [
+            sentiment_result(self.map_label(output['label']), output['score'] * confidence_scale, method or self.name, language)
+            for output, language in zip(outputs, languages)
+        ]
+
+    def analyze_batch(self, texts):
+        with span('preprocess', len(texts)):
+            processed = [preprocess_text(text) for text in texts]
+        with span('detect_language', len(texts)):
+            languages = [detect_language(text) for text in processed]
+        return self.predict(processed, languages)
+
+
+@register_backend
+class MultilingualBackend(TransformerBackend):
+    """Multilingual BERT (works with multiple languages)"""
+    name = 'multilingual'
+    label = 'Multilingual sentiment model'
+    model_id = 'nlptown/bert-base-multilingual-uncased-sentiment'
+
+    def map_label(self, label):
+        label = label.lower()
+        if 'positive' in label or label in ['pos', '4 stars', '5 stars']:
+            return 'positive'
+        elif 'negative' in label or label in ['neg', '1 star', '2 stars']:
+            return 'negative'
+        return 'neutral'
+
+
+@register_backend
+class SocialBackend(TransformerBackend):
+    """Social media optimized RoBERTa (better for YouTube comments)"""
+    name = 'social'
+    label = 'Social media sentiment model'
+    model_id = 'cardiffnlp/twitter-roberta-base-sentiment-latest'
+
+
+# Length classes for routing: short texts go to VADER, long ones are batched
+# apart so they don't pad every sequence in a batch of medium comments
+SHORT_WORDS = 2
+LONG_WORDS = 64
+
+
+def length_class(processed_text):
+    words = len(processed_text.split())
+    if words < SHORT_WORDS:
+        return 'short'
+    return 'long' if words > LONG_WORDS else 'medium'
+
+
+def route_partitions(processed, languages):
+    """
+    Group comment indices by (language, length class). Each group's indices
+    are ordered by text length so pipeline batches hold similar lengths.
+    """
+    partitions = {}
+    for i, text in processed.items():
+        partitions.setdefault((languages[i], length_class(text)), []).append(i)
+    for indices in partitions.values():
+        indices.sort(key=lambda i: len(processed[i]))
+    return partitions
+
+
+def translated_languages():
+    """Languages routed through translation + the social model (TRANSLATE_LANGUAGES, '*' for all)"""
+    if not TRANSLATION_AVAILABLE:
+        return set()
+    value = config_value('TRANSLATE_LANGUAGES') or ''
+    return {code.strip() for code in value.split(',') if code.strip()}
+
+
+@register_backend
+class CascadeBackend(SentimentBackend):
+    """
+    Multi-model cascade with language routing: comments are partitioned by
+    language and length, and each partition goes to its model in one batch.
+    VADER takes very short texts, social RoBERTa English, multilingual BERT
+    every other language (or translation + RoBERTa where configured), and
+    VADER is the final fallback.
+    """
+    name = 'cascade'
+    label = 'Advanced AI cascade (BERT + RoBERTa + VADER)'
+    requires = ('torch', 'transformers')
+    analysis_batch_size = 512  # Larger calls make for larger language partitions
+
+    def load_model(self):
+        # The cascade owns no weights itself; its stages load on demand
+        return {stage: get_backend(stage) for stage in ('vader', 'multilingual', 'social')}
+
+    def _try_stage(self, stage, texts, languages, **kwargs):
+        """Run one cascade stage, returning None for every text if it fails"""
+        backend = self.model[stage]
+        try:
+            return backend.predict(texts, languages, **kwargs)
+        except Exception as e:
+            st.warning(f"{backend.label} error: {str(e)}")
+            return [None] * len(texts)
+
+    def _run_partition(self, language, indices, processed, translate):
+        """Results for one partition from its best model, falling back to multilingual BERT"""
+        texts = [processed[i] for i in indices]
+        languages = [language] * len(indices)
+        if language == 'en':
+            outputs = self._try_stage('social', texts, languages)
+        elif language in translate or '*' in translate:
+            with span('translate', len(texts)):
+                translated = [translate_text(text, 'en') for text in texts]
+            outputs = self._try_stage(
+                'social', translated, languages,
+                method='translated+social', confidence_scale=0.8  # Reduce confidence due to translation
+            )
+        else:
+            return self._try_stage('multilingual', texts, languages)
+
+        failed = [n for n, output in enumerate(outputs) if output is None]
+        if failed:
+            retried = self._try_stage('multilingual', [texts[n] for n in failed], [language] * len(failed))
+            for n, output in zip(failed, retried):
+                outputs[n] = output
+        return outputs
+
+    def analyze_batch(self, texts):
+        results = [None] * len(texts)
+        processed = {}
+        languages = {}
+        vader = self.model['vader']
+        translate = translated_languages()
+
+        with span('preprocess', len(texts)):
+            for i, text in enumerate(texts):
+                if not text or len(str(text).strip()) == 0:
+                    results[i] = sentiment_result('neutral', 0.0, 'empty', 'unknown')
+                    continue
+                processed[i] = preprocess_text(text)
+
+        with span('detect_language', len(processed)):
+            for i in processed:
+                languages[i] = detect_language(processed[i])
+
+        for (language, length), indices in sorted(route_partitions(processed, languages).items()):
+            with span(f'route.{language}.{length}', len(indices)):
+                if length == 'short':
+                    with span('infer.vader', len(indices)):
+                        outputs = vader.score_batch([processed[i] for i in indices])
+                else:
+                    outputs = self._run_partition(language, indices, processed, translate)
+            # Reassemble in the original order
+            for i, output in zip(indices, outputs):
+                results[i] = output
+
+        # Fallback to VADER
+        fallback = [i for i in processed if results[i] is None]
+        with span('infer.vader', len(fallback)):
+            for i, output in zip(fallback, vader.score_batch([processed[i] for i in fallback])):
+                results[i] = output
+
+        return results
+
+
+def available_backends():
+    """Names of registered backends whose dependencies are installed"""
+    return [name for name, cls in BACKEND_REGISTRY.items() if cls.is_available()]
+
+
+def config_value(key, default=None):
+    """Setting from the environment, then Streamlit secrets, then the default"""
+    value = os.environ.get(key)
+    if value:
+        return value
+    try:
+        return st.secrets.get(key, default)
+    except Exception:
+        return default
+
+
+def configured_backend_name():
+    """
+    Backend requested by configuration: SENTIMENT_BACKEND (a backend name or
+    a tier) from the environment or Streamlit secrets. Without configuration,
+    pick the most capable backend whose dependencies are installed.
+    """
+    name = config_value('SENTIMENT_BACKEND')
+    if name:
+        return TIERS.get(name, name)
+    return 'cascade' if CascadeBackend.is_available() else 'vader'
+
+
+def model_stats():
+    """Per-backend model stats for every backend created in this process"""
+    with _instances_lock:
+        backends = list(_instances.values())
+    return [backend.stats() for backend in backends]
+
+
+def unload_idle_models(idle_seconds, memory_budget_mb=None):
+    """
+    Unload models unused for `idle_seconds`, least recently used first. With a
+    memory budget, only while the process is over it. Models inherited from
+    a preloading parent are kept. Returns the backend names unloaded.
+    """
+    with _instances_lock:
+        backends = [backend for backend in _instances.values() if backend.loaded and not backend.inherited]
+    now = time.monotonic()
+    unloaded = []
+    for backend in sorted(backends, key=lambda backend: backend.last_used or 0):
+        if memory_budget_mb and current_rss() <= memory_budget_mb * 1024 * 1024:
+            break
+        if backend.last_used is not None and now - backend.last_used >= idle_seconds and backend.unload():
+            unloaded.append(backend.name)
+    return unloaded
+
+
+def start_idle_reaper():
+    """
+    Start the idle-unloading thread once per process, if MODEL_IDLE_SECONDS
+    is set. MODEL_MEMORY_BUDGET_MB limits unloading to when the process is
+    over budget.
+    """
+    global _reaper, _reaper_pid
+    with _instances_lock:
+        if _reaper_pid == os.getpid() and (_reaper is False or _reaper.is_alive()):
+            return
+        _reaper_pid = os.getpid()
+        idle_seconds = float(config_value('MODEL_IDLE_SECONDS') or 0)
+        if idle_seconds <= 0:
+            _reaper = False
+            return
+        memory_budget_mb = float(config_value('MODEL_MEMORY_BUDGET_MB') or 0) or None
+
+        def reap():
+            while True:
+                time.sleep(min(60.0, idle_seconds / 2))
+                unload_idle_models(idle_seconds, memory_budget_mb)
+
+        _reaper = threading.Thread(target=reap, name='model-reaper', daemon=True)
+        _reaper.start()
+
+
+def get_backend(name=None):
+    """
+    Shared backend instance for this process. Instances are created on first
+    request and their models load lazily, so only backends in use cost memory.
+    """
+    name = TIERS.get(name, name) if name else configured_backend_name()
+    if name not in BACKEND_REGISTRY:
+        raise ValueError(f"Unknown sentiment backend '{name}'. Available: {', '.join(BACKEND_REGISTRY)}")
+    with _instances_lock:
+        if name not in _instances:
+            backend_cls = BACKEND_REGISTRY[name]
+            if not backend_cls.is_available():
+                raise ValueError(f"Sentiment backend '{name}' needs {', '.join(backend_cls.requires)} installed")
+            _instances[name] = backend_cls()
+        return _instances[name]
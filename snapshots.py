@@ -0,0 +1,307 @@
+import os
+import json
+import math
+import time
+import sqlite3
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import streamlit as st
+from artifact_cache import CACHE_DIR, artifact_digest
+from result_batch import SENTIMENTS
+from timeline import TIMELINE_ARTIFACT
+from sentiment_backends import config_value
+
+# Analysis history: every run of a video is kept as a snapshot of compact
+# aggregates (sentiment counts, confidence moments, language/method mix and the
+# cumulative per-day timeline rollup) plus references to that run's comments
+# and per-comment results. Snapshots live in their own SQLite file; the results
+# and timeline artifacts they rely on are pinned against the artifact cache's
+# age eviction. The drift tests below work from these aggregates alone, never
+# from raw comments.
+
+SNAPSHOT_DB_PATH = config_value('SNAPSHOT_DB_PATH') or os.path.join(CACHE_DIR, 'snapshots.db')
+DRIFT_ALPHA = float(config_value('DRIFT_ALPHA', 0.01))  # Significance level for flagging drift
+DRIFT_MIN_SHIFT = float(config_value('DRIFT_MIN_SHIFT', 0.02))  # Smallest share change worth flagging
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    created REAL NOT NULL,
+    backend TEXT,
+    total INTEGER NOT NULL,
+    negative INTEGER NOT NULL,
+    neutral INTEGER NOT NULL,
+    positive INTEGER NOT NULL,
+    confidence_sum REAL NOT NULL,
+    confidence_sq_sum REAL NOT NULL,
+    language_stats TEXT,
+    method_stats TEXT,
+    daily TEXT,
+    comments_digest TEXT,
+    results_artifact TEXT
+);
+CREATE INDEX IF NOT EXISTS snapshots_video ON snapshots (video_id, id);
+"""
+
+
+class SnapshotStore:
+    """Append-only history of analysis snapshots per video"""
+
+    def __init__(self, path=SNAPSHOT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.executescript(SCHEMA)
+
+    def add(self, snapshot):
+        """Store a snapshot dict (as built by take_snapshot) and return its id"""
+        columns = [column for column in snapshot if column != 'id']
+        values = [json.dumps(snapshot[column]) if isinstance(snapshot[column], dict) else snapshot[column] for column in columns]
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                f"INSERT INTO snapshots ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", values
+            )
+        return cursor.lastrowid
+
+    def history(self, video_id):
+        """A video's snapshots, oldest first"""
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT * FROM snapshots WHERE video_id = ? ORDER BY id', (video_id,)
+            ).fetchall()
+        return [_snapshot(row) for row in rows]
+
+    def latest(self, video_id):
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT * FROM snapshots WHERE video_id = ? ORDER BY id DESC LIMIT 1', (video_id,)
+            ).fetchone()
+        return _snapshot(row) if row else None
+
+
+def _snapshot(row):
+    snapshot = dict(row)
+    for column in ('language_stats', 'method_stats', 'daily'):
+        snapshot[column] = json.loads(snapshot[column]) if snapshot[column] else {}
+    return snapshot
+
+
+@st.cache_resource
+def get_snapshot_store():
+    """The process-wide snapshot history"""
+    return SnapshotStore()
+
+
+def take_snapshot(store, cache, video_id, comments_path, results, backend, timeline=None):
+    """
+    Record this run of a video, unless it analyzed the same comments into the
+    same results as the latest snapshot. The run's results artifact is linked
+    under a digest-named alias so the next run doesn't replace it; the alias and
+    the video's timeline (which the next snapshot's rollup extends) are pinned
+    so age eviction between runs doesn't remove them. Returns the snapshot id.
+    """
+    results_name = next((name for name in ('results.parquet', 'results.csv') if cache.path_for(video_id, name)), None)
+    results_digest = cache.digest_for(video_id, results_name) if results_name else None
+    results_artifact = f"results_{results_digest[:16]}{os.path.splitext(results_name)[1]}" if results_digest else None
+    comments_digest = artifact_digest(comments_path)
+    if timeline is not None:
+        cache.pin(video_id, TIMELINE_ARTIFACT)
+
+    latest = store.latest(video_id)
+    if latest and latest['comments_digest'] == comments_digest and latest['results_artifact'] == results_artifact \
+            and latest['backend'] == backend:
+        return latest['id']
+    if results_artifact:
+        cache.link(video_id, results_artifact, results_name)
+        cache.pin(video_id, results_artifact)
+
+    counts = results.sentiment_counts()
+    confidence = results.confidence.astype(np.float64)
+    return store.add({
+        'video_id': video_id,
+        'created': time.time(),
+        'backend': backend,
+        'total': len(results),
+        'negative': counts['negative'],
+        'neutral': counts['neutral'],
+        'positive': counts['positive'],
+        'confidence_sum': float(confidence.sum()),
+        'confidence_sq_sum': float(np.square(confidence).sum()),
+        'language_stats': results.language_counts(),
+        'method_stats': results.method_counts(),
+        # Cumulative per-day rollup (the timeline only ever grows), so later minus earlier is what arrived in between
+        'daily': {str(start): row for start, row in timeline.rollups['day'].items()} if timeline is not None else {},
+        'comments_digest': comments_digest,
+        'results_artifact': results_artifact,
+    })
+
+
+def chi2_sf(statistic, df):
+    """Chi-square survival function in closed form for the df a 3-class table can have"""
+    if df == 1:
+        return math.erfc(math.sqrt(statistic / 2))
+    if df == 2:
+        return math.exp(-statistic / 2)
+    raise ValueError(f"Unsupported degrees of freedom: {df}")
+
+
+def chi_square(before, after):
+    """Homogeneity test of two sentiment count vectors: (statistic, df, p-value)"""
+    table = np.array([before, after], dtype=np.float64)
+    table = table[:, table.sum(axis=0) > 0]  # A class neither sample has carries no information
+    if table.shape[1] < 2 or (table.sum(axis=1) == 0).any():
+        return 0.0, 0, 1.0
+    expected = table.sum(axis=1, keepdims=True) * table.sum(axis=0, keepdims=True) / table.sum()
+    statistic = float(((table - expected) ** 2 / expected).sum())
+    df = table.shape[1] - 1
+    return statistic, df, chi2_sf(statistic, df)
+
+
+def two_proportion_z(successes_a, total_a, successes_b, total_b):
+    """Pooled two-proportion z-test: (z, two-sided p-value)"""
+    if not total_a or not total_b:
+        return 0.0, 1.0
+    pooled = (successes_a + successes_b) / (total_a + total_b)
+    variance = pooled * (1 - pooled) * (1 / total_a + 1 / total_b)
+    if variance <= 0:
+        return 0.0, 1.0
+    z = (successes_b / total_b - successes_a / total_a) / math.sqrt(variance)
+    return z, math.erfc(abs(z) / math.sqrt(2))
+
+
+def mean_z(sum_a, sq_sum_a, n_a, sum_b, sq_sum_b, n_b):
+    """Welch z-test for a difference in means from sums and sums of squares: (z, p-value)"""
+    if n_a < 2 or n_b < 2:
+        return 0.0, 1.0
+    mean_a, mean_b = sum_a / n_a, sum_b / n_b
+    var_a = max(sq_sum_a - n_a * mean_a ** 2, 0.0) / (n_a - 1)
+    var_b = max(sq_sum_b - n_b * mean_b ** 2, 0.0) / (n_b - 1)
+    standard_error = math.sqrt(var_a / n_a + var_b / n_b)
+    if standard_error == 0:
+        return 0.0, 1.0
+    z = (mean_b - mean_a) / standard_error
+    return z, math.erfc(abs(z) / math.sqrt(2))
+
+
+def _counts(snapshot):
+    return [snapshot[sentiment] for sentiment in SENTIMENTS]
+
+
+def arrivals(before, after):
+    """
+    Sentiment counts of comments first counted between two snapshots, from
+    their cumulative daily rollups; None when the rollups aren't comparable
+    (different backend, or the later one doesn't extend the earlier).
+    """
+    if before['backend'] != after['backend'] or not before['daily'] or not after['daily']:
+        return None
+    if any(day not in after['daily'] for day in before['daily']):
+        return None
+    delta = np.zeros(len(SENTIMENTS), dtype=np.int64)
+    for day, row in after['daily'].items():
+        earlier = before['daily'].get(day, [0, 0, 0, 0.0])
+        difference = np.array(row[:3], dtype=np.int64) - np.array(earlier[:3], dtype=np.int64)
+        if (difference < 0).any():
+            return None
+        delta += difference
+    return delta.tolist()
+
+
+def compare_snapshots(before, after, alpha=DRIFT_ALPHA, min_shift=DRIFT_MIN_SHIFT):
+    """
+    Drift tests between two snapshots of a video. A test is flagged when its
+    p-value is below alpha and the share (or mean) moved by at least
+    min_shift. Snapshots usually share most comments, which biases the
+    whole-snapshot tests towards 'no drift'; the arrivals test compares only
+    comments that are new since the earlier snapshot.
+    """
+    tests = []
+
+    def add(name, statistic, p_value, shift):
+        tests.append({
+            'test': name, 'statistic': statistic, 'p_value': p_value, 'shift': shift,
+            'significant': p_value < alpha and abs(shift) >= min_shift,
+        })
+
+    counts_before, counts_after = _counts(before), _counts(after)
+    statistic, _, p_value = chi_square(counts_before, counts_after)
+    shares_before = np.array(counts_before) / max(before['total'], 1)
+    shares_after = np.array(counts_after) / max(after['total'], 1)
+    add('sentiment mix (χ²)', statistic, p_value, float(np.abs(shares_after - shares_before).max()))
+
+    for sentiment in ('positive', 'negative'):
+        z, p_value = two_proportion_z(before[sentiment], before['total'], after[sentiment], after['total'])
+        add(f'{sentiment} share (z)', z, p_value,
+            after[sentiment] / max(after['total'], 1) - before[sentiment] / max(before['total'], 1))
+
+    z, p_value = mean_z(before['confidence_sum'], before['confidence_sq_sum'], before['total'],
+                        after['confidence_sum'], after['confidence_sq_sum'], after['total'])
+    add('mean confidence (z)', z, p_value,
+        after['confidence_sum'] / max(after['total'], 1) - before['confidence_sum'] / max(before['total'], 1))
+
+    new_counts = arrivals(before, after)
+    if new_counts is not None and sum(new_counts):
+        # Everything the earlier timeline had counted vs what arrived since
+        baseline = np.array([row[:3] for row in before['daily'].values()], dtype=np.int64).sum(axis=0)
+        statistic, _, p_value = chi_square(baseline.tolist(), new_counts)
+        new_shares = np.array(new_counts) / sum(new_counts)
+        add('new comments vs earlier (χ²)', statistic, p_value,
+            float(np.abs(new_shares - baseline / max(baseline.sum(), 1)).max()))
+
+    return {
+        'before': before['id'],
+        'after': after['id'],
+        'new_comments': sum(new_counts) if new_counts is not None else None,
+        'tests': tests,
+        'drift': any(test['significant'] for test in tests),
+    }
+
+
+def _label(snapshot):
+    created = datetime.fromtimestamp(snapshot['created']).strftime('%Y-%m-%d %H:%M')
+    return f"#{snapshot['id']} · {created} · {snapshot['total']} comments · {snapshot['backend']}"
+
+
+def show_drift(video_id, key='drift'):
+    """Pick two snapshots of the video and show the drift tests between them"""
+    history = get_snapshot_store().history(video_id)
+    if len(history) < 2:
+        st.caption(f"🗂️ {len(history)} snapshot stored; drift tests start from the next run of this video")
+        return
+
+    @st.fragment
+    def drift_panel():
+        by_id = {snapshot['id']: snapshot for snapshot in history}
+        ids = list(reversed(by_id))
+        col1, col2 = st.columns(2)
+        with col1:
+            before_id = st.selectbox("Earlier snapshot", ids, index=1, format_func=lambda i: _label(by_id[i]), key=f'{key}_before')
+        with col2:
+            after_id = st.selectbox("Later snapshot", ids, index=0, format_func=lambda i: _label(by_id[i]), key=f'{key}_after')
+        before, after = sorted((by_id[before_id], by_id[after_id]), key=lambda snapshot: snapshot['id'])
+        if before['id'] == after['id']:
+            st.info("ℹ️ Pick two different snapshots to compare")
+            return
+
+        report = compare_snapshots(before, after)
+        if report['drift']:
+            st.warning(f"⚠️ Significant sentiment drift between #{before['id']} and #{after['id']}")
+        else:
+            st.success(f"✅ No significant drift between #{before['id']} and #{after['id']}")
+        st.dataframe(pd.DataFrame([
+            {'Test': test['test'], 'Statistic': round(test['statistic'], 2), 'p-value': f"{test['p_value']:.2g}",
+             'Shift': f"{test['shift']:+.1%}" if 'confidence' not in test['test'] else f"{test['shift']:+.3f}",
+             'Flag': '⚠️' if test['significant'] else '✅'}
+            for test in report['tests']
+        ]), hide_index=True)
+        if report['new_comments'] is not None:
+            st.caption(f"🆕 {report['new_comments']} comments arrived between the two snapshots")
+
+    drift_panel()
@@ -0,0 +1,101 @@
+import re
+import pandas as pd
+import streamlit as st
+
+# Optional NLP helpers: the lightweight tier runs without any of them
+try:
+    import emoji
+    EMOJI_AVAILABLE = True
+except ImportError:
+    EMOJI_AVAILABLE = False
+
+try:
+    from langdetect import detect
+    from langdetect.lang_detect_exception import LangDetectException
+    LANGDETECT_AVAILABLE = True
+except ImportError:
+    LANGDETECT_AVAILABLE = False
+
+# Try to import translation, but make it optional
+try:
+    from googletrans import Translator
+    TRANSLATION_AVAILABLE = True
+except ImportError:
+    TRANSLATION_AVAILABLE = False
+
+# Basic emoji replacement (common ones) used when the emoji package is missing
+BASIC_EMOJI_WORDS = {
+    '😊': 'happy', '😀': 'happy', '😃': 'happy', '😄': 'happy', '😁': 'happy',
+    '😍': 'love', '🥰': 'love', '😘': 'love', '💕': 'love', '❤️': 'love',
+    '😢': 'sad', '😭': 'crying', '😞': 'sad', '☹️': 'sad',
+    '😠': 'angry', '😡': 'angry', '🤬': 'angry', '😤': 'angry',
+    '👍': 'good', '👌': 'good', '✅': 'good', '💯': 'perfect',
+    '👎': 'bad', '❌': 'bad', '💩': 'bad'
+}
+
+
+def clean_social_artifacts(text):
+    """Strip mentions, hashtags and URLs and normalize whitespace"""
+    text = re.sub(r'@\w+', '', text)  # Remove mentions
+    text = re.sub(r'#\w+', '', text)  # Remove hashtags
+    text = re.sub(r'http\S+', '', text)  # Remove URLs
+    text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
+    return text.strip()
+
+
+def preprocess_text_basic(text):
+    """Basic text preprocessing for better sentiment analysis"""
+    if not text or pd.isna(text):
+        return ""
+
+    # Convert to string and strip whitespace
+    text = str(text).strip()
+
+    for symbol, word in BASIC_EMOJI_WORDS.items():
+        text = text.replace(symbol, f' {word} ')
+
+    return clean_social_artifacts(text)
+
+
+def preprocess_text(text):
+    """Advanced text preprocessing for better sentiment analysis"""
+    if not EMOJI_AVAILABLE:
+        return preprocess_text_basic(text)
+
+    if not text or pd.isna(text):
+        return ""
+
+    # Convert to string and strip whitespace
+    text = str(text).strip()
+
+    # Convert emoji to text description for better analysis
+    text = emoji.demojize(text, language='en')
+
+    return clean_social_artifacts(text)
+
+
+def detect_language(text):
+    """Detect the language of the text"""
+    if not LANGDETECT_AVAILABLE:
+        return 'en'
+    try:
+        return detect(text)
+    except (LangDetectException, Exception):
+        return 'en'  # Default to English
+
+
+def translate_text(text, target_lang='en'):
+    """Translate text to target language"""
+    if not TRANSLATION_AVAILABLE:
+        return text  # Return original text if translation not available
+
+    try:
+        if len(text.strip()) == 0:
+            return text
+
+        translator = Translator()
+        result = translator.translate(text, dest=target_lang)
+        return result.text
+    except Exception as e:
+        st.warning(f"Translation failed: {str(e)}")
+        return text
@@ -0,0 +1,198 @@
+import os
+import json
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+from result_batch import SENTIMENTS
+
+# Sentiment over time: per-bucket sentiment counts at minute, hour and day
+# resolution, persisted per video and extended incrementally. The ids of
+# counted comments go in a SQLite table next to the artifact cache, so a
+# refresh folds in every comment it hasn't seen without loading them all:
+# fetches are ordered by relevance and capped, so an older comment can first
+# show up long after newer ones were counted.
+
+BUCKETS = {'minute': 60, 'hour': 3600, 'day': 86400}
+TIMELINE_ARTIFACT = 'timeline.json'
+COUNTED_DB = 'timeline.db'
+
+COUNTED_SCHEMA = """
+CREATE TABLE IF NOT EXISTS counted (
+    video_id TEXT NOT NULL,
+    comment_id TEXT NOT NULL,
+    PRIMARY KEY (video_id, comment_id)
+) WITHOUT ROWID;
+"""
+
+
+class SentimentTimeline:
+    """Rollups of sentiment codes and confidence per time bucket"""
+
+    def __init__(self, backend=None, rollups=None):
+        self.backend = backend
+        # level -> {bucket start (epoch seconds): [negative, neutral, positive, confidence sum]}
+        self.rollups = rollups or {level: {} for level in BUCKETS}
+
+    @property
+    def total(self):
+        return int(sum(sum(row[:3]) for row in self.rollups['day'].values()))
+
+    def add(self, published, sentiment, confidence):
+        """
+        Fold in comments. `published` is epoch seconds (int64, negative for
+        missing, which are left out), `sentiment` int8 codes, `confidence`
+        float32. Returns how many comments were added.
+        """
+        valid = published >= 0
+        if not valid.any():
+            return 0
+
+        published = published[valid]
+        sentiment = sentiment[valid].astype(np.int64)
+        confidence = confidence[valid].astype(np.float64)
+        for level, width in BUCKETS.items():
+            starts, bucket = np.unique(published // width * width, return_inverse=True)
+            counts = np.zeros((len(starts), len(SENTIMENTS)), dtype=np.int64)
+            np.add.at(counts, (bucket, sentiment), 1)
+            confidence_sums = np.bincount(bucket, weights=confidence, minlength=len(starts))
+            rollup = self.rollups[level]
+            for start, row, confidence_sum in zip(starts.tolist(), counts.tolist(), confidence_sums.tolist()):
+                current = rollup.setdefault(start, [0, 0, 0, 0.0])
+                current[0] += row[0]
+                current[1] += row[1]
+                current[2] += row[2]
+                current[3] += confidence_sum
+        return int(valid.sum())
+
+    def frame(self, level):
+        """One row per bucket: counts, total, positive share and mean confidence"""
+        rows = sorted(self.rollups[level].items())
+        df = pd.DataFrame(
+            [row[:3] for _, row in rows] or np.zeros((0, 3), dtype=np.int64),
+            columns=['negative', 'neutral', 'positive']
+        )
+        df.insert(0, 'bucket', pd.to_datetime([start for start, _ in rows], unit='s', utc=True))
+        df['total'] = df['negative'] + df['neutral'] + df['positive']
+        df['positive_share'] = df['positive'] / df['total'].where(df['total'] > 0)
+        df['mean_confidence'] = np.array([row[3] for _, row in rows], dtype=np.float64) / df['total'].where(df['total'] > 0)
+        return df
+
+    def to_json(self):
+        return json.dumps({
+            'backend': self.backend,
+            'rollups': {level: {str(start): row for start, row in rollup.items()} for level, rollup in self.rollups.items()},
+        })
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        return cls(
+            backend=data.get('backend'),
+            rollups={level: {int(start): row for start, row in data['rollups'].get(level, {}).items()} for level in BUCKETS},
+        )
+
+
+def epoch_seconds(published_at):
+    """PublishedAt column as int64 epoch seconds (-1 where missing)"""
+    timestamps = pd.to_datetime(pd.Series(published_at), utc=True, errors='coerce')
+    seconds = (timestamps - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+    return seconds.fillna(-1).astype('int64').to_numpy()
+
+
+class CountedComments:
+    """
+    Ids of the comments in each video's stored timeline. Each thread gets its
+    own connection (WAL mode, like the comment index).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._write_lock:
+            self.connection().executescript(COUNTED_SCHEMA)
+
+    def connection(self):
+        if not hasattr(self._local, 'connection'):
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return self._local.connection
+
+    def count(self, video_id):
+        return self.connection().execute('SELECT COUNT(*) FROM counted WHERE video_id = ?', (video_id,)).fetchone()[0]
+
+    def claim(self, video_id, comment_ids, store, reset=False):
+        """
+        Record the ids not recorded yet (after dropping the video's previous
+        ones on reset) and call store() with a mask of them, repeats counted
+        once. Both happen in one transaction, so if store() fails the ids
+        are not kept.
+        """
+        insert = 'INSERT OR IGNORE INTO counted (video_id, comment_id) VALUES (?, ?)'
+        with self._write_lock:
+            connection = self.connection()
+            with connection:
+                if reset:
+                    connection.execute('DELETE FROM counted WHERE video_id = ?', (video_id,))
+                new = np.fromiter((connection.execute(insert, (video_id, comment_id)).rowcount == 1
+                                   for comment_id in comment_ids), bool, len(comment_ids))
+                store(new)
+
+
+_counted_stores = {}
+_counted_stores_lock = threading.Lock()
+
+
+def counted_comments(cache):
+    """The counted-ids store in a cache's directory, one per path and process"""
+    path = os.path.join(cache.root, COUNTED_DB)
+    with _counted_stores_lock:
+        if path not in _counted_stores:
+            _counted_stores[path] = CountedComments(path)
+        return _counted_stores[path]
+
+
+def load_timeline(cache, video_id):
+    """The stored timeline for a video, or None"""
+    path = cache.path_for(video_id, TIMELINE_ARTIFACT)
+    if path is None:
+        return None
+    with open(path, encoding='utf-8') as handle:
+        return SentimentTimeline.from_json(handle.read())
+
+
+def update_timeline(cache, video_id, comment_ids, published_at, results, backend):
+    """
+    Extend the video's stored timeline with comments it hasn't counted and
+    store it again. A different backend than the stored one starts over, as
+    does a timeline whose total doesn't match its recorded ids (one stored
+    before ids were recorded, or whose store was interrupted).
+    """
+    counted = counted_comments(cache)
+    timeline = load_timeline(cache, video_id)
+    reset = timeline is None or timeline.backend != backend or timeline.total != counted.count(video_id)
+    if reset:
+        timeline = SentimentTimeline(backend=backend)
+    published = epoch_seconds(published_at)
+    dated = published >= 0
+
+    def store(new):
+        added = timeline.add(published[dated][new], results.sentiment[dated][new], results.confidence[dated][new])
+        if added or reset:
+            cache.write_with(video_id, TIMELINE_ARTIFACT, lambda handle: handle.write(timeline.to_json()),
+                             mode='w', encoding='utf-8')
+
+    counted.claim(video_id, np.asarray(comment_ids, dtype=object)[dated].tolist(), store, reset=reset)
+    return timeline
+
+
+def default_level(timeline):
+    """Finest resolution that keeps the chart under a few hundred buckets"""
+    for level in BUCKETS:
+        if len(timeline.rollups[level]) <= 360:
+            return level
+    return 'day'
@@ -0,0 +1,244 @@
+import string
+import numpy as np
+
+# Batch VADER compound scores. Texts are tokenized exactly like NLTK's
+# SentiText, then all tokens of the batch are laid out in flat arrays and
+# the lexicon lookup, booster/dampener, capitalization, negation, "least",
+# idiom and "but" rules run as array operations over the whole batch.
+
+PUNCTUATION = set(string.punctuation)
+PUNCTUATION_CHARS = string.punctuation
+STRIP_PUNCTUATION = str.maketrans('', '', string.punctuation)
+NORMALIZE_ALPHA = 15
+
+
+class VaderBatchScorer:
+    """
+    Vectorized equivalent of NLTK's SentimentIntensityAnalyzer.polarity_scores
+    (compound score only), built from an analyzer's lexicon and constants.
+    """
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        constants = analyzer.constants
+        self.constants = constants
+        # Lexicon as an array index: word -> id, id -> valence
+        self.lexicon_ids = {word: i for i, word in enumerate(analyzer.lexicon)}
+        self.valences = np.array(list(analyzer.lexicon.values()), dtype=np.float64)
+        self.boosters = constants.BOOSTER_DICT
+        self.negations = constants.NEGATE
+        self.punctuation_tokens = set(constants.PUNC_LIST)
+        self.idioms = [(phrase.split(), value) for phrase, value in constants.SPECIAL_CASE_IDIOMS.items()]
+        self.booster_bigrams = [phrase.split() for phrase in self.boosters if ' ' in phrase]
+
+    def tokenize(self, text):
+        """SentiText.words_and_emoticons: split, drop singletons, strip one leading or trailing punctuation run"""
+        tokens = [token for token in text.split() if len(token) > 1]
+        words_only = None
+        for i, token in enumerate(tokens):
+            if token[0] not in PUNCTUATION and token[-1] not in PUNCTUATION:
+                continue
+            if words_only is None:
+                words_only = {word for word in text.translate(STRIP_PUNCTUATION).split() if len(word) > 1}
+            stripped = token.lstrip(PUNCTUATION_CHARS)
+            if token[:len(token) - len(stripped)] in self.punctuation_tokens and stripped in words_only:
+                tokens[i] = stripped
+                continue
+            stripped = token.rstrip(PUNCTUATION_CHARS)
+            if token[len(stripped):] in self.punctuation_tokens and stripped in words_only:
+                tokens[i] = stripped
+        return tokens
+
+    def compound_scores(self, texts):
+        """Compound scores (rounded to 4 places, like NLTK) for a list of texts"""
+        texts = [text if isinstance(text, str) else str(text.encode('utf-8')) for text in texts]
+        count = len(texts)
+        if not count:
+            return np.zeros(0)
+
+        raw = []
+        lengths = np.zeros(count, dtype=np.int64)
+        first = []  # Per token: index of its first occurrence in the text (NLTK scores repeats by that position)
+        offset = 0
+        for t, text in enumerate(texts):
+            tokens = self.tokenize(text)
+            seen = {}
+            for position, token in enumerate(tokens):
+                first.append(offset + seen.setdefault(token, position))
+            raw.extend(tokens)
+            lengths[t] = len(tokens)
+            offset += len(tokens)
+
+        sums = np.zeros(count)
+        if raw:
+            sentiments = self._token_sentiments(raw, lengths, np.array(first, dtype=np.int64))
+            text_of = np.repeat(np.arange(count), lengths)
+            sums = np.bincount(text_of, weights=sentiments, minlength=count)
+
+        # Punctuation emphasis
+        exclamations = np.array([min(text.count('!'), 4) for text in texts]) * 0.292
+        questions = np.array([text.count('?') for text in texts])
+        amplifier = exclamations + np.where(questions > 3, 0.96, np.where(questions > 1, questions * 0.18, 0.0))
+        sums = sums + np.sign(sums) * amplifier
+
+        compound = sums / np.sqrt(sums * sums + NORMALIZE_ALPHA)
+        compound[lengths == 0] = 0.0
+        return np.round(compound, 4)
+
+    def _token_sentiments(self, raw, lengths, first):
+        c = self.constants
+        total = len(raw)
+        lower = [token.lower() for token in raw]
+        starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        position = np.arange(total) - starts
+        size = np.repeat(lengths, lengths)
+
+        def before(values, distance, fill):
+            shifted = np.full(total, fill, dtype=values.dtype)
+            if distance < total:
+                shifted[distance:] = values[:total - distance]
+            shifted[position < distance] = fill
+            return shifted
+
+        def after(values, distance, fill):
+            shifted = np.full(total, fill, dtype=values.dtype)
+            if distance < total:
+                shifted[:total - distance] = values[distance:]
+            shifted[position + distance >= size] = fill
+            return shifted
+
+        ids = np.fromiter((self.lexicon_ids.get(word, -1) for word in lower), np.int64, total)
+        in_lexicon = ids >= 0
+        upper = np.fromiter((token.isupper() for token in raw), bool, total)
+        booster = np.fromiter((self.boosters.get(word, 0.0) for word in lower), np.float64, total)
+        is_booster = np.fromiter((word in self.boosters for word in lower), bool, total)
+        negated = np.fromiter((word in self.negations or "n't" in word for word in lower), bool, total)
+        raw_array = np.array(raw, dtype=object)
+        lower_array = np.array(lower, dtype=object)
+        never = raw_array == 'never'
+        so_this = (raw_array == 'so') | (raw_array == 'this')
+
+        # Some but not all words in ALL CAPS
+        caps = np.bincount(np.repeat(np.arange(len(lengths)), lengths), weights=upper, minlength=len(lengths))
+        cap_diff = np.repeat((caps > 0) & (caps < lengths), lengths)
+        emphasized = upper & cap_diff
+
+        valence = np.where(in_lexicon, self.valences[np.maximum(ids, 0)], 0.0)
+        valence = np.where(emphasized, valence + np.where(valence > 0, c.C_INCR, -c.C_INCR), valence)
+
+        for start in range(3):
+            distance = start + 1
+            applies = (position > start) & ~before(in_lexicon, distance, True)
+            previous_booster = before(is_booster, distance, False)
+            scalar = np.where(valence < 0, -1.0, 1.0) * before(booster, distance, 0.0)
+            scalar = scalar + np.where(before(emphasized, distance, False), np.where(valence > 0, c.C_INCR, -c.C_INCR), 0.0)
+            scalar = np.where(previous_booster, scalar, 0.0) * (1.0, 0.95, 0.9)[start]
+            valence = np.where(applies, valence + scalar, valence)
+
+            # Negation ("never so/this" intensifies instead)
+            negation = before(negated, distance, False)
+            if start == 0:
+                valence = np.where(applies & negation, valence * c.N_SCALAR, valence)
+            elif start == 1:
+                intensified = before(never, 2, False) & before(so_this, 1, False)
+                valence = np.where(applies & intensified, valence * 1.5,
+                                   np.where(applies & negation, valence * c.N_SCALAR, valence))
+            else:
+                intensified = (before(never, 3, False) & before(so_this, 2, False)) | before(so_this, 1, False)
+                valence = np.where(applies & intensified, valence * 1.25,
+                                   np.where(applies & negation, valence * c.N_SCALAR, valence))
+                valence = self._idioms(valence, applies, raw_array, before, after)
+
+        # "least" negates unless preceded by "at" or "very"
+        least = before(lower_array == 'least', 1, False) & ~before(in_lexicon, 1, True)
+        exempt = (position > 1) & (before(lower_array == 'at', 2, False) | before(lower_array == 'very', 2, False))
+        valence = np.where(least & ~exempt, valence * c.N_SCALAR, valence)
+
+        # Only lexicon words carry sentiment; boosters and "kind of" are skipped
+        kind_of = (lower_array == 'kind') & after(lower_array == 'of', 1, False)
+        sentiments = np.where(in_lexicon & ~is_booster & ~kind_of, valence, 0.0)
+        sentiments = sentiments[first]
+
+        # "but": halve what comes before the first one, boost what follows
+        is_but = lower_array == 'but'
+        text_of = np.repeat(np.arange(len(lengths)), lengths)
+        first_but = np.full(len(lengths), np.iinfo(np.int64).max)
+        np.minimum.at(first_but, text_of[is_but], position[is_but])
+        but_at = first_but[text_of]
+        has_but = but_at != np.iinfo(np.int64).max
+        factor = np.where(has_but & (position < but_at), 0.5, np.where(has_but & (position > but_at), 1.5, 1.0))
+        return sentiments * factor
+
+    def _idioms(self, valence, applies, raw_array, before, after):
+        """NLTK's _idioms_check, for positions where the third preceding word is not in the lexicon"""
+        total = len(raw_array)
+
+        def phrase_matches(words):
+            """True at positions where `words` starts"""
+            match = raw_array == words[0]
+            for distance, word in enumerate(words[1:], start=1):
+                match &= after(raw_array == word, distance, False)
+            return match
+
+        two_word = np.full(total, np.nan)
+        three_word = np.full(total, np.nan)
+        for words, value in self.idioms:
+            target = two_word if len(words) == 2 else three_word
+            target[phrase_matches(words)] = value
+
+        # Idioms ending at or just before the word, first match wins
+        replacement = np.full(total, np.nan)
+        for candidate in (before(two_word, 1, np.nan), before(three_word, 2, np.nan), before(two_word, 2, np.nan),
+                          before(three_word, 3, np.nan), before(two_word, 3, np.nan)):
+            replacement = np.where(np.isnan(replacement), candidate, replacement)
+        # Idioms starting at the word override
+        replacement = np.where(np.isnan(two_word), replacement, two_word)
+        replacement = np.where(np.isnan(three_word), replacement, three_word)
+        valence = np.where(applies & ~np.isnan(replacement), replacement, valence)
+
+        bigram = np.zeros(total, dtype=bool)
+        for words in self.booster_bigrams:
+            bigram |= phrase_matches(words)
+        dampened = before(bigram, 3, False) | before(bigram, 2, False)
+        return np.where(applies & dampened, valence + self.constants.B_DECR, valence)
+
+
+# Words that trigger VADER's special rules, for randomized rule coverage
+RULE_WORDS = ['good', 'bad', 'GOOD', 'BAD', 'great', 'hate', 'not', "isn't", 'never', 'so', 'this', 'very', 'VERY',
+              'kind', 'of', 'sort', 'least', 'at', 'but', 'BUT', 'the', 'shit', 'bomb', 'yeah', 'right', 'cut', 'mustard',
+              'just', 'enough', 'barely', 'extremely', 'love', 'no', 'ok', 'fine', 'lol', ':)', 'good!', '"bad"', 'wow', 'good,']
+
+
+def rule_texts(count, seed=7):
+    import random
+    rng = random.Random(seed)
+    return [' '.join(rng.choice(RULE_WORDS) for _ in range(rng.randint(1, 12))) + rng.choice(['', '!', '??', '!!!!!', '????'])
+            for _ in range(count)]
+
+
+def self_check(count=5000, tolerance=1e-4):
+    """Compare against NLTK on the synthetic corpus, randomized rule-word texts and hand-picked cases"""
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+    from comment_corpus import corpus_texts
+
+    analyzer = SentimentIntensityAnalyzer()
+    scorer = VaderBatchScorer(analyzer)
+    texts = corpus_texts(count) + rule_texts(count) + [
+        "The movie was NOT good, but the music was GREAT!!!", "I don't really love it", "never so good",
+        "This is at least decent", "least good thing ever", "kind of bad", "it is sort of awesome",
+        "that was the bomb", "yeah right, great job", "he cut the mustard", "kiss of death for this show",
+        "good good good bad", "very very good", "Extremely HAPPY today??", "no no no", "", "!!!", ":) lol",
+        "hardly the worst", "not bad at all", "Good. Bad! good? BAD...", "wasn't it the shit", "barely good",
+    ]
+    batch = scorer.compound_scores(texts)
+    reference = np.array([analyzer.polarity_scores(text)['compound'] for text in texts])
+    mismatched = np.flatnonzero(np.abs(batch - reference) > tolerance)
+    for i in mismatched[:10]:
+        print(f"mismatch: {texts[i]!r}: batch {batch[i]} vs nltk {reference[i]}")
+    print(f"{len(texts) - len(mismatched)}/{len(texts)} compound scores within {tolerance}")
+    return 0 if not len(mismatched) else 1
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(self_check())